@@ -0,0 +1,45 @@
+"""
+Benchmark of date string parsing in findates.dateutils
+
+Compares the original sniff + strptime path with asdatetime (fixed width parsers
+and memoization) and DateParser with a locked format.
+
+Usage (from the repository root): python -m benchmarks.bench_asdatetime [number of dates]
+"""
+
+import datetime
+import sys
+import timeit
+
+from findates.dateutils import DateParser, asdatetime
+from findates.dateutils.dateutils import _datetime_format_strings, _parse_datetime_string
+
+def strptime_asdatetime(dtstr):
+    """ Parsing path of asdatetime before fixed width parsers and memoization
+    """
+    ttab = str.maketrans("0123456789abcdefghijklmnopqrstuvwxyz", "ddddddddddLLLLLLLLLLLLLLLLLLLLLLLLLL")
+    fmt = _datetime_format_strings[dtstr.lower().translate(ttab)]
+    return datetime.datetime.strptime(dtstr, fmt)
+
+def uncached_asdatetime(dtstr):
+    return _parse_datetime_string.__wrapped__(dtstr)
+
+def column(fmt, n):
+    start = datetime.date(1990, 1, 1)
+    return [(start + datetime.timedelta(days=i % 20000)).strftime(fmt) for i in range(n)]
+
+def main(n):
+    formats = ['%Y-%m-%d', '%Y%m%d', '%d.%m.%Y', '%d-%b-%Y', '%m/%d/%Y']
+    print('%-12s %12s %12s %12s %12s' % ('format', 'strptime', 'uncached', 'asdatetime', 'DateParser'))
+    for fmt in formats:
+        dates = column(fmt, n)
+        timings = []
+        for parse in [strptime_asdatetime, uncached_asdatetime, asdatetime, None]:
+            if parse is None:
+                parse = DateParser()
+            _parse_datetime_string.cache_clear()
+            timings.append(min(timeit.repeat(lambda: list(map(parse, dates)), number=1, repeat=3)))
+        print('%-12s %11.1fms %11.1fms %11.1fms %11.1fms' % ((fmt,) + tuple(1000*t for t in timings)))
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,86 @@
+"""
+Multi-threaded stress benchmark of holiday calendars in findates.holidays
+
+Threads query random dates concurrently on a calendar that computes years on
+first use (cold), on the same calendar once all years are cached (warm) and on a
+frozen calendar. Every answer is checked against a reference computed in a
+single thread before the timings are reported.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_calendar_threads [threads] [queries per thread]
+"""
+
+import datetime
+import random
+import sys
+import threading
+import time
+
+from findates.busdayrule import rolldate
+from findates.holidays import JointCalendar, create_calendar
+
+START_YEAR = 1950
+END_YEAR = 2100
+
+def random_dates(seed, n):
+    rng = random.Random(seed)
+    first = datetime.date(START_YEAR, 1, 1).toordinal()
+    last = datetime.date(END_YEAR, 12, 31).toordinal()
+    return [datetime.datetime.fromordinal(rng.randint(first, last)) for _ in range(n)]
+
+def query(calendar, dates):
+    return [(calendar.is_holiday(dt), rolldate(dt, calendar, 'modfollow')) for dt in dates]
+
+def run(calendar, reference, threads, queries):
+    """ Wall time of all threads querying a calendar and number of wrong answers
+    """
+    inputs = [random_dates(seed, queries) for seed in range(threads)]
+    expected = [query(reference, dates) for dates in inputs]
+    results = [None] * threads
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(k):
+        barrier.wait()
+        results[k] = query(calendar, inputs[k])
+
+    workers = [threading.Thread(target=worker, args=(k,)) for k in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    errors = sum(r != e for result, exp in zip(results, expected) for r, e in zip(result, exp))
+    return elapsed, errors
+
+def main(threads, queries):
+    # switch threads often to make races between builders of the same year likely
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    us = create_calendar('us')
+    frozen = create_calendar('us')
+    frozen.freeze(START_YEAR, END_YEAR)
+    joint = JointCalendar(create_calendar('us'), create_calendar('uk'))
+    reference_joint = JointCalendar(create_calendar('us'), create_calendar('uk'))
+    cases = [
+        ('us cold', us, frozen),
+        ('us warm', us, frozen),
+        ('us frozen', frozen, create_calendar('us')),
+        ('us+uk joint cold', joint, reference_joint),
+    ]
+    print('%-20s %10s %14s %8s' % ('calendar', 'time', 'queries/s', 'errors'))
+    failed = False
+    try:
+        for name, calendar, reference in cases:
+            elapsed, errors = run(calendar, reference, threads, queries)
+            failed = failed or errors > 0
+            print('%-20s %9.3fs %14.0f %8d' % (name, elapsed, threads * queries / elapsed, errors))
+    finally:
+        sys.setswitchinterval(switch_interval)
+    if failed:
+        sys.exit('Calendars returned wrong answers under concurrent use')
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 8,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 20000)
@@ -0,0 +1,76 @@
+"""
+Import time benchmark of findates packages
+
+Each package is imported in fresh interpreters and the best time of the import
+statement is reported, along with slow optional modules (numpy, multiprocessing,
+...) the import pulled in. The time of importing the standard library modules
+all packages depend on is reported for reference. Bytecode is compiled into a
+temporary cache first, so the times do not include compiling the sources.
+
+Usage (from the repository root):
+    python -m benchmarks.bench_import [--repeat 10] [--max-ms 10]
+
+With --max-ms the exit status is 1 if any package takes longer to import.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+PACKAGES = ['findates', 'findates.dateutils', 'findates.busdayrule', 'findates.daycount',
+            'findates.holidays', 'findates.schedule']
+
+# standard library modules all findates packages depend on, reported for reference
+BASELINE = 'array, collections, datetime, functools, itertools, threading'
+
+# modules that should only be imported when the features needing them are used
+SLOW_MODULES = ['numpy', 'multiprocessing', 'concurrent.futures', 'tempfile', 'hashlib', 'json']
+
+_CHILD = '''
+import sys, time
+started = time.perf_counter()
+import %s
+elapsed = time.perf_counter() - started
+print(elapsed * 1000)
+print(' '.join(name for name in %r if name in sys.modules))
+'''
+
+def import_time(package, env):
+    """ Milliseconds taken by importing the package in a fresh interpreter and slow
+        modules loaded by it
+    """
+    output = subprocess.check_output([sys.executable, '-c', _CHILD % (package, SLOW_MODULES)],
+                                     env=env, universal_newlines=True)
+    elapsed, loaded = output.split('\n')[:2]
+    return float(elapsed), loaded.split()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=10, help='interpreters started per package')
+    parser.add_argument('--max-ms', type=float, help='fail if an import takes longer')
+    args = parser.parse_args(argv)
+    failed = False
+    with tempfile.TemporaryDirectory() as cache:
+        env = dict(os.environ)
+        env.pop('PYTHONDONTWRITEBYTECODE', None)
+        env['PYTHONPYCACHEPREFIX'] = cache
+        for package in PACKAGES:
+            import_time(package, env)
+        print('%-22s %10s  %s' % ('package', 'best ms', 'slow modules loaded'))
+        baseline = min(import_time(BASELINE, env)[0] for _ in range(args.repeat))
+        print('%-22s %10.2f' % ('(standard library)', baseline))
+        for package in PACKAGES:
+            timings = []
+            for _ in range(args.repeat):
+                elapsed, loaded = import_time(package, env)
+                timings.append(elapsed)
+            best = min(timings)
+            print('%-22s %10.2f  %s' % (package, best, ' '.join(loaded) or '-'))
+            if args.max_ms is not None and best > args.max_ms:
+                failed = True
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
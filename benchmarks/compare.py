@@ -0,0 +1,88 @@
+"""
+Compare benchmark results of benchmarks.suite against a stored baseline
+
+A benchmark regresses when its throughput drops by more than the threshold
+relative to the baseline. The exit status is 1 if any benchmark regressed, so
+the tool can gate upgrades in CI.
+
+Usage (from the repository root):
+    python -m benchmarks.compare baseline.json results.json [--threshold 0.10] [--json]
+"""
+
+import argparse
+import json
+import sys
+
+def load_report(path):
+    with open(path) as f:
+        report = json.load(f)
+    if 'results' not in report:
+        raise ValueError("%s is not a benchmark results file" % path)
+    return report
+
+def compare(baseline, current, threshold=0.10):
+    """ Compare two results dicts of run_suite by throughput
+
+    Returns
+    -------
+    list of dicts with name, baseline and current ops_per_sec, ratio (current over
+    baseline, None for benchmarks missing in one of the results) and status, one of
+    'regression', 'improvement', 'ok', 'missing' or 'new'
+    """
+    rows = []
+    for name in sorted(set(baseline) | set(current)):
+        old = baseline.get(name, dict()).get('ops_per_sec')
+        new = current.get(name, dict()).get('ops_per_sec')
+        if old is None or new is None:
+            status = 'missing' if new is None else 'new'
+            ratio = None
+        else:
+            ratio = new / old
+            if ratio < 1.0 - threshold:
+                status = 'regression'
+            elif ratio > 1.0 + threshold:
+                status = 'improvement'
+            else:
+                status = 'ok'
+        rows.append(dict({'name': name, 'baseline': old, 'current': new, 'ratio': ratio,
+                          'status': status}))
+    return rows
+
+def format_table(rows):
+    lines = ['%-44s %14s %14s %8s  %s' % ('benchmark', 'baseline op/s', 'current op/s', 'ratio', 'status')]
+    for row in rows:
+        lines.append('%-44s %14s %14s %8s  %s' % (
+            row['name'],
+            '-' if row['baseline'] is None else '%.0f' % row['baseline'],
+            '-' if row['current'] is None else '%.0f' % row['current'],
+            '-' if row['ratio'] is None else '%.2f' % row['ratio'],
+            row['status']))
+    return '\n'.join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('baseline', help='stored baseline results')
+    parser.add_argument('current', help='results to check')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='allowed relative drop of throughput (default 0.10)')
+    parser.add_argument('--json', action='store_true', help='print the comparison as JSON')
+    args = parser.parse_args(argv)
+    baseline, current = load_report(args.baseline), load_report(args.current)
+    for key in ['parameters', 'python', 'platform']:
+        if baseline.get(key) != current.get(key):
+            print('warning: %s differ, baseline %s, current %s' % (key, baseline.get(key), current.get(key)),
+                  file=sys.stderr)
+    rows = compare(baseline['results'], current['results'], args.threshold)
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print(format_table(rows))
+    regressions = [row['name'] for row in rows if row['status'] == 'regression']
+    if regressions:
+        print('%d benchmark(s) regressed by more than %.0f%%' % (len(regressions), 100 * args.threshold),
+              file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,232 @@
+"""
+Benchmark suite of findates hot paths with machine-readable results
+
+Each benchmark runs a batch of operations several times and reports the best
+time per operation and throughput. Results are written as JSON, compare them
+against a stored baseline with benchmarks.compare.
+
+Usage (from the repository root):
+    python -m benchmarks.suite [--output results.json] [--repeat 5] [--quick] [--filter text]
+"""
+
+import argparse
+import datetime
+import json
+import platform
+import sys
+import time
+
+from findates.busdayrule import rolldate
+from findates.daycount import yearfrac, yearfractions
+from findates.daycount.daycount import _dc_norm
+from findates.dateutils import asdatetime
+from findates.dateutils.dateutils import _parse_datetime_string
+from findates.holidays import create_calendar, get_calendar
+
+FORMAT_VERSION = 1
+
+ROLL_CONVENTIONS = ['follow', 'modfollow', 'previous', 'modprevious']
+
+class Benchmark:
+    """ Named batch of operations
+
+    setup() is called before every repeat and returns the state passed to run(state),
+    which performs ops operations. Only run is timed.
+    """
+
+    def __init__(self, name, setup, run, ops):
+        self.name = name
+        self.setup = setup
+        self.run = run
+        self.ops = ops
+
+    def measure(self, repeat):
+        timings = []
+        for _ in range(repeat):
+            state = self.setup()
+            started = time.perf_counter()
+            self.run(state)
+            timings.append(time.perf_counter() - started)
+        timings.sort()
+        best = timings[0]
+        return dict({
+            'ops': self.ops,
+            'repeat': repeat,
+            'best': best,
+            'median': timings[len(timings) // 2],
+            'seconds_per_op': best / self.ops,
+            'ops_per_sec': self.ops / best if best > 0 else float('inf')
+        })
+
+def _dates(n, start=datetime.datetime(2000, 1, 3), step=1):
+    return [start + datetime.timedelta(days=i * step) for i in range(n)]
+
+def _asdatetime_benchmarks(n):
+    formats = dict({
+        'yyyy-mm-dd': '%Y-%m-%d',
+        'yyyymmdd': '%Y%m%d',
+        'dd.mm.yyyy': '%d.%m.%Y',
+        'dd-mon-yyyy': '%d-%b-%Y',
+        'dd mon yyyy': '%d %b %Y',
+        'mm/dd/yyyy': '%m/%d/%Y',
+        'mm/dd/yy': '%m/%d/%y'
+    })
+    benchmarks = []
+    for label, fmt in formats.items():
+        strings = [dt.strftime(fmt) for dt in _dates(n)]
+
+        def cold_setup(strings=strings):
+            _parse_datetime_string.cache_clear()
+            return strings
+
+        def warm_setup(strings=strings):
+            _parse_datetime_string.cache_clear()
+            for dtstr in strings:
+                asdatetime(dtstr)
+            return strings
+
+        def run(strings):
+            for dtstr in strings:
+                asdatetime(dtstr)
+
+        benchmarks.append(Benchmark('asdatetime[%s]' % label, cold_setup, run, n))
+        benchmarks.append(Benchmark('asdatetime[%s] memoized' % label, warm_setup, run, n))
+    return benchmarks
+
+def _calendar_benchmarks(n):
+    # one date in each of many years, all of them computed on first use
+    years = _dates(min(n, 500), datetime.datetime(1800, 7, 1), 366)
+    same_year = _dates(min(n, 366), datetime.datetime(2012, 1, 1))
+
+    def cold_setup():
+        return create_calendar('us'), years
+
+    def warm_setup():
+        calendar = create_calendar('us')
+        for dt in years:
+            calendar.is_holiday(dt)
+        return calendar, years
+
+    def compiled_setup():
+        calendar = create_calendar('us')
+        calendar.compile(years[0].year, years[-1].year)
+        return calendar, years
+
+    def run(state):
+        calendar, dates = state
+        for dt in dates:
+            calendar.is_holiday(dt)
+
+    def same_year_setup():
+        calendar = create_calendar('us')
+        calendar.is_holiday(same_year[0])
+        return calendar, same_year
+
+    construct_count = max(n // 100, 10)
+
+    def construct(count):
+        for _ in range(count):
+            create_calendar('us')
+
+    def lookup(count):
+        for _ in range(count):
+            get_calendar('us')
+
+    return [
+        Benchmark('Calendar.is_holiday cold year', cold_setup, run, len(years)),
+        Benchmark('Calendar.is_holiday warm year', warm_setup, run, len(years)),
+        Benchmark('Calendar.is_holiday same year', same_year_setup, run, len(same_year)),
+        Benchmark('Calendar.is_holiday compiled', compiled_setup, run, len(years)),
+        Benchmark('create_calendar', lambda: construct_count, construct, construct_count),
+        Benchmark('get_calendar', lambda: n, lookup, n)
+    ]
+
+def _rolldate_benchmarks(n):
+    dates = _dates(n)
+    benchmarks = []
+    for convention in ROLL_CONVENTIONS:
+
+        def setup():
+            calendar = create_calendar('uk')
+            for dt in dates:
+                calendar.is_holiday(dt)
+            return calendar
+
+        def run(calendar, convention=convention):
+            for dt in dates:
+                rolldate(dt, calendar, convention)
+
+        benchmarks.append(Benchmark('rolldate[%s]' % convention, setup, run, n))
+    return benchmarks
+
+def _yearfrac_benchmarks(n):
+    start = datetime.datetime(2003, 2, 28)
+    ends = _dates(n, datetime.datetime(2003, 3, 1), 7)
+    benchmarks = []
+    for convention in sorted(set(_dc_norm.values())):
+
+        def run(state, convention=convention):
+            for end in ends:
+                yearfrac(start, end, convention)
+
+        benchmarks.append(Benchmark('yearfrac[%s]' % convention, lambda: None, run, n))
+    for convention in ['ACTUAL/ACTUAL ISDA', '30/360 US', 'ACTUAL/360']:
+        dates = _dates(10 * n, datetime.datetime(1990, 1, 1), 3)
+
+        def run(state, convention=convention, dates=dates):
+            yearfractions(dates, convention)
+
+        benchmarks.append(Benchmark('yearfractions[%s]' % convention, lambda: None, run, len(dates)))
+    return benchmarks
+
+def all_benchmarks(n):
+    return (_asdatetime_benchmarks(n) + _calendar_benchmarks(n) + _rolldate_benchmarks(n)
+            + _yearfrac_benchmarks(n))
+
+def run_suite(n=10000, repeat=5, selected=None, stream=None):
+    """ Run the benchmarks and return results as a JSON serializable dict
+
+    Parameters
+    ----------
+    n: number of operations per batch of most benchmarks
+    repeat: number of timed batches per benchmark, the best one is reported
+    selected: optional substring, only benchmarks with names containing it are run
+    stream: file to print progress to, e.g. sys.stderr
+    """
+    results = dict()
+    for benchmark in all_benchmarks(n):
+        if selected and selected not in benchmark.name:
+            continue
+        results[benchmark.name] = benchmark.measure(repeat)
+        if stream is not None:
+            print('%-44s %12.0f ops/s' % (benchmark.name, results[benchmark.name]['ops_per_sec']),
+                  file=stream)
+    return dict({
+        'format': FORMAT_VERSION,
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'parameters': dict({'n': n, 'repeat': repeat}),
+        'results': results
+    })
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--output', '-o', help='write JSON results to the file instead of stdout')
+    parser.add_argument('--repeat', type=int, default=5, help='timed batches per benchmark')
+    parser.add_argument('-n', type=int, default=10000, help='operations per batch')
+    parser.add_argument('--quick', action='store_true', help='small batches for a smoke run')
+    parser.add_argument('--filter', help='run only benchmarks with names containing the text')
+    args = parser.parse_args(argv)
+    n, repeat = (500, 2) if args.quick else (args.n, args.repeat)
+    report = run_suite(n, repeat, args.filter, sys.stderr)
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+if __name__ == '__main__':
+    main()
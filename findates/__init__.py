@@ -8,11 +8,20 @@ Provides
        exchanges with natural language
     3. Day counting conventions to calculate year fractions between dates
     4. Business day rolling conventions (FOLLOW, MODFOLLOW, PREVIOUS, MODPREVIOUS)
+    5. Coupon schedule generation with business day adjustment and accrual fractions
 
 """
 
-# from .dateutils import *
-# from .busdayrule import *
-# from .daycount import *
-# from .daycount import yearfrac
-# from .holidays import *
\ No newline at end of file
+import importlib
+
+# Subpackages are imported on first access (PEP 562), so that "import findates" stays
+# cheap for short lived processes that only need some of them
+_subpackages = ['busdayrule', 'dateutils', 'daycount', 'holidays', 'profiling', 'schedule']
+
+def __getattr__(name):
+    if name in _subpackages:
+        return importlib.import_module('.' + name, __name__)
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+def __dir__():
+    return sorted(set(globals()) | set(_subpackages))
\ No newline at end of file
@@ -5,23 +5,42 @@ Where to move payment if payment day falls on a holiday
 
 import datetime
 
-from findates.dateutils import asdatetime, eom
+from findates.dateutils import asordinal, asordinal_array, eom, ordinals_to_datetime64
+from findates.profiling import profiler as _profiler
 
-def _roll_forward(dt, calendar):
-    rolled = dt
-    while calendar.is_holiday(rolled):
-        rolled += datetime.timedelta(days = 1)
-    return rolled
+def _holiday_checker(calendar):
+    """ Function checking if a proleptic Gregorian ordinal is a holiday in the calendar
+
+    findates.holidays calendars check ordinals directly, other objects with
+    is_holiday method are given datetime.datetime dates.
+    """
+    is_holiday = getattr(calendar, '_is_holiday_ordinal', None)
+    if is_holiday is not None:
+        return is_holiday
+    return lambda ordinal: calendar.is_holiday(datetime.datetime.fromordinal(ordinal))
+
+def _month(ordinal):
+    return datetime.date.fromordinal(ordinal).month
+
+def _roll_forward(ordinal, is_holiday):
+    start = ordinal
+    while is_holiday(ordinal):
+        ordinal += 1
+    if _profiler.enabled:
+        _profiler.add('busdayrule.roll_forward', items=ordinal - start)
+    return ordinal
 
 
-def _roll_backward(dt, calendar):
-    rolled = dt
-    while calendar.is_holiday(rolled):
-        rolled -= datetime.timedelta(days = 1)
-    return rolled
+def _roll_backward(ordinal, is_holiday):
+    start = ordinal
+    while is_holiday(ordinal):
+        ordinal -= 1
+    if _profiler.enabled:
+        _profiler.add('busdayrule.roll_backward', items=start - ordinal)
+    return ordinal
 
 
-def rolldate(dt, calendar, convention):
+def rolldate(dt, calendar, convention, ordinal=False):
     """ Roll date to the business day
 
     Roll date of the date to the business day according to the convention.
@@ -32,39 +51,217 @@ def rolldate(dt, calendar, convention):
 
     Parameters
     ----------
-    dt: datetime.date, datetime.datetime or date string
+    dt: datetime.date, datetime.datetime, date string or proleptic Gregorian ordinal
     calendar: Calendar object that has is_holiday method
-    convention: one of 'follow', 'previous', 'modfollow', 'modprevious'
+    convention: one of 'follow', 'previous', 'modfollow', 'modprevious' (case
+        insensitive), other conventions raise ValueError (earlier versions returned
+        the date unchanged)
+    ordinal: return proleptic Gregorian ordinal instead of datetime.datetime
 
     Returns
     -------
     datetime.datetime of the next business day according to the convention
     """
+    started = _profiler.clock() if _profiler.enabled else None
     convention = convention.lower()
-    dt = asdatetime(dt)
-    rolled = dt
+    start = asordinal(dt)
+    is_holiday = _holiday_checker(calendar)
+    rolled = start
     if convention == "follow":
-        rolled = _roll_forward(dt, calendar)
+        rolled = _roll_forward(start, is_holiday)
     elif convention == 'modfollow':
-        rolled = _roll_forward(dt, calendar)
-        if rolled.month > dt.month:
-            rolled = _roll_backward(dt, calendar)
+        rolled = _roll_forward(start, is_holiday)
+        if rolled != start and _month(rolled) > _month(start):
+            rolled = _roll_backward(start, is_holiday)
     elif convention == 'previous':
-        rolled = _roll_backward(dt, calendar)
+        rolled = _roll_backward(start, is_holiday)
     elif convention == 'modprevious':
-        rolled = _roll_backward(dt, calendar)
-        if rolled.month < dt.month:
-            rolled = _roll_forward(dt, calendar)
-    return rolled
+        rolled = _roll_backward(start, is_holiday)
+        if rolled != start and _month(rolled) < _month(start):
+            rolled = _roll_forward(start, is_holiday)
+    else:
+        raise ValueError("Unknown business day convention '%s'" % convention)
+    if started is not None:
+        _profiler.add('busdayrule.rolldate', _profiler.clock() - started, label=convention)
+    if ordinal:
+        return rolled
+    return datetime.datetime.fromordinal(rolled)
 
 def lbusdate(year, month, calendar):
     """ Last business day of the month
     """
-    dt = eom(year, month)
-    return _roll_backward(dt, calendar)
+    last = eom(year, month, ordinal=True)
+    return datetime.datetime.fromordinal(_roll_backward(last, _holiday_checker(calendar)))
 
 def fbusdate(year, month, calendar):
     """ First business day of the month
     """
-    dt = datetime.datetime(year, month, 1)
-    return _roll_forward(dt, calendar)
\ No newline at end of file
+    first = datetime.date(year, month, 1).toordinal()
+    return datetime.datetime.fromordinal(_roll_forward(first, _holiday_checker(calendar)))
+
+def add_business_days(dt, n, calendar):
+    """ Business day n business days after (n > 0) or before (n < 0) a date
+
+    For n == 0 the date itself is returned if it is a business day, otherwise the
+    following business day. E.g. T+2 settlement date is add_business_days(trade_date, 2, calendar).
+
+    Parameters
+    ----------
+    dt: datetime.date, datetime.datetime, date string or proleptic Gregorian ordinal
+    n: number of business days
+    calendar: Calendar object that has is_holiday method. Calendars with a business day
+        index (findates.holidays calendars) answer with a couple of table lookups.
+
+    Returns
+    -------
+    datetime.datetime of the business day
+    """
+    if hasattr(calendar, 'nth_business_day'):
+        return calendar.nth_business_day(dt, n)
+    ordinal = asordinal(dt)
+    is_holiday = _holiday_checker(calendar)
+    if n == 0:
+        return datetime.datetime.fromordinal(_roll_forward(ordinal, is_holiday))
+    step = 1 if n > 0 else -1
+    remaining = abs(n)
+    while remaining:
+        ordinal += step
+        if not is_holiday(ordinal):
+            remaining -= 1
+    return datetime.datetime.fromordinal(ordinal)
+
+def business_days_between(dt1, dt2, calendar):
+    """ Number of business days on or after dt1 and before dt2, negative if dt2 precedes dt1
+
+    Parameters
+    ----------
+    dt1, dt2: datetime.date, datetime.datetime, date string or proleptic Gregorian ordinal
+    calendar: Calendar object that has is_holiday method, see add_business_days
+    """
+    if hasattr(calendar, 'count_business_days'):
+        return calendar.count_business_days(dt1, dt2)
+    o1, o2 = asordinal(dt1), asordinal(dt2)
+    if o2 < o1:
+        return -business_days_between(o2, o1, calendar)
+    is_holiday = _holiday_checker(calendar)
+    return sum(1 for ordinal in range(o1, o2) if not is_holiday(ordinal))
+
+def _covering_tables(calendar, lo, hi):
+    """ Business day index of the calendar covering ordinals lo to hi and its NumPy tables
+    """
+    index = calendar.compile(datetime.date.fromordinal(lo).year, datetime.date.fromordinal(hi).year)
+    return index, index.as_arrays()
+
+def _like_input(ordinals, dates):
+    """ Return datetime64[D] array for datetime64 input and ordinals otherwise
+    """
+    if getattr(dates, 'dtype', None) is not None and dates.dtype.kind == 'M':
+        return ordinals_to_datetime64(ordinals)
+    return ordinals
+
+def add_business_days_array(dates, n, calendar):
+    """ Vectorized add_business_days
+
+    Parameters
+    ----------
+    dates: numpy datetime64 array, integer ordinals or sequence of dates
+    n: number of business days, scalar or array broadcast against dates
+    calendar: calendar with business day index (Calendar, JointCalendar)
+
+    Returns
+    -------
+    numpy datetime64[D] array for datetime64 input, int64 ordinals otherwise
+    """
+    import numpy as np
+    ordinals, n = np.broadcast_arrays(asordinal_array(dates), np.asarray(n, dtype=np.int64))
+    if ordinals.size == 0:
+        return _like_input(ordinals.copy(), dates)
+    index, (flags, cumulative, busdays) = _covering_tables(calendar, int(ordinals.min()), int(ordinals.max()))
+    while True:
+        i = ordinals - index.first
+        k = np.where(n > 0, cumulative[i + 1] + n - 1, cumulative[i] + n)
+        before, after = (k < 0).any(), (k >= len(busdays)).any()
+        if not (before or after):
+            break
+        # extend the index by roughly the number of years needed plus a margin
+        years = int(np.abs(n).max()) // 200 + 1
+        index = calendar.compile(index.start_year - (years if before else 0),
+                                 index.end_year + (years if after else 0))
+        flags, cumulative, busdays = index.as_arrays()
+    return _like_input(busdays[k].astype(np.int64), dates)
+
+def business_days_between_array(dates1, dates2, calendar):
+    """ Vectorized business_days_between
+
+    Parameters
+    ----------
+    dates1, dates2: numpy datetime64 arrays, integer ordinals or sequences of dates,
+        broadcast against each other
+    calendar: calendar with business day index (Calendar, JointCalendar)
+
+    Returns
+    -------
+    numpy int64 array of business day counts
+    """
+    import numpy as np
+    o1, o2 = np.broadcast_arrays(asordinal_array(dates1), asordinal_array(dates2))
+    if o1.size == 0:
+        return np.zeros(o1.shape, dtype=np.int64)
+    lo = int(min(o1.min(), o2.min()))
+    # end of the interval is exclusive, so the index may stop one day short of it
+    hi = max(lo, int(max(o1.max(), o2.max())) - 1)
+    index, (flags, cumulative, busdays) = _covering_tables(calendar, lo, hi)
+    return cumulative[o2 - index.first].astype(np.int64) - cumulative[o1 - index.first]
+
+def rolldate_array(dates, calendar, convention):
+    """ Vectorized rolldate
+
+    Dates are rolled with lookup tables of following and preceding business days of
+    the calendar's business day index, see rolldate for the conventions.
+
+    Parameters
+    ----------
+    dates: numpy datetime64 array, integer ordinals or sequence of dates
+    calendar: calendar with business day index (Calendar, JointCalendar)
+    convention: one of 'follow', 'previous', 'modfollow', 'modprevious'
+
+    Returns
+    -------
+    numpy datetime64[D] array for datetime64 input, int64 ordinals otherwise
+    """
+    import numpy as np
+    convention = convention.lower()
+    if convention not in ('follow', 'modfollow', 'previous', 'modprevious'):
+        raise ValueError("Unknown business day convention '%s'" % convention)
+    ordinals = asordinal_array(dates)
+    if ordinals.size == 0:
+        return _like_input(ordinals.copy(), dates)
+    lo, hi = int(ordinals.min()), int(ordinals.max())
+    index = calendar.compile(datetime.date.fromordinal(lo).year, datetime.date.fromordinal(hi).year)
+    while True:
+        following, preceding = index.rolling_tables()
+        i = ordinals - index.first
+        forward = following[i].astype(np.int64)
+        backward = preceding[i].astype(np.int64)
+        # negative entries roll past the ends of the index, extend it by a year in each
+        # direction the convention can roll to (both for modified conventions, even if
+        # no month changes)
+        before = (backward < 0).any() and convention != 'follow'
+        after = (forward < 0).any() and convention != 'previous'
+        if not (before or after):
+            break
+        index = calendar.compile(index.start_year - before, index.end_year + after)
+
+    if convention in ('follow', 'modfollow'):
+        rolled = forward
+    else:
+        rolled = backward
+    if convention in ('modfollow', 'modprevious'):
+        months = ordinals_to_datetime64(ordinals).astype('datetime64[M]').astype(np.int64) % 12
+        rolled_months = ordinals_to_datetime64(rolled).astype('datetime64[M]').astype(np.int64) % 12
+        # same comparison of month numbers as in rolldate
+        if convention == 'modfollow':
+            rolled = np.where(rolled_months > months, backward, rolled)
+        else:
+            rolled = np.where(rolled_months < months, forward, rolled)
+    return _like_input(rolled, dates)
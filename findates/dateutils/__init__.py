@@ -1,11 +1,17 @@
 
 from .dateutils import (
     DAYS_IN_WEEK,
+    MONTHS_IN_YEAR,
+    DateParser,
     asdatetime,
+    asordinal,
+    asordinal_array,
     eom,
     iseom,
     leapyear,
     lweekday,
     nweekday,
+    ordinals_to_datetime64,
+    parse_dates,
     yeardays
 )
\ No newline at end of file
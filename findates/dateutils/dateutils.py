@@ -1,5 +1,10 @@
 
+import array
 import datetime
+import functools
+import numbers
+
+from findates.profiling import profiler as _profiler
 
 # Not that we expect that number of days in the week changes any time soon
 # but having symbolic name in the source code is more descriptive and easier to search
@@ -10,6 +15,9 @@ MONTHS_IN_YEAR = 12
 DAYS_IN_NON_LEAP_YEAR = 365
 DAYS_IN_LEAP_YEAR = 366
 
+# Proleptic Gregorian ordinal of 1970-01-01, the epoch of numpy.datetime64
+DATETIME64_EPOCH_ORDINAL = 719163
+
 _datetime_format_strings = dict({
     'dd-LLL-dddd dd:dd:dd': '%d-%b-%Y %H:%M:%S',
     'dd-LLL-dddd': '%d-%b-%Y',
@@ -48,27 +56,421 @@ _datetime_format_strings = dict({
     "dddddddd": '%Y%m%d'
 })
 
+# Maps digits to 'd' and letters to 'L' to obtain the shape of a date string
+_format_translation = str.maketrans(
+    "0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ",
+    "ddddddddddLLLLLLLLLLLLLLLLLLLLLLLLLLLLLLLLLLLLLLLLLLLLLLLLLLLL")
+
+_month_abbreviations = dict(
+    (name, num+1) for num, name in enumerate(
+        ['jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec']))
+
+def _parse_yyyy_mm_dd(dtstr):
+    return datetime.datetime(int(dtstr[0:4]), int(dtstr[5:7]), int(dtstr[8:10]))
+
+def _parse_yyyymmdd(dtstr):
+    return datetime.datetime(int(dtstr[0:4]), int(dtstr[4:6]), int(dtstr[6:8]))
+
+def _parse_dd_mm_yyyy(dtstr):
+    return datetime.datetime(int(dtstr[6:10]), int(dtstr[3:5]), int(dtstr[0:2]))
+
+def _parse_dd_mon_yyyy(dtstr):
+    try:
+        month = _month_abbreviations[dtstr[3:6].lower()]
+    except KeyError:
+        raise ValueError("Unknown month abbreviation in date string: %s" % dtstr)
+    return datetime.datetime(int(dtstr[7:11]), month, int(dtstr[0:2]))
+
+# Parsers for the most common fixed width shapes, these bypass datetime.strptime
+_fixed_width_parsers = dict({
+    'dddd-dd-dd': _parse_yyyy_mm_dd,
+    'dddddddd': _parse_yyyymmdd,
+    'dd.dd.dddd': _parse_dd_mm_yyyy,
+    'dd-LLL-dddd': _parse_dd_mon_yyyy
+})
+
+# Number of distinct date strings remembered by asdatetime
+PARSE_CACHE_SIZE = 65536
+
 def sniff_datetime_format(dtstr):
     """ Try to recognize date representation format from the date string
     """
-    dtstr = dtstr.lower()
-    ttab = str.maketrans("0123456789abcdefghijklmnopqrstuvwxyz", "ddddddddddLLLLLLLLLLLLLLLLLLLLLLLLLL")
-    fmtstring = dtstr.translate(ttab)
+    if _profiler.enabled:
+        started = _profiler.clock()
+        try:
+            return _sniff_datetime_format(dtstr)
+        finally:
+            _profiler.add('dateutils.sniff_datetime_format', _profiler.clock() - started)
+    return _sniff_datetime_format(dtstr)
+
+def _sniff_datetime_format(dtstr):
+    fmtstring = dtstr.translate(_format_translation)
     if fmtstring in _datetime_format_strings:
         return _datetime_format_strings[fmtstring]
     else:
         raise ValueError("Incorrect date format string: %s" % fmtstring)
 
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_datetime_string(dtstr):
+    # only strings missing from the cache get here
+    if _profiler.enabled:
+        started = _profiler.clock()
+        try:
+            return _parse_uncached_datetime_string(dtstr)
+        finally:
+            _profiler.add('dateutils.parse_datetime_string', _profiler.clock() - started)
+    return _parse_uncached_datetime_string(dtstr)
+
+def _parse_uncached_datetime_string(dtstr):
+    fmtstring = dtstr.translate(_format_translation)
+    parser = _fixed_width_parsers.get(fmtstring)
+    if parser is not None:
+        return parser(dtstr)
+    if fmtstring in _datetime_format_strings:
+        return datetime.datetime.strptime(dtstr, _datetime_format_strings[fmtstring])
+    else:
+        raise ValueError("Incorrect date format string: %s" % fmtstring)
+
 def asdatetime(dt):
     """ Extract datetime from several possible representations
+
+    Parsed strings are memoized, see PARSE_CACHE_SIZE
     """
     if isinstance(dt, str):
-        return datetime.datetime.strptime(dt, sniff_datetime_format(dt))
+        return _parse_datetime_string(dt)
     elif isinstance(dt, datetime.date):
         return datetime.datetime(dt.year, dt.month, dt.day)
     else:
         raise ValueError("Cannot extract date from: %s" % repr(dt))
 
+class DateParser:
+    """ Parser for a column of date strings sharing a single format
+
+    The format is sniffed from the first string and locked, subsequent strings are
+    parsed without sniffing, with a fixed width parser when one is available for the
+    format or with datetime.strptime otherwise. Strings in a different format may
+    raise ValueError or, for fixed width formats with the same separators at different
+    positions, be parsed incorrectly, so use it only for homogeneous data.
+
+    Parameters
+    ----------
+    fmt: optional strptime format string to use instead of sniffing
+
+    Example
+    -------
+    >>> parse = DateParser()
+    >>> [parse(s) for s in ['2012-01-31', '2012-02-29']]
+    """
+
+    def __init__(self, fmt=None):
+        self.format = fmt
+        self._parse = None
+        if fmt is not None:
+            self._parse = lambda dtstr: datetime.datetime.strptime(dtstr, fmt)
+
+    def _lock(self, dtstr):
+        fmtstring = dtstr.translate(_format_translation)
+        self.format = sniff_datetime_format(dtstr)
+        parser = _fixed_width_parsers.get(fmtstring)
+        if parser is not None:
+            width = len(dtstr)
+            fmt = self.format
+            def parse(dtstr):
+                if len(dtstr) == width:
+                    return parser(dtstr)
+                return datetime.datetime.strptime(dtstr, fmt)
+            self._parse = parse
+        else:
+            self._parse = lambda dtstr: datetime.datetime.strptime(dtstr, self.format)
+
+    def __call__(self, dtstr):
+        if self._parse is None:
+            self._lock(dtstr)
+        return self._parse(dtstr)
+
+def asordinal(dt):
+    """ Proleptic Gregorian ordinal of a date given in any representation accepted by asdatetime
+
+    Integers (including NumPy integer scalars) are taken to be ordinals already,
+    NumPy datetime64 scalars are accepted as well.
+    """
+    if isinstance(dt, datetime.date):
+        return dt.toordinal()
+    elif isinstance(dt, int):
+        return dt
+    elif isinstance(dt, str):
+        return _parse_datetime_string(dt).toordinal()
+    elif isinstance(dt, numbers.Integral):
+        return int(dt)
+    elif getattr(dt, 'dtype', None) is not None and dt.dtype.kind == 'M':
+        import numpy as np
+        if np.isnat(dt):
+            raise ValueError("Cannot extract date from: %s" % repr(dt))
+        return int(dt.astype('datetime64[D]').astype(np.int64)) + DATETIME64_EPOCH_ORDINAL
+    return asdatetime(dt).toordinal()
+
+def asordinal_array(dates):
+    """ Convert dates to a NumPy array of proleptic Gregorian ordinals
+
+    Parameters
+    ----------
+    dates: numpy datetime64 array, array of integer ordinals or a sequence of
+        dates in any representation accepted by asdatetime
+
+    Returns
+    -------
+    numpy.ndarray of int64 ordinals
+    """
+    import numpy as np
+    arr = np.asarray(dates)
+    if arr.dtype.kind == 'M':
+        return arr.astype('datetime64[D]').astype(np.int64) + DATETIME64_EPOCH_ORDINAL
+    elif arr.dtype.kind in 'iu':
+        return arr.astype(np.int64)
+    else:
+        return np.fromiter(map(asordinal, arr.ravel()), dtype=np.int64, count=arr.size).reshape(arr.shape)
+
+def ordinals_to_datetime64(ordinals):
+    """ Convert array of proleptic Gregorian ordinals to numpy datetime64[D] array
+    """
+    import numpy as np
+    return (np.asarray(ordinals, dtype=np.int64) - DATETIME64_EPOCH_ORDINAL).astype('datetime64[D]')
+
+# Maximum width of fields of strptime directives used in _datetime_format_strings
+_directive_widths = dict({'Y': 4, 'y': 2, 'm': 2, 'd': 2, 'b': 3, 'H': 2, 'M': 2, 'S': 2})
+
+def _check_format(fmt):
+    """ Raise ValueError unless fmt only uses directives of _directive_widths and
+        has a year, a month and a day
+    """
+    directives = []
+    i = 0
+    while i < len(fmt):
+        if fmt[i] == '%':
+            directive = fmt[i+1:i+2]
+            if directive not in _directive_widths:
+                raise ValueError("Unsupported directive '%%%s' in date format %s" % (directive, fmt))
+            if directive in directives:
+                raise ValueError("Repeated directive '%%%s' in date format %s" % (directive, fmt))
+            directives.append(directive)
+            i += 2
+        else:
+            i += 1
+    for choices, field in [('Yy', 'year'), ('mb', 'month'), ('d', 'day')]:
+        if not any(directive in directives for directive in choices):
+            raise ValueError("Date format %s has no %s" % (fmt, field))
+
+def _field_layout(shape, fmt):
+    """ Positions of fields of a format string in a fixed width date string shape
+
+    Returns
+    -------
+    dict of directive letter to (start, stop) positions and list of (position, character)
+    for literal characters
+    """
+    fields = dict()
+    literals = []
+    pos = 0
+    i = 0
+    while i < len(fmt):
+        if fmt[i] == '%':
+            directive = fmt[i+1]
+            kind = 'L' if directive == 'b' else 'd'
+            end = pos
+            while end < len(shape) and end - pos < _directive_widths[directive] and shape[end] == kind:
+                end += 1
+            if end == pos or (directive in 'Yb' and end - pos != _directive_widths[directive]):
+                raise ValueError("Date shape %s does not match format %s" % (shape, fmt))
+            fields[directive] = (pos, end)
+            pos = end
+            i += 2
+        else:
+            if pos >= len(shape) or shape[pos] != fmt[i]:
+                raise ValueError("Date shape %s does not match format %s" % (shape, fmt))
+            literals.append((pos, fmt[i]))
+            pos += 1
+            i += 1
+    if pos != len(shape):
+        raise ValueError("Date shape %s does not match format %s" % (shape, fmt))
+    return fields, literals
+
+def _parse_fixed_width_rows(rows, fmt):
+    """ Parse 2D uint8 array of equally shaped date strings into datetime64[D]
+
+    Returns
+    -------
+    tuple of datetime64[D] array and boolean array marking rows that could not be parsed
+    """
+    import numpy as np
+    first = bytes(rows[0]).decode('ascii')
+    shape = first.translate(_format_translation)
+    if fmt is None:
+        fmt = sniff_datetime_format(first)
+    fields, literals = _field_layout(shape, fmt)
+    invalid = np.zeros(len(rows), dtype=bool)
+    for pos, char in literals:
+        invalid |= rows[:, pos] != ord(char)
+
+    def number(start, stop):
+        value = np.zeros(len(rows), dtype=np.int64)
+        for j in range(start, stop):
+            digit = rows[:, j].astype(np.int64) - ord('0')
+            invalid[:] |= (digit < 0) | (digit > 9)
+            value = value*10 + digit
+        return value
+
+    values = dict((directive, number(*fields[directive]))
+                  for directive in fields if directive != 'b')
+    if 'Y' in values:
+        year = values['Y']
+    else:
+        # same pivot as in datetime.strptime
+        year = np.where(values['y'] < 69, 2000 + values['y'], 1900 + values['y'])
+    if 'b' in fields:
+        start = fields['b'][0]
+        lower = rows[:, start:start+3].astype(np.int64) | 0x20
+        keys = (lower[:, 0] << 16) | (lower[:, 1] << 8) | lower[:, 2]
+        names = sorted(_month_abbreviations)
+        table = np.array([(ord(n[0]) << 16) | (ord(n[1]) << 8) | ord(n[2]) for n in names])
+        idx = np.minimum(np.searchsorted(table, keys), len(table) - 1)
+        invalid |= table[idx] != keys
+        month = np.array([_month_abbreviations[n] for n in names])[idx]
+    else:
+        month = values['m']
+    day = values['d']
+    invalid |= (year < 1) | (month < 1) | (month > MONTHS_IN_YEAR) | (day < 1)
+    # time of day fields are dropped, but must be valid as for asdatetime
+    for directive, limit in [('H', 23), ('M', 59), ('S', 59)]:
+        if directive in values:
+            invalid |= values[directive] > limit
+    month = np.where(invalid, 1, month)
+    year = np.where(invalid, 1970, year)
+    months = ((year - 1970)*MONTHS_IN_YEAR + month - 1).astype('datetime64[M]')
+    first = months.astype('datetime64[D]')
+    invalid |= day > ((months + 1).astype('datetime64[D]') - first).astype(np.int64)
+    return first + np.where(invalid, 0, day - 1), invalid
+
+def parse_dates(column, fmt=None, ordinals=False):
+    """ Parse a column of date strings in bulk
+
+    Rows are grouped by their shape (positions of digits, letters and separators), the
+    format is sniffed once per shape from _datetime_format_strings unless given, and
+    fields are extracted with NumPy operations over the bytes of all rows at once, so
+    no datetime object is created per row.
+
+    Parameters
+    ----------
+    column: list of date strings, or bytes, bytearray or memoryview with one ASCII date
+        per line (lines may end with '\\n' or '\\r\\n'), empty rows are invalid
+    fmt: optional strptime format string for all rows, e.g. '%Y-%m-%d'
+    ordinals: return array.array('i') of proleptic Gregorian ordinals instead of
+        numpy datetime64[D] array
+
+    Returns
+    -------
+    numpy datetime64[D] array or array.array('i') of ordinals
+    """
+    import numpy as np
+    if fmt is not None:
+        _check_format(fmt)
+    if isinstance(column, (bytes, bytearray, memoryview)):
+        data = np.frombuffer(column, dtype=np.uint8)
+        if len(data) and data[-1] != ord('\n'):
+            data = np.append(data, np.uint8(ord('\n')))
+    else:
+        # every string is a row, including empty ones
+        data = np.frombuffer(''.join(dtstr + '\n' for dtstr in column).encode('ascii'), dtype=np.uint8)
+    if not len(data):
+        return array.array('i') if ordinals else np.zeros(0, dtype='datetime64[D]')
+    ends = np.flatnonzero(data == ord('\n'))
+    starts = np.concatenate(([0], ends[:-1] + 1)).astype(np.int64)
+    lengths = ends - starts
+    carriage_return = (lengths > 0) & (data[np.maximum(ends - 1, 0)] == ord('\r'))
+    lengths = lengths - carriage_return
+
+    result = np.zeros(len(starts), dtype='datetime64[D]')
+    invalid = lengths == 0
+    stride = int(ends[0]) + 1 if len(ends) else 0
+    for length in np.unique(lengths[lengths > 0]):
+        idx = np.flatnonzero(lengths == length)
+        if len(idx) == len(starts) and len(data) == stride*len(starts):
+            # all lines have the same width, rows are a view of the buffer
+            rows = data.reshape(len(starts), stride)[:, :length]
+        else:
+            rows = data[starts[idx, None] + np.arange(length)]
+        # classify characters the same way as sniff_datetime_format does
+        lower = rows | 0x20
+        classes = np.where((rows >= ord('0')) & (rows <= ord('9')), ord('d'),
+                           np.where((lower >= ord('a')) & (lower <= ord('z')), ord('L'), rows))
+        # group rows by shape, there are only a few distinct shapes in a column
+        remaining = np.ones(len(idx), dtype=bool)
+        while remaining.any():
+            first = np.argmax(remaining)
+            group = remaining & (classes == classes[first]).all(axis=1)
+            remaining &= ~group
+            try:
+                parsed, bad = _parse_fixed_width_rows(rows[group], fmt)
+            except (ValueError, UnicodeDecodeError):
+                bad = np.ones(int(group.sum()), dtype=bool)
+                parsed = np.zeros(len(bad), dtype='datetime64[D]')
+            result[idx[group]] = parsed
+            invalid[idx[group]] = bad
+
+    if invalid.any():
+        row = int(np.flatnonzero(invalid)[0])
+        text = bytes(data[starts[row]:starts[row]+lengths[row]]).decode('ascii', 'replace')
+        raise ValueError("Cannot parse date in row %d: %r" % (row, text))
+    if ordinals:
+        out = array.array('i')
+        out.frombytes((result.astype(np.int64) + DATETIME64_EPOCH_ORDINAL).astype(np.int32).tobytes())
+        return out
+    return result
+
+def _ymd_arrays(ordinals):
+    """ Year, month and day arrays of proleptic Gregorian ordinals
+    """
+    import numpy as np
+    days = ordinals_to_datetime64(ordinals)
+    months = days.astype('datetime64[M]')
+    years = months.astype('datetime64[Y]')
+    y = years.astype(np.int64) + 1970
+    m = (months - years).astype(np.int64) + 1
+    d = (days - months).astype(np.int64) + 1
+    return y, m, d
+
+def _leapyear_array(years):
+    """ Vectorized leapyear for integer array of years
+    """
+    import numpy as np
+    years = np.asarray(years)
+    julian = years % 4 == 0
+    return np.where(years <= 1752, julian, julian & ((years % 100 != 0) | (years % 400 == 0)))
+
+def _days_in_month_array(y, m):
+    """ Number of days in month (leap years according to leapyear) for arrays of years and months
+    """
+    import numpy as np
+    days = np.array(_days_in_month, dtype=np.int64)[m]
+    return days + ((m == 2) & _leapyear_array(y))
+
+def _leapyears_through(year):
+    """ Number of leap years (in the sense of leapyear) from year 1 to year inclusive
+    """
+    if year <= 1752:
+        return year // 4
+    return (1752 // 4 + (year // 4 - 1752 // 4) - (year // 100 - 1752 // 100)
+            + (year // 400 - 1752 // 400))
+
+def _leapyears_through_array(years):
+    """ Number of leap years (in the sense of leapyear) from year 1 to year inclusive
+    """
+    import numpy as np
+    years = np.asarray(years, dtype=np.int64)
+    julian = years // 4
+    gregorian = (1752 // 4 + (years // 4 - 1752 // 4) - (years // 100 - 1752 // 100)
+                 + (years // 400 - 1752 // 400))
+    return np.where(years <= 1752, julian, gregorian)
+
 def asyear(dt):
     """ Extract year value from integer, date string, datetime.date or datetime.datetime class
     """
@@ -101,18 +503,43 @@ _days_in_month =  [0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]
 _days_in_month_so_far = [0, 0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334]
 
 
-def eom(year, month):
+def _jan1_ordinal(year):
+    """ Proleptic Gregorian ordinal of January 1st of the year
+    """
+    y = year - 1
+    return 365*y + y//4 - y//100 + y//400 + 1
+
+def _month_start_ordinal(year, month):
+    """ Proleptic Gregorian ordinal of the first day of the month
+    """
+    ordinal = _jan1_ordinal(year) + _days_in_month_so_far[month]
+    # ordinals follow the Gregorian rule for all years, unlike leapyear
+    if month > 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0):
+        ordinal += 1
+    return ordinal
+
+def _days_in_month_of(year, month):
     if month == 2 and leapyear(year):
-        d = 29
-    else:
-        d = _days_in_month[month]
+        return 29
+    return _days_in_month[month]
+
+def eom(year, month, ordinal=False):
+    """ Last day of the month, as datetime.datetime or as proleptic Gregorian ordinal
+    """
+    d = _days_in_month_of(year, month)
+    if ordinal:
+        # February 29th of Julian only leap years does not exist in the proleptic
+        # Gregorian calendar, raise as datetime.datetime does
+        if d == 29 and month == 2 and not (year % 100 != 0 or year % 400 == 0):
+            raise ValueError("day is out of range for month")
+        return _month_start_ordinal(year, month) + d - 1
     return datetime.datetime(year, month, d)
 
 def iseom(dt):
-    """ Check if date is end of the month
+    """ Check if date (or proleptic Gregorian ordinal) is end of the month
     """
-    dt = asdatetime(dt)
-    return eom(dt.year, dt.month) == dt
+    dt = datetime.date.fromordinal(asordinal(dt))
+    return _days_in_month_of(dt.year, dt.month) == dt.day
 
 def lweekday(year, month, weekday):
     """ Date of the last occurrence of weekday in month of a given year
@@ -1,9 +1,23 @@
+import array
+import collections
 import datetime
+import itertools
 
 # TODO
 # * refactor out alias lookup module
 
-from findates.dateutils import asdatetime, eom, iseom, leapyear, yeardays
+from findates.dateutils import asdatetime, asordinal, leapyear, yeardays
+from findates.dateutils.dateutils import (
+    _days_in_month_array,
+    _days_in_month_of,
+    _jan1_ordinal,
+    _leapyear_array,
+    _leapyears_through,
+    _leapyears_through_array,
+    _ymd_arrays,
+    asordinal_array
+)
+from findates.profiling import profiler as _profiler
 
 _dc_norm = dict({
     '30/360 US': '30/360 US',
@@ -64,28 +78,418 @@ def _normalize_daycount_convention(convention):
     convention = convention.upper()
     return _dc_norm[convention]
 
-def _period_has_29feb(dt1, dt2):
-    have_29_feb = False
-    y1 = dt1.year
-    y2 = dt2.year
-    for y in range(y1, y2+1):
-        if leapyear(y) and (
-            (y!=y1 and y!=y2)
-            or (y == y1 and dt1<datetime.datetime(y1, 2, 29))
-            or (y == y2 and datetime.datetime(y2, 2, 29) <= dt2)):
-            have_29_feb = True
-    return have_29_feb
+def _period_has_29feb_ordinal(o1, o2, y1, y2):
+    """ Check if February 29th falls after the first and on or before the second date,
+        given as ordinals and their years, in constant time
+    """
+    if y2 < y1:
+        return False
+    # leap years strictly between y1 and y2
+    if y2 - y1 >= 2 and _leapyears_through(y2 - 1) - _leapyears_through(y1) > 0:
+        return True
+    # ordinal of February 29th is that of March 1st minus one in leap years
+    if leapyear(y1) and o1 < _jan1_ordinal(y1) + 59:
+        return True
+    return leapyear(y2) and _jan1_ordinal(y2) + 59 <= o2
 
 
 def _daycount_parameters(dt1, dt2, convention, **kwargs):
     """ Return number of days and total number of days (i.e. numerator and
         denominator in the counting of year fraction between dates
     """
-    convention = _normalize_daycount_convention(convention)
-    dt1 = asdatetime(dt1)
-    dt2 = asdatetime(dt2)
+    return get_daycounter(convention, **kwargs).parameters(dt1, dt2)
+
+def _profiled_parameters(function, convention, o1, o2, eom, yearly):
+    """ Parameters computed by one of _daycount_functions, recorded by the profiler
+    """
+    started = _profiler.clock()
+    result = function(o1, o2, eom, yearly)
+    _profiler.add('daycount.parameters', _profiler.clock() - started, label=convention)
+    return result
+
+# Parameters for each normalized convention, computed from proleptic Gregorian ordinals.
+# All functions take the eom and yearly frequency flags, most of them ignore them.
+
+def _thirty_360(y1, m1, d1, y2, m2, d2):
+    num_days = (360*(y2-y1)+30*(m2-m1)+(d2-d1))
+    return num_days, 360, float(num_days)/360
+
+def _thirty_360_us(o1, o2, eom, yearly):
+    dt1 = datetime.date.fromordinal(o1)
+    dt2 = datetime.date.fromordinal(o2)
+    y1, m1, d1 = dt1.year, dt1.month, dt1.day
+    y2, m2, d2 = dt2.year, dt2.month, dt2.day
+    # US adjustments
+    eom1 = eom and m1 == 2 and d1 == _days_in_month_of(y1, m1)
+    if eom1 and m2 == 2 and d2 == _days_in_month_of(y2, m2):
+        d2 = 30
+    if eom1:
+        d1 = 30
+    if d2 == 31 and d1>=30:
+        d2 = 30
+    if d1 == 31:
+        d1 = 30
+    return _thirty_360(y1, m1, d1, y2, m2, d2)
+
+def _thirty_e_360(o1, o2, eom, yearly):
+    dt1 = datetime.date.fromordinal(o1)
+    dt2 = datetime.date.fromordinal(o2)
+    return _thirty_360(dt1.year, dt1.month, min(dt1.day, 30), dt2.year, dt2.month, min(dt2.day, 30))
+
+def _thirty_e_360_isda(o1, o2, eom, yearly):
+    dt1 = datetime.date.fromordinal(o1)
+    dt2 = datetime.date.fromordinal(o2)
     y1, m1, d1 = dt1.year, dt1.month, dt1.day
     y2, m2, d2 = dt2.year, dt2.month, dt2.day
+    if d1 == _days_in_month_of(y1, m1):
+        d1 = 30
+    if d2 == _days_in_month_of(y2, m2) and m2 != 2:
+        d2 = 30
+    return _thirty_360(y1, m1, d1, y2, m2, d2)
+
+def _thirty_e_plus_360(o1, o2, eom, yearly):
+    dt1 = datetime.date.fromordinal(o1)
+    dt2 = datetime.date.fromordinal(o2)
+    y1, m1, d1 = dt1.year, dt1.month, dt1.day
+    y2, m2, d2 = dt2.year, dt2.month, dt2.day
+    if d1 == 31:
+        d1 = 30
+    if d2 == 31:
+        m2 += 1
+        if m2 == 13:
+            m2 = 1
+            y2 += 1
+        d2 = 1
+    return _thirty_360(y1, m1, d1, y2, m2, d2)
+
+def _actual_actual_isda(o1, o2, eom, yearly):
+    y1 = datetime.date.fromordinal(o1).year
+    y2 = datetime.date.fromordinal(o2).year
+    if y2 == y1:
+        year_days = yeardays(y1)
+        return o2 - o1, year_days, float(o2 - o1)/year_days
+    num_days = 0
+    year_days = 0
+    # full years between y1 and y2 exclusive contribute exactly 1.0 each
+    full_years = max(y2 - y1 - 1, 0)
+    if full_years:
+        num_days = 365*full_years + _leapyears_through(y2 - 1) - _leapyears_through(y1)
+        year_days = num_days
+    factor = float(full_years)
+    # days in the remaining part of the first year
+    num = _jan1_ordinal(y1+1) - o1
+    den = yeardays(y1)
+    num_days += num
+    year_days += den
+    factor += float(num)/den
+    # days in the beginning of the last year
+    num = o2 - _jan1_ordinal(y2)
+    den = yeardays(y2)
+    num_days += num
+    year_days += den
+    factor += float(num)/den
+    return num_days, year_days, factor
+
+def _actual_365_fixed(o1, o2, eom, yearly):
+    return o2 - o1, 365, float(o2 - o1)/365
+
+def _actual_360(o1, o2, eom, yearly):
+    return o2 - o1, 360, float(o2 - o1)/360
+
+def _actual_365l(o1, o2, eom, yearly):
+    if yearly:
+        y1 = datetime.date.fromordinal(o1).year
+        y2 = datetime.date.fromordinal(o2).year
+        year_days = 366 if _period_has_29feb_ordinal(o1, o2, y1, y2) else 365
+    else:
+        year_days = 366 if leapyear(datetime.date.fromordinal(o2).year) else 365
+    return o2 - o1, year_days, float(o2 - o1)/year_days
+
+def _actual_actual_afb(o1, o2, eom, yearly):
+    y1 = datetime.date.fromordinal(o1).year
+    y2 = datetime.date.fromordinal(o2).year
+    year_days = 366 if _period_has_29feb_ordinal(o1, o2, y1, y2) else 365
+    return o2 - o1, year_days, float(o2 - o1)/year_days
+
+_daycount_functions = dict({
+    '30/360 US': _thirty_360_us,
+    '30E/360': _thirty_e_360,
+    '30E/360 ISDA': _thirty_e_360_isda,
+    '30E+/360': _thirty_e_plus_360,
+    'ACTUAL/ACTUAL ISDA': _actual_actual_isda,
+    'ACTUAL/365 FIXED': _actual_365_fixed,
+    'ACTUAL/360': _actual_360,
+    'ACTUAL/365L': _actual_365l,
+    'ACTUAL/ACTUAL AFB': _actual_actual_afb
+})
+
+class DayCounter:
+    """ Daycount convention with aliases and options resolved, see get_daycounter
+
+    Calling the object is the same as calling its yearfrac method.
+    """
+    __slots__ = ('convention', 'options', '_function', '_eom', '_yearly')
+
+    def __init__(self, convention, **kwargs):
+        self.convention = _normalize_daycount_convention(convention)
+        self.options = kwargs
+        self._function = _daycount_functions[self.convention]
+        self._eom = 'eom' in kwargs and kwargs['eom']
+        self._yearly = 'frequency' in kwargs and kwargs['frequency'] == 'yearly'
+
+    def __repr__(self):
+        options = ''.join(', %s=%r' % item for item in sorted(self.options.items()))
+        return 'DayCounter(%r%s)' % (self.convention, options)
+
+    def parameters(self, dt1, dt2):
+        """ Number of days, total number of days and year fraction between dates
+        """
+        if _profiler.enabled:
+            return _profiled_parameters(self._function, self.convention, asordinal(dt1),
+                                        asordinal(dt2), self._eom, self._yearly)
+        return self._function(asordinal(dt1), asordinal(dt2), self._eom, self._yearly)
+
+    def yearfrac(self, dt1, dt2):
+        """ Fractional number of years between two dates
+        """
+        if _profiler.enabled:
+            return self.parameters(dt1, dt2)[2]
+        return self._function(asordinal(dt1), asordinal(dt2), self._eom, self._yearly)[2]
+
+    __call__ = yearfrac
+
+    def daydiff(self, dt1, dt2):
+        """ Difference in days between two dates
+        """
+        if _profiler.enabled:
+            return self.parameters(dt1, dt2)[0]
+        return self._function(asordinal(dt1), asordinal(dt2), self._eom, self._yearly)[0]
+
+    def yearfracs(self, start, ends):
+        """ Year fractions from a start date to each of the end dates
+
+        Returns
+        -------
+        list of floats, same as [self.yearfrac(start, end) for end in ends]
+        """
+        function, eom, yearly = self._function, self._eom, self._yearly
+        o1 = asordinal(start)
+        if _profiler.enabled:
+            return [self.parameters(o1, end)[2] for end in ends]
+        return [function(o1, asordinal(end), eom, yearly)[2] for end in ends]
+
+    def yearfrac_array(self, start, end):
+        """ Vectorized yearfrac, see module function yearfrac_array
+        """
+        return yearfrac_array(start, end, self.convention, **self.options)
+
+# registry of DayCounter objects by convention name as given and options
+DAYCOUNTER_CACHE_SIZE = 256
+_daycounters = dict()
+
+def get_daycounter(convention, **kwargs):
+    """ DayCounter object for a daycount convention and its options (eom, frequency)
+
+    Objects are cached, so repeated calls with the same arguments return the same
+    object. Hot loops should get the object once and call its methods, which skip
+    alias and option handling entirely.
+
+    Example
+    -------
+    >>> dc = get_daycounter('30/360 US', eom=True)
+    >>> dc.yearfrac('28 Feb 2011', '31 Aug 2011')
+    """
+    key = (convention, tuple(sorted(kwargs.items()))) if kwargs else convention
+    try:
+        counter = _daycounters.get(key)
+    except TypeError:
+        # unhashable option values
+        return DayCounter(convention, **kwargs)
+    if counter is None:
+        counter = DayCounter(convention, **kwargs)
+        if len(_daycounters) < DAYCOUNTER_CACHE_SIZE:
+            _daycounters[key] = counter
+    return counter
+
+def yearfrac(dt1, dt2, convention, **kwargs):
+    """ Fractional number of years between two dates according to a given
+        daycount convention
+    """
+    # registered counters without options are looked up directly, see get_daycounter
+    counter = None if kwargs else _daycounters.get(convention)
+    if counter is None:
+        counter = get_daycounter(convention, **kwargs)
+    if _profiler.enabled:
+        return counter.parameters(dt1, dt2)[2]
+    return counter._function(asordinal(dt1), asordinal(dt2), counter._eom, counter._yearly)[2]
+
+def iyearfractions(dates, convention, **kwargs):
+    """ Lazily convert dates to zero based float year values
+
+    Generator version of yearfractions. The first date is parsed and the convention
+    is resolved only once, so that it can be used over long streams of dates, e.g.
+    read from a file.
+
+    Parameters
+    ----------
+    dates: iterable of datetime.date or datetime.datetime or strings representing dates
+    convention: daycount convention
+
+    Yields
+    ------
+    float year values relative to the first date, same as yearfrac(first, date, convention)
+    """
+    convention = _normalize_daycount_convention(convention)
+    dts = iter(dates)
+    try:
+        anchor = datetime.date.fromordinal(asordinal(next(dts)))
+    except StopIteration:
+        return
+    dts = itertools.chain([anchor], dts)
+
+    if convention == 'ACTUAL/ACTUAL ISDA':
+        # part of the first year is constant, boundaries of the current year are
+        # updated only when the date moves to a different year
+        y1 = anchor.year
+        o1 = anchor.toordinal()
+        yd1 = yeardays(y1)
+        head = float(_jan1_ordinal(y1+1) - o1)/yd1
+        y2 = None
+        jan1 = next_jan1 = 0
+        for dt in dts:
+            o2 = asordinal(dt)
+            if not jan1 <= o2 < next_jan1:
+                y2 = datetime.date.fromordinal(o2).year
+                jan1 = _jan1_ordinal(y2)
+                next_jan1 = _jan1_ordinal(y2+1)
+                yd2 = yeardays(y2)
+            if y2 == y1:
+                yield float(o2 - o1)/yd1
+            else:
+                # full years contribute exactly 1.0 each, summed as in _daycount_parameters
+                yield (float(max(y2-y1-1, 0)) + head) + float(o2 - jan1)/yd2
+    else:
+        o1 = anchor.toordinal()
+        counter = get_daycounter(convention, **kwargs)
+        function, eom, yearly = counter._function, counter._eom, counter._yearly
+        for dt in dts:
+            yield function(o1, asordinal(dt), eom, yearly)[2]
+
+def yearfractions(dates, convention, **kwargs):
+    """ Convert dates to zero based float year value.
+
+    Parameters
+    ----------
+    dates: list of datetime.date or datetime.datetime or strings representing dates
+    convention: daycount convention
+
+    Returns
+    -------
+    list of floats with 0.0 as the start corresponding to the first
+    value in the list, all subsequent dates are converted to float year
+    values by application of 'yearfrac' function.
+    """
+    return list(iyearfractions(dates, convention, **kwargs))
+
+def yearfractions_array(dates, convention, out=None, **kwargs):
+    """ Bulk version of yearfractions writing into a preallocated buffer
+
+    Parameters
+    ----------
+    dates: iterable of dates accepted by yearfractions. NumPy arrays of datetime64
+        values or integer ordinals are processed with yearfrac_array.
+    convention: daycount convention
+    out: optional writable buffer of floats (array.array('d'), numpy array) with at
+        least as many elements as dates. If not given, array.array('d') is allocated.
+
+    Returns
+    -------
+    out, or array.array('d') if out is not given, with float year values relative
+    to the first date
+    """
+    if getattr(dates, 'dtype', None) is not None and dates.dtype.kind in 'Miu':
+        if len(dates) == 0:
+            return out if out is not None else array.array('d')
+        values = yearfrac_array(dates[0], dates, convention, **kwargs)
+        if out is None:
+            return array.array('d', values.astype('d').tobytes())
+        if isinstance(out, array.array):
+            # array.array only accepts slices of another array.array
+            out[:len(values)] = array.array('d', values.astype('d').tobytes())
+        else:
+            out[:len(values)] = values
+        return out
+
+    if out is None:
+        if hasattr(dates, '__len__'):
+            out = array.array('d', bytes(array.array('d').itemsize * len(dates)))
+        else:
+            return array.array('d', iyearfractions(dates, convention, **kwargs))
+    for i, value in enumerate(iyearfractions(dates, convention, **kwargs)):
+        out[i] = value
+    return out
+
+def daydiff(dt1, dt2, convention, **kwargs):
+    """ Calculate difference in days between two dates according to a given
+        daycount convention
+    """
+    counter = None if kwargs else _daycounters.get(convention)
+    if counter is None:
+        counter = get_daycounter(convention, **kwargs)
+    if _profiler.enabled:
+        return counter.parameters(dt1, dt2)[0]
+    return counter._function(asordinal(dt1), asordinal(dt2), counter._eom, counter._yearly)[0]
+
+
+def _jan1_ordinal_array(y):
+    """ Proleptic Gregorian ordinal of January 1st for an array of years
+    """
+    p = y - 1
+    return 365*p + p//4 - p//100 + p//400 + 1
+
+def _yeardays_array(y):
+    import numpy as np
+    return np.where(_leapyear_array(y), 366, 365)
+
+def _period_has_29feb_array(y1, m1, d1, y2, m2, d2):
+    """ Vectorized _period_has_29feb_ordinal for date components
+    """
+    forward = y1 <= y2
+    before_29feb_1 = (m1 < 2) | ((m1 == 2) & (d1 < 29))
+    after_29feb_2 = (m2 > 2) | ((m2 == 2) & (d2 >= 29))
+    # leap years strictly between y1 and y2
+    between = (y2 - y1 >= 2) & (_leapyears_through_array(y2 - 1) - _leapyears_through_array(y1) > 0)
+    first = forward & _leapyear_array(y1) & before_29feb_1
+    last = forward & _leapyear_array(y2) & after_29feb_2
+    return between | first | last
+
+def _daycount_parameters_array(start, end, convention, **kwargs):
+    """ Vectorized _daycount_parameters
+
+    Returns
+    -------
+    tuple of numpy arrays with number of days, total number of days and year fraction
+    """
+    if _profiler.enabled:
+        started = _profiler.clock()
+        result = _compute_parameters_array(start, end, convention, **kwargs)
+        _profiler.add('daycount.parameters_array', _profiler.clock() - started, result[0].size,
+                      _normalize_daycount_convention(convention))
+        return result
+    return _compute_parameters_array(start, end, convention, **kwargs)
+
+def _compute_parameters_array(start, end, convention, **kwargs):
+    import numpy as np
+    convention = _normalize_daycount_convention(convention)
+    o1, o2 = np.broadcast_arrays(asordinal_array(start), asordinal_array(end))
+    if convention in {'ACTUAL/365 FIXED', 'ACTUAL/360'}:
+        # no calendar fields needed
+        num_days = o2 - o1
+        year_days = np.full(num_days.shape, 365 if convention == 'ACTUAL/365 FIXED' else 360,
+                            dtype=np.int64)
+        return num_days, year_days, num_days / year_days
+    y1, m1, d1 = _ymd_arrays(o1)
+    y2, m2, d2 = _ymd_arrays(o2)
     factor = None
 
     if convention in {'30/360 US', '30E/360', '30E/360 ISDA', '30E+/360'}:
@@ -93,117 +497,162 @@ def _daycount_parameters(dt1, dt2, convention, **kwargs):
 
         if convention == '30/360 US':
             # US adjustments
-            if eom and dt1.month == 2 and iseom(dt1) and dt2.month == 2 and iseom(dt2):
-                d2 = 30
-            if eom and dt1.month == 2 and iseom(dt1):
-                d1 = 30
-            if d2 == 31 and d1>=30:
-                d2 = 30
-            if d1 == 31:
-                d1 = 30
+            if eom:
+                feb_eom_1 = (m1 == 2) & (d1 == _days_in_month_array(y1, m1))
+                feb_eom_2 = (m2 == 2) & (d2 == _days_in_month_array(y2, m2))
+                d2 = np.where(feb_eom_1 & feb_eom_2, 30, d2)
+                d1 = np.where(feb_eom_1, 30, d1)
+            d2 = np.where((d2 == 31) & (d1 >= 30), 30, d2)
+            d1 = np.where(d1 == 31, 30, d1)
         elif convention == '30E/360':
-            if d1 == 31:
-                d1 = 30
-            if d2 == 31:
-                d2 = 30
+            d1 = np.minimum(d1, 30)
+            d2 = np.minimum(d2, 30)
         elif convention == '30E/360 ISDA':
-            if iseom(dt1):
-                d1 = 30
-            if iseom(dt2) and m2 != 2:
-                d2 = 30
+            eom_2 = (d2 == _days_in_month_array(y2, m2)) & (m2 != 2)
+            d1 = np.where(d1 == _days_in_month_array(y1, m1), 30, d1)
+            d2 = np.where(eom_2, 30, d2)
         elif convention == '30E+/360':
-            if d1 == 31:
-                d1 = 30
-            if d2 == 31:
-                m2 += 1
-                if m2 == 13:
-                    m2 = 1
-                    y2 += 1
-                d2 = 1
-
-        num_days = (360*(y2-y1)+30*(m2-m1)+(d2-d1))
-        year_days = 360
+            d1 = np.minimum(d1, 30)
+            roll = d2 == 31
+            december = roll & (m2 == 12)
+            m2 = np.where(december, 1, np.where(roll, m2 + 1, m2))
+            y2 = np.where(december, y2 + 1, y2)
+            d2 = np.where(roll, 1, d2)
+
+        num_days = 360*(y2-y1)+30*(m2-m1)+(d2-d1)
+        year_days = np.full(num_days.shape, 360, dtype=np.int64)
 
     elif convention == 'ACTUAL/ACTUAL ISDA':
-        num_days = 0
-        year_days = 0
+        same_year = y1 == y2
+        yd1 = _yeardays_array(y1)
+        yd2 = _yeardays_array(y2)
+        # full years between y1 and y2 exclusive
+        full_years = np.maximum(y2 - y1 - 1, 0)
+        full_leap = np.where(full_years > 0,
+                             _leapyears_through_array(y2 - 1) - _leapyears_through_array(y1), 0)
+        full_days = 365*full_years + full_leap
+        # days in the remaining part of the first year and in the beginning of the last year
+        num1 = _jan1_ordinal_array(y1 + 1) - o1
+        num2 = o2 - _jan1_ordinal_array(y2)
+        num_days = np.where(same_year, o2 - o1, full_days + num1 + num2)
+        year_days = np.where(same_year, yd1, full_days + yd1 + yd2)
+        # same order of floating point operations as in the scalar version
+        split = (full_years.astype(np.float64) + num1 / yd1) + num2 / yd2
+        factor = np.where(same_year, (o2 - o1) / yd1, split)
 
-        if y2 == y1:
-            num_days = (dt2 - dt1).days
-            year_days = yeardays(y1)
-        else:
-            # we need to calculate factor properly
-            factor = 0.0
-            # full years between y1 and y2 exclusive
-            for y in range(y1+1, y2):
-                yd = yeardays(y)
-                num_days += yd
-                year_days += yd
-                factor += float(num_days)/year_days
-            # days in the remaining part of the first year
-            num = (datetime.datetime(y1+1, 1, 1) - dt1).days
-            den = yeardays(y1)
-            num_days += num
-            year_days += den
-            factor += float(num)/den
-            # days in the beginning of the last year
-            num = (dt2 - datetime.datetime(y2, 1, 1)).days
-            den = yeardays(y2)
-            num_days += num
-            year_days += den
-            factor += float(num)/den
-
-    elif convention == 'ACTUAL/365 FIXED':
-        num_days = (dt2-dt1).days
-        year_days = 365
-    elif convention == 'ACTUAL/360':
-        num_days = (dt2-dt1).days
-        year_days = 360
     elif convention == 'ACTUAL/365L':
         yearly_frequency = 'frequency' in kwargs and kwargs['frequency'] =='yearly'
         if yearly_frequency:
-            year_days = 366 if _period_has_29feb(dt1, dt2) else 365
+            year_days = np.where(_period_has_29feb_array(y1, m1, d1, y2, m2, d2), 366, 365)
         else:
-            year_days = 366 if leapyear(dt2) else 365
-        num_days = (dt2-dt1).days
+            year_days = _yeardays_array(y2)
+        num_days = o2 - o1
     elif convention == 'ACTUAL/ACTUAL AFB':
-        year_days = 366 if _period_has_29feb(dt1, dt2) else 365
-        num_days = (dt2-dt1).days
+        year_days = np.where(_period_has_29feb_array(y1, m1, d1, y2, m2, d2), 366, 365)
+        num_days = o2 - o1
     else:
         raise ValueError('Unknown daycount convention \'%s\'' % convention)
 
     if factor is None:
-        factor = float(num_days)/year_days
+        factor = num_days / year_days
 
     return num_days, year_days, factor
 
-def yearfrac(dt1, dt2, convention, **kwargs):
-    """ Fractional number of years between two dates according to a given
-        daycount convention
+def yearfrac_array(start, end, convention, **kwargs):
+    """ Vectorized yearfrac over arrays of dates
+
+    Parameters
+    ----------
+    start, end: numpy datetime64 arrays, arrays of integer proleptic Gregorian
+        ordinals or sequences of dates accepted by asdatetime. Arrays are broadcast
+        against each other, so either can be a single date.
+    convention: daycount convention
+    Keyword parameters are the same as for yearfrac (eom, frequency)
+
+    Returns
+    -------
+    numpy float64 array with the same values as element-wise yearfrac
     """
-    return _daycount_parameters(dt1, dt2, convention, **kwargs)[2]
+    return _daycount_parameters_array(start, end, convention, **kwargs)[2]
 
-def yearfractions(dates, convention, **kwargs):
-    """ Convert dates to zero based float year value.
+def daydiff_array(start, end, convention, **kwargs):
+    """ Vectorized daydiff over arrays of dates, see yearfrac_array
+    """
+    return _daycount_parameters_array(start, end, convention, **kwargs)[0]
+
+AccrualFractions = collections.namedtuple('AccrualFractions', ['accrued', 'period'])
+
+def accrual_fractions(last_coupon, next_coupon, settlement, conventions, **kwargs):
+    """ Accrual fractions of a batch of coupon periods, e.g. of all bonds in a book
+
+    Rows are grouped by daycount convention (aliases of the same convention form one
+    group) and each group is computed with the vectorized daycount functions.
 
     Parameters
     ----------
-    dates: list of datetime.date or datetime.datetime or strings representing dates
-    convention: daycount convention
+    last_coupon, next_coupon, settlement: numpy datetime64 arrays, arrays of integer
+        proleptic Gregorian ordinals or sequences of dates accepted by asdatetime,
+        broadcast against each other
+    conventions: daycount convention of all rows or a sequence with the convention
+        of each row
+    Keyword parameters are the same as for yearfrac (eom, frequency)
 
     Returns
     -------
-    list of floats with 0.0 as the start corresponding to the first
-    value in the list, all subsequent dates are converted to float year
-    values by application of 'yearfrac' function.
+    AccrualFractions named tuple of numpy float64 arrays:
+        accrued: year fraction from the last coupon date to the settlement date
+        period: year fraction of the whole period from the last to the next coupon date
     """
-    if not dates:
-        return []
-    dts = map(asdatetime, dates)
-    return map(lambda x: yearfrac(dates[0], x, convention, **kwargs), dts)
+    import numpy as np
+    dates = [asordinal_array(last_coupon), asordinal_array(next_coupon), asordinal_array(settlement)]
+    if isinstance(conventions, str):
+        last, following, settle = np.broadcast_arrays(*dates)
+        return _accrual_group(last, following, settle, conventions, **kwargs)
 
-def daydiff(dt1, dt2, convention, **kwargs):
-    """ Calculate difference in days between two dates according to a given
-        daycount convention
+    last, following, settle, codes = np.broadcast_arrays(*dates, np.asarray(conventions, dtype=object))
+    codes = codes.ravel()
+    names = dict((name, k) for k, name in enumerate(set(codes)))
+    inverse = np.fromiter(map(names.__getitem__, codes), dtype=np.intp, count=codes.size)
+    inverse = inverse.reshape(last.shape)
+    groups = collections.defaultdict(list)
+    for name, k in names.items():
+        groups[_normalize_daycount_convention(name)].append(k)
+    if len(groups) == 1:
+        return _accrual_group(last, following, settle, next(iter(groups)), **kwargs)
+    accrued = np.empty(last.shape, dtype=np.float64)
+    period = np.empty(last.shape, dtype=np.float64)
+    for convention, ks in groups.items():
+        rows = inverse == ks[0] if len(ks) == 1 else np.isin(inverse, ks)
+        accrued[rows], period[rows] = _accrual_group(last[rows], following[rows], settle[rows],
+                                                     convention, **kwargs)
+    return AccrualFractions(accrued, period)
+
+def _accrual_group(last, following, settle, convention, **kwargs):
+    """ Accrual fractions of rows sharing a convention, computed in a single pass
+    """
+    import numpy as np
+    n = last.size
+    start = np.concatenate([last.ravel(), last.ravel()])
+    end = np.concatenate([settle.ravel(), following.ravel()])
+    fractions = _daycount_parameters_array(start, end, convention, **kwargs)[2]
+    return AccrualFractions(fractions[:n].reshape(last.shape), fractions[n:].reshape(last.shape))
+
+def accrued_interest(last_coupon, next_coupon, settlement, conventions, coupon_rates,
+                     notionals=1.0, **kwargs):
+    """ Accrued interest of a batch of fixed rate bonds
+
+    Accrued interest is coupon rate times notional times the accrued year fraction,
+    see accrual_fractions for the other parameters.
+
+    Parameters
+    ----------
+    coupon_rates: annual coupon rates of the rows (e.g. 0.05), or a single rate
+    notionals: notional amounts of the rows or a single amount
+
+    Returns
+    -------
+    numpy float64 array of accrued interest amounts
     """
-    return _daycount_parameters(dt1, dt2, convention, **kwargs)[0]
+    import numpy as np
+    accrued = accrual_fractions(last_coupon, next_coupon, settlement, conventions, **kwargs).accrued
+    return np.asarray(coupon_rates, dtype=np.float64) * np.asarray(notionals, dtype=np.float64) * accrued
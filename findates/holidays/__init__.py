@@ -1,3 +1,28 @@
 
 
-from .holidays import *
\ No newline at end of file
+from .holidays import *
+
+# Calendar files and definitions are loaded on first access (PEP 562), they import
+# mmap, tempfile, json and multiprocessing which would dominate the import time of
+# the package
+_lazy_names = dict({
+    'MappedCalendar': 'calendarfile',
+    'attach_calendars': 'calendarfile',
+    'cached_calendar': 'calendarfile',
+    'load_calendars': 'calendarfile',
+    'save_calendars': 'calendarfile',
+    'share_calendars': 'calendarfile',
+    'compile_calendar_definitions': 'calendardef',
+    'load_calendar_definitions': 'calendardef'
+})
+
+__all__ = [name for name in dir(holidays) if not name.startswith('_')] + sorted(_lazy_names)
+
+def __getattr__(name):
+    if name in _lazy_names:
+        import importlib
+        return getattr(importlib.import_module('.' + _lazy_names[name], __name__), name)
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazy_names))
@@ -0,0 +1,238 @@
+"""
+Calendar definitions in data files
+
+Calendars are defined in JSON (or TOML, with Python 3.11+) files instead of code.
+Holiday descriptions are the ones accepted by Calendar.add_holiday and are parsed
+once into holiday rules. The compiled rules are cached by the hash of the file
+contents, in memory and optionally in a cache directory, so loading unchanged
+files skips parsing altogether.
+
+File format (JSON, TOML uses [[calendars]] tables with the same keys):
+    {"calendars": [{
+        "code": "xlon",
+        "aliases": ["london stock exchange"],
+        "extends": "uk",
+        "weekend": ["Saturday", "Sunday"],
+        "holidays": [{"name": "Christmas", "date": "December 25th", "move": "next"}],
+        "closures": [{"name": "State Funeral", "date": "2022-09-19"}]
+    }]}
+
+A file may also contain a single calendar object. All keys but code are optional:
+extends starts from the rules of a calendar defined in the same file (in any order)
+or else of a built-in or registered calendar, weekend lists weekend days, holidays
+are recurring holidays and closures are one-off holidays on a specific date (any
+format accepted by asdatetime). The built-in calendars are defined in calendars.json
+in this package.
+"""
+
+import hashlib
+import json
+import os
+
+from findates.dateutils import asdatetime
+from findates.holidays.holidays import (
+    Calendar,
+    FixedDateHoliday,
+    IdiosyncraticHoliday,
+    SpecialHoliday,
+    WeekdayHoliday,
+    compile_holiday,
+    day_names,
+    get_calendar,
+    register_calendar
+)
+
+# version of the compiled representation, part of the cache key
+_COMPILED_FORMAT = 1
+
+# compiled definitions by hash of the file contents
+_compiled = dict()
+
+# definitions of the built-in calendars (see create_calendar), shipped with the package
+_builtin_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'calendars.json')
+_builtin = None
+
+_rule_types = dict({
+    'weekday': WeekdayHoliday,
+    'date': FixedDateHoliday,
+    'idiosyncratic': IdiosyncraticHoliday,
+    'special': SpecialHoliday
+})
+
+def _rule_spec(rule):
+    """ JSON serializable representation of a holiday rule, see _rule_types
+    """
+    if isinstance(rule, WeekdayHoliday):
+        return ['weekday', rule.name, rule.month, rule.order, rule.weekday, rule.move]
+    elif isinstance(rule, FixedDateHoliday):
+        return ['date', rule.name, rule.month, rule.day, rule.move]
+    elif isinstance(rule, IdiosyncraticHoliday):
+        return ['idiosyncratic', rule.name, rule.description, rule.move]
+    elif isinstance(rule, SpecialHoliday):
+        return ['special', rule.name, rule.year, rule.month, rule.day]
+    raise ValueError("Cannot serialize holiday rule %r" % rule)
+
+def _weekday_number(day_name):
+    for weekday, name in enumerate(day_names):
+        if name.lower() == day_name.lower():
+            return weekday
+    raise ValueError("Unknown weekend day '%s'" % day_name)
+
+def _compile_definition(definition, source):
+    if 'code' not in definition:
+        raise ValueError("Calendar definition without code in %s" % source)
+    code = definition['code'].lower()
+    weekend = [_weekday_number(day) for day in definition.get('weekend', [])]
+    rules = []
+    for holiday in definition.get('holidays', []):
+        try:
+            days, compiled = compile_holiday(holiday['name'], holiday['date'], holiday.get('move'))
+        except (KeyError, ValueError):
+            days, compiled = [], []
+        if not days and not compiled:
+            raise ValueError("Cannot parse holiday %r of calendar '%s' in %s" % (holiday, code, source))
+        weekend.extend(days)
+        rules.extend(compiled)
+    for closure in definition.get('closures', []):
+        dt = asdatetime(closure['date'])
+        rules.append(SpecialHoliday(closure.get('name', 'closure'), dt.year, dt.month, dt.day))
+    return dict({
+        'code': code,
+        'aliases': [alias.lower() for alias in definition.get('aliases', [])],
+        'extends': definition.get('extends'),
+        'weekend': sorted(set(weekend)),
+        'rules': [_rule_spec(rule) for rule in rules]
+    })
+
+def compile_calendar_definitions(data, source='<data>'):
+    """ Compile parsed contents of a calendar definition file
+
+    Returns
+    -------
+    JSON serializable list of compiled calendar definitions
+    """
+    definitions = data['calendars'] if 'calendars' in data else [data]
+    return [_compile_definition(definition, source) for definition in definitions]
+
+def _build_calendar(compiled, base=None):
+    """ Calendar object from a compiled calendar definition
+
+    base is the calendar the definition extends, looked up with get_calendar if None
+    """
+    calendar = Calendar()
+    if compiled['extends'] is not None:
+        if base is None:
+            base = get_calendar(compiled['extends'])
+        if not isinstance(base, Calendar):
+            raise ValueError("Calendar '%s' cannot extend '%s'" % (compiled['code'], compiled['extends']))
+        calendar.add_rules(base._compiled_rules,
+                           [weekday for weekday, workday in enumerate(base._weekdays) if not workday])
+    rules = [_rule_types[spec[0]](*spec[1:]) for spec in compiled['rules']]
+    calendar.add_rules(rules, compiled['weekend'])
+    return calendar
+
+def _parse_file(path, contents):
+    text = contents.decode('utf-8')
+    if path.lower().endswith('.toml'):
+        import tomllib
+        return tomllib.loads(text)
+    return json.loads(text)
+
+def _compiled_definitions(path, cache_dir):
+    with open(path, 'rb') as f:
+        contents = f.read()
+    digest = hashlib.sha256(contents).hexdigest()
+    key = '%s-%d' % (digest, _COMPILED_FORMAT)
+    compiled = _compiled.get(key)
+    if compiled is not None:
+        return compiled
+    cache_path = os.path.join(cache_dir, key + '.json') if cache_dir is not None else None
+    if cache_path is not None:
+        try:
+            with open(cache_path) as f:
+                compiled = json.load(f)
+        except (OSError, ValueError):
+            compiled = None
+    if compiled is None:
+        compiled = compile_calendar_definitions(_parse_file(path, contents), path)
+        if cache_path is not None:
+            _write_cache(cache_path, compiled)
+    _compiled[key] = compiled
+    return compiled
+
+def _write_cache(cache_path, compiled):
+    import tempfile
+    dirname = os.path.dirname(cache_path)
+    os.makedirs(dirname, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=dirname, prefix='.calendardef-')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(compiled, f)
+        os.replace(tmp_path, cache_path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+def _builtin_definitions():
+    """ Compiled definitions of the built-in calendars by code, compiled once per process
+    """
+    global _builtin
+    if _builtin is None:
+        _builtin = dict((compiled['code'], compiled)
+                        for compiled in _compiled_definitions(_builtin_path, None))
+    return _builtin
+
+def load_calendar_definitions(path, cache_dir=None, register=True):
+    """ Load calendars defined in a JSON or TOML file
+
+    Parameters
+    ----------
+    path: file name, TOML if it ends with .toml, JSON otherwise
+    cache_dir: directory for compiled definitions, keyed by the hash of the file
+        contents, None to cache them only in memory
+    register: register the calendars (and their aliases) for get_calendar, which
+        freezes them
+
+    Returns
+    -------
+    dict of calendar code to Calendar object
+    """
+    definitions = _compiled_definitions(path, cache_dir)
+    calendars = _build_calendars(definitions, path)
+    if register:
+        for compiled in definitions:
+            register_calendar(compiled['code'], calendars[compiled['code']], compiled['aliases'])
+    return dict((compiled['code'], calendars[compiled['code']]) for compiled in definitions)
+
+def _build_calendars(definitions, source):
+    """ Calendar objects of compiled definitions by code
+
+    Calendars extending a calendar of the same definitions (by code or alias) are
+    built after it, other extended calendars are looked up with get_calendar. A
+    calendar extending its own code extends the calendar registered before.
+    """
+    names = dict()
+    for compiled in definitions:
+        for name in [compiled['code']] + compiled['aliases']:
+            names.setdefault(name, compiled)
+    calendars = dict()
+    building = set()
+
+    def build(compiled):
+        code = compiled['code']
+        if code in calendars:
+            return calendars[code]
+        if code in building:
+            raise ValueError("Circular extends of calendar '%s' in %s" % (code, source))
+        building.add(code)
+        base = None
+        if compiled['extends'] is not None:
+            extended = names.get(compiled['extends'].lower())
+            if extended is not None and extended is not compiled:
+                base = build(extended)
+        calendars[code] = _build_calendar(compiled, base)
+        return calendars[code]
+
+    for compiled in definitions:
+        build(compiled)
+    return calendars
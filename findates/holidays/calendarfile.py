@@ -0,0 +1,371 @@
+"""
+Calendar files: precomputed holiday tables of several calendars in a single
+binary file that is memory mapped when loaded
+
+Processes loading the same file share one read-only copy of the tables in the
+page cache and answer queries for the stored years without computing holidays.
+The same contents can be published in a named shared memory block instead of a
+file, see share_calendars and attach_calendars.
+
+File layout (all integers in native byte order, recorded in the header):
+    8 bytes   magic
+    4 bytes   length of the JSON header (little endian unsigned)
+    header    JSON directory: for each calendar code its fingerprint, years,
+              names of holidays and positions of the tables in the data section
+    data      for each calendar, aligned to 8 bytes:
+              flags       one byte per day, 0 for business days, k > 0 for a holiday
+                          named names[k-1]
+              cumulative  int32 cumulative business day counts, see BusinessDayIndex
+              busdays     int32 ordinals of business days
+"""
+
+import array
+import datetime
+import json
+import mmap
+import os
+import struct
+import sys
+
+from findates.dateutils import asdatetime
+from findates.holidays.holidays import BusinessDayCalendar, BusinessDayIndex, get_calendar
+
+_MAGIC = b'FINDCAL1'
+_ALIGNMENT = 8
+# tables stored for each calendar, in file order
+_TABLES = ['flags', 'cumulative', 'busdays']
+
+# calendars attached in this process by shared memory name
+_attached = dict()
+
+def _padding(length):
+    return -length % _ALIGNMENT
+
+def _calendar_tables(calendar, start_year, end_year):
+    """ Holiday name codes, names, cumulative and busdays tables of a calendar
+    """
+    index = calendar.compile(start_year, end_year)
+    first = datetime.date(start_year, 1, 1).toordinal()
+    last = datetime.date(end_year, 12, 31).toordinal()
+    i, j = first - index.first, last - index.first + 1
+    codes = bytearray(j - i)
+    names = []
+    name_codes = dict()
+    holiday_name = getattr(calendar, 'holiday_name', None)
+    year_names = getattr(calendar, '_holiday_names', None)
+    year, names_of_year = None, None
+    for k in range(i, j):
+        if index.flags[k]:
+            dt = datetime.datetime.fromordinal(index.first + k)
+            if year_names is not None:
+                # names of all holidays of the year at once for Calendar objects
+                if dt.year != year:
+                    year, names_of_year = dt.year, year_names(dt.year)
+                name = names_of_year.get(dt)
+            elif holiday_name is not None:
+                name = holiday_name(dt)
+            else:
+                name = None
+            name = name or 'holiday'
+            if name not in name_codes:
+                if len(names) == 255:
+                    raise ValueError("Too many distinct holiday names in calendar")
+                names.append(name)
+                name_codes[name] = len(names)
+            codes[k - i] = name_codes[name]
+    cumulative = array.array('i', index.cumulative[i:j + 1])
+    offset = cumulative[0]
+    for k in range(len(cumulative)):
+        cumulative[k] -= offset
+    busdays = array.array('i', index.busdays[offset:offset + cumulative[-1]])
+    return codes, names, cumulative, busdays
+
+def _calendar_entry(calendar, start_year, end_year):
+    """ Directory entry (without table positions) and tables of a calendar
+    """
+    codes, names, cumulative, busdays = _calendar_tables(calendar, start_year, end_year)
+    entry = dict({
+        'fingerprint': calendar.fingerprint() if hasattr(calendar, 'fingerprint') else None,
+        'start_year': start_year,
+        'end_year': end_year,
+        'names': names
+    })
+    return entry, [bytes(codes), cumulative.tobytes(), busdays.tobytes()]
+
+def _file_blobs(entries):
+    """ Contents of a calendar file as a list of byte strings
+
+    Parameters
+    ----------
+    entries: iterable of (code, directory entry, list of flags, cumulative and busdays
+        tables as bytes)
+    """
+    directory = dict()
+    blobs = []
+    position = 0
+    for code, entry, tables in entries:
+        entry = dict(entry)
+        for table, data in zip(_TABLES, tables):
+            entry[table] = [position, len(data)]
+            blobs.append(data + b'\0' * _padding(len(data)))
+            position += len(blobs[-1])
+        directory[code.lower()] = entry
+    header = json.dumps(dict({'byteorder': sys.byteorder, 'calendars': directory})).encode('utf-8')
+    header += b' ' * _padding(len(_MAGIC) + 4 + len(header))
+    return [_MAGIC, struct.pack('<I', len(header)), header] + blobs
+
+def _serialize_calendars(calendars, start_year, end_year):
+    """ Contents of a calendar file as a list of byte strings
+    """
+    if not isinstance(calendars, dict):
+        calendars = dict((code, get_calendar(code)) for code in calendars)
+    return _file_blobs((code,) + _calendar_entry(calendar, start_year, end_year)
+                       for code, calendar in calendars.items())
+
+def save_calendars(path, calendars, start_year, end_year):
+    """ Save precomputed tables of calendars for a range of years to a calendar file
+
+    The file is replaced atomically, so processes that have it mapped keep
+    using the old version (on Windows the file cannot be replaced while it is
+    mapped).
+
+    Parameters
+    ----------
+    path: file name
+    calendars: dict of calendar code to calendar object, or list of codes for get_calendar
+    start_year, end_year: range of years (inclusive) to store
+    """
+    _write_file(path, _serialize_calendars(calendars, start_year, end_year))
+
+def _write_file(path, blobs):
+    import tempfile
+    dirname = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=dirname, prefix='.calendars-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            for blob in blobs:
+                f.write(blob)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+class MappedCalendar(BusinessDayCalendar):
+    """ Read-only calendar backed by tables of a memory mapped calendar file
+
+    Queries for dates outside of the stored years are answered by a fallback
+    calendar, by default get_calendar(code) created on first use.
+    """
+
+    def __init__(self, code, entry, buffer, fallback=None):
+        BusinessDayCalendar.__init__(self)
+        self.code = code
+        self._fingerprint = entry['fingerprint']
+        self._names = entry['names']
+        start, length = entry['flags']
+        self._codes = buffer[start:start + length]
+        tables = [buffer[entry[name][0]:entry[name][0] + entry[name][1]].cast('i')
+                  for name in ['cumulative', 'busdays']]
+        self._index = BusinessDayIndex(entry['start_year'], entry['end_year'], self._codes, *tables)
+        self._first = self._index.first
+        self._fallback_calendar = fallback
+        self._reopen = None
+
+    def __reduce__(self):
+        # calendars in shared memory are sent to other processes by name
+        if self._reopen is None:
+            raise TypeError("Only calendars attached to shared memory can be pickled")
+        return self._reopen
+
+    def fingerprint(self):
+        """ Fingerprint of the calendar definition the tables were computed from
+        """
+        return self._fingerprint
+
+    def _fallback(self):
+        if self._fallback_calendar is None:
+            self._fallback_calendar = get_calendar(self.code)
+        return self._fallback_calendar
+
+    def _code(self, dt):
+        """ Holiday name code of a stored date or None outside of the stored years
+        """
+        i = dt.toordinal() - self._first
+        if 0 <= i < len(self._codes):
+            return self._codes[i]
+        return None
+
+    def _year_flags(self, year):
+        first = datetime.date(year, 1, 1).toordinal() - self._first
+        last = datetime.date(year, 12, 31).toordinal() - self._first
+        if 0 <= first and last < len(self._codes):
+            return bytearray(1 if code else 0 for code in self._codes[first:last + 1])
+        return self._fallback()._year_flags(year)
+
+    def _cached_year_flags(self, year):
+        # years outside of the stored ones, the others are answered by the index
+        return self._fallback()._cached_year_flags(year)
+
+    def holiday_name(self, dt):
+        """ Name of the holiday on the date or None for business days
+        """
+        dt = asdatetime(dt)
+        code = self._code(dt)
+        if code is None:
+            return self._fallback().holiday_name(dt)
+        return self._names[code - 1] if code else None
+
+def _parse_header(buffer, source):
+    """ Header of calendar file contents (bytes or memoryview) and the position of
+        the data section
+    """
+    if len(buffer) < len(_MAGIC) + 4 or bytes(buffer[:len(_MAGIC)]) != _MAGIC:
+        raise ValueError("Not a calendar file: %s" % source)
+    header_length = struct.unpack('<I', buffer[len(_MAGIC):len(_MAGIC) + 4])[0]
+    data = len(_MAGIC) + 4 + header_length
+    header = json.loads(bytes(buffer[len(_MAGIC) + 4:data]).decode('utf-8'))
+    if header['byteorder'] != sys.byteorder:
+        raise ValueError("Calendar file %s was written on a machine with different byte order" % source)
+    return header, data
+
+def _read_header(path):
+    """ Header of a calendar file, read without mapping the file
+    """
+    with open(path, 'rb') as f:
+        prefix = f.read(len(_MAGIC) + 4)
+        if len(prefix) < len(_MAGIC) + 4:
+            raise ValueError("Not a calendar file: %s" % path)
+        return _parse_header(prefix + f.read(struct.unpack('<I', prefix[len(_MAGIC):])[0]), path)[0]
+
+def _read_calendars(buffer, source, reopen=None):
+    """ MappedCalendar objects of the calendar file contents in a memoryview
+    """
+    header, data = _parse_header(buffer, source)
+    calendars = dict()
+    for code, entry in header['calendars'].items():
+        calendars[code] = MappedCalendar(code, entry, buffer[data:])
+        if reopen is not None:
+            calendars[code]._reopen = (reopen, (source, code))
+    return calendars
+
+def load_calendars(path):
+    """ Memory map a calendar file
+
+    Returns
+    -------
+    dict of calendar code to MappedCalendar
+    """
+    with open(path, 'rb') as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return _read_calendars(memoryview(mapped), path)
+
+def cached_calendar(code, path, start_year, end_year):
+    """ Calendar from a calendar file, (re)building the file when needed
+
+    The file is rebuilt if it does not exist, does not contain the calendar or the
+    years, or if the definition of get_calendar(code) has changed since the file was
+    written. Only the tables of the calendar are computed when rebuilding, those of
+    other calendars stored in the file are copied unchanged. The file is checked
+    and rebuilt without mapping it, the new file is mapped once it is written.
+
+    Returns
+    -------
+    MappedCalendar
+    """
+    code = code.lower()
+    calendar = get_calendar(code)
+    try:
+        entry = _read_header(path)['calendars'].get(code)
+    except (OSError, ValueError):
+        entry = None
+    if (entry is not None and entry['fingerprint'] == calendar.fingerprint()
+            and entry['start_year'] <= start_year and end_year <= entry['end_year']):
+        return load_calendars(path)[code]
+    entries = []
+    try:
+        with open(path, 'rb') as f:
+            contents = f.read()
+        header, data = _parse_header(contents, path)
+    except (OSError, ValueError):
+        header = dict({'calendars': dict()})
+    for other, entry in header['calendars'].items():
+        if other != code:
+            tables = [contents[data + entry[table][0]:data + entry[table][0] + entry[table][1]]
+                      for table in _TABLES]
+            entries.append((other, entry, tables))
+    entries.append((code,) + _calendar_entry(calendar, start_year, end_year))
+    _write_file(path, _file_blobs(entries))
+    return load_calendars(path)[code]
+
+def share_calendars(calendars, start_year, end_year, name=None):
+    """ Publish precomputed tables of calendars in a shared memory block
+
+    The tables have the layout of a calendar file. Child processes attach them by
+    name with attach_calendars, without copying, or receive attached calendars as
+    pickled arguments. The block lives until the returned object is unlinked.
+
+    Parameters
+    ----------
+    calendars: dict of calendar code to calendar object, or list of codes for get_calendar
+    start_year, end_year: range of years (inclusive) to store
+    name: name of the shared memory block, generated if None
+
+    Returns
+    -------
+    multiprocessing.shared_memory.SharedMemory, call close() and unlink() when done
+    """
+    from multiprocessing import shared_memory
+    blobs = _serialize_calendars(calendars, start_year, end_year)
+    size = sum(len(blob) for blob in blobs)
+    shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+    position = 0
+    for blob in blobs:
+        shm.buf[position:position + len(blob)] = blob
+        position += len(blob)
+    return shm
+
+def _map_shared_memory(name):
+    """ Read-only memoryview of a shared memory block and the object owning the mapping
+    """
+    from multiprocessing import shared_memory
+
+    class AttachedMemory(shared_memory.SharedMemory):
+        def __del__(self):
+            # calendars may still hold views of the block when the interpreter exits
+            try:
+                self.close()
+            except (BufferError, OSError):
+                pass
+
+    if sys.version_info >= (3, 13):
+        # not tracked, the block is unlinked by the process that created it
+        shm = AttachedMemory(name=name, track=False)
+    else:
+        shm = AttachedMemory(name=name)
+    return shm, shm.buf.toreadonly()
+
+def attach_calendars(name):
+    """ Read-only calendars published in a shared memory block by share_calendars
+
+    The block is mapped once per process and must not be unlinked before all
+    processes have attached it. Attached calendars can be pickled, and are
+    attached by name again when unpickled in another process. Before Python 3.13,
+    attaching on POSIX registers the block with the resource tracker of the
+    process, which child processes share with their parent. A process that is not
+    a child of the creator unlinks the block when it exits.
+
+    Returns
+    -------
+    dict of calendar code to MappedCalendar
+    """
+    calendars = _attached.get(name)
+    if calendars is None:
+        owner, buffer = _map_shared_memory(name)
+        calendars = _read_calendars(buffer, name, _attached_calendar)
+        for calendar in calendars.values():
+            calendar._shared_memory = owner
+        _attached[name] = calendars
+    return calendars
+
+def _attached_calendar(name, code):
+    return attach_calendars(name)[code]
@@ -1,8 +1,19 @@
 
+import array
 import collections
 import datetime
+import itertools
+import threading
 
-from findates.dateutils import DAYS_IN_WEEK, asdatetime, eom
+from findates.dateutils import (
+    DAYS_IN_WEEK,
+    asdatetime,
+    asordinal,
+    lweekday,
+    ordinals_to_datetime64
+)
+from findates.dateutils.dateutils import _jan1_ordinal
+from findates.profiling import profiler as _profiler
 
 class OrderMapper:
 
@@ -42,11 +53,72 @@ month_names = ['', 'January', 'February', 'March', 'April', 'May', 'June', 'July
 month_name_order = OrderMapper(map(str.lower, month_names))
 weekday_name_order = OrderMapper(map(str.lower, day_names))
 
+def _computus(year):
+    """ Month and day of Easter in the given year
+    Adapted from Wikipedia: http://en.wikipedia.org/wiki/Computus
+    """
+    a = year % 19
+    b = year // 100
+    c = year % 100
+    d = b // 4
+    e = b % 4
+    f = (b+8) // 25
+    g = (b - f + 1) // 3
+    h = (19*a+b-d-g+15) % 30
+    i = c // 4
+    k = c % 4
+    L = (32+2*e+2*i-h-k) % 7
+    m = (a + 11*h+22*L) // 451
+    month = (h+L-7*m+114) // 31
+    day = ((h+L-7*m+114) % 31)+1
+    return month, day
+
+# Proleptic Gregorian ordinals of Easter by year, shared by all calendars
+_easter_ordinals = dict()
+
+def _easter_ordinal(year):
+    ordinal = _easter_ordinals.get(year)
+    if ordinal is None:
+        month, day = _computus(year)
+        ordinal = datetime.date(year, month, day).toordinal()
+        _easter_ordinals[year] = ordinal
+    return ordinal
+
+# Moveable feasts as days from Easter Sunday
+easter_offsets = dict({
+    'holy thursday': -3,
+    'good friday': -2,
+    'easter': 0,
+    'easter monday': 1,
+    'ascension thursday': 39,
+    'pentecost': 49,
+    'whit monday': 50,
+    'trinity sunday': 56,
+    'corpus christi thursday': 60
+})
+
 def easter(year):
     """
     Calculate the date of Easter in the given year
-    Adapted from Wikipedia: http://en.wikipedia.org/wiki/Computus
+
+    Dates are computed once per year and shared by all calendars
     """
+    return datetime.datetime.fromordinal(_easter_ordinal(year))
+
+def easter_array(years, offset=0):
+    """ Vectorized easter
+
+    Parameters
+    ----------
+    years: array or sequence of years
+    offset: days from Easter, e.g. easter_offsets['good friday']
+
+    Returns
+    -------
+    numpy datetime64[D] array
+    """
+    import numpy as np
+    year = np.asarray(years, dtype=np.int64)
     a = year % 19
     b = year // 100
     c = year % 100
@@ -61,55 +133,59 @@ def easter(year):
     m = (a + 11*h+22*L) // 451
     month = (h+L-7*m+114) // 31
     day = ((h+L-7*m+114) % 31)+1
-    return datetime.datetime(year, month, day)
+    months = ((year - 1970)*12 + month - 1).astype('datetime64[M]')
+    return months.astype('datetime64[D]') + (day - 1 + offset)
+
+def _easter_feast(year, description):
+    return datetime.datetime.fromordinal(_easter_ordinal(year) + easter_offsets[description])
 
 def holy_thursday(year):
     """ 
     For a given year determine a date of a Holy Thursday (Thursday before Easter)
     """
-    return easter(year) - datetime.timedelta(days=3)
+    return _easter_feast(year, 'holy thursday')
 
 def good_friday(year):
     """ 
     For a given year determine a date of a Good Friday (Friday before Easter)
     """    
-    return easter(year) - datetime.timedelta(days=2)
+    return _easter_feast(year, 'good friday')
 
 def easter_monday(year):
     """ 
     For a given year determine a date of an Easter Monday (Monday after Easter)
     """        
-    return easter(year) + datetime.timedelta(days=1)
+    return _easter_feast(year, 'easter monday')
 
 def ascension_thursday(year):
     """ 
     For a given year determine a date of an Ascension Thursday (Thursday 40 days after Easter)
     """            
-    return easter(year) + datetime.timedelta(days=39)
+    return _easter_feast(year, 'ascension thursday')
 
 def pentecost(year):
     """ 
     For a given year determine a date of Pentecost (Sunday 7 weeks from Easter)
     """            
-    return easter(year) + datetime.timedelta(days=49)
+    return _easter_feast(year, 'pentecost')
 
 def whit_monday(year):
     """ 
     For a given year determine a date of a Whit Monday (50 days from Easter)
     """                
-    return easter(year) + datetime.timedelta(days=50)
+    return _easter_feast(year, 'whit monday')
 
 def trinity_sunday(year):
     """ 
     For a given year determine a date of a Trinity (Sunday 8 weeks from Easter)
     """                    
-    return easter(year) + datetime.timedelta(days=56)
+    return _easter_feast(year, 'trinity sunday')
 
 def corpus_christi_thursday(year):
     """ 
     For a given year determine a date of a Trinity (Sunday 8 weeks from Easter)
     """                        
-    return easter(year) + datetime.timedelta(days=60)
+    return _easter_feast(year, 'corpus christi thursday')
 
 def weekday_on_or_before(dt, weekday):
     """ Find weekday happening on or before a given date
@@ -182,14 +258,713 @@ idiosyncratic_holidays = dict({
     'victoria day': victoria_day
     })
 
-class Calendar:
+class BusinessDayIndex:
+    """ Compiled representation of a calendar over a contiguous range of years
+
+    Days are addressed by their proleptic Gregorian ordinal relative to January 1st
+    of the first year in the range:
+
+    flags: one byte per day, 1 for holidays (including weekends) and 0 for business days
+    cumulative: cumulative[i] is the number of business days strictly before day i,
+        the array has one extra trailing element with the total count
+    busdays: ordinals of all business days in the range in increasing order
+
+    With these tables holiday checks, counting business days and finding the n-th
+    business day from a date are all constant time lookups.
+    """
+
+    def __init__(self, start_year, end_year, flags, cumulative=None, busdays=None):
+        """ Build the index from holiday flags
+
+        Precomputed cumulative and busdays tables (e.g. loaded from a calendar file)
+        can be given to avoid computing them from the flags.
+        """
+        self.start_year = start_year
+        self.end_year = end_year
+        self.first = datetime.date(start_year, 1, 1).toordinal()
+        self.last = datetime.date(end_year, 12, 31).toordinal()
+        if len(flags) != self.last - self.first + 1:
+            raise ValueError("Holiday flags do not cover years %d-%d" % (start_year, end_year))
+        self.flags = flags
+        if cumulative is None or busdays is None:
+            cumulative = array.array('i', [0]) * (len(flags) + 1)
+            busdays = array.array('i')
+            count = 0
+            for i, flag in enumerate(flags):
+                cumulative[i] = count
+                if not flag:
+                    busdays.append(self.first + i)
+                    count += 1
+            cumulative[len(flags)] = count
+        self.cumulative = cumulative
+        self.busdays = busdays
+        self._arrays = None
+        self._rolling = None
+
+    def __contains__(self, ordinal):
+        return self.first <= ordinal <= self.last
+
+    def as_arrays(self):
+        """ Zero-copy NumPy views of flags, cumulative and busdays tables
+        """
+        if self._arrays is None:
+            import numpy as np
+            self._arrays = (np.frombuffer(self.flags, dtype=np.uint8),
+                            np.frombuffer(self.cumulative, dtype=np.int32),
+                            np.frombuffer(self.busdays, dtype=np.int32))
+        return self._arrays
+
+    def rolling_tables(self):
+        """ NumPy tables of the following and preceding business day ordinals
+
+        following[i] is the first business day on or after day i, preceding[i] is the
+        last business day on or before day i, -1 where such day is outside of the index
+        """
+        if self._rolling is None:
+            import numpy as np
+            flags, cumulative, busdays = self.as_arrays()
+            padded = np.concatenate((busdays, [-1])).astype(np.int32)
+            following = padded[cumulative[:-1]]
+            preceding = padded[cumulative[1:] - 1]
+            self._rolling = (following, preceding)
+        return self._rolling
+
+    def _offset(self, ordinal):
+        if not self.first <= ordinal <= self.last:
+            raise IndexError("Date ordinal %d is outside of indexed years %d-%d"
+                             % (ordinal, self.start_year, self.end_year))
+        return ordinal - self.first
+
+    def is_holiday(self, ordinal):
+        return self.flags[self._offset(ordinal)] != 0
+
+    def count(self, start, end):
+        """ Number of business days in the half-open interval [start, end) of ordinals,
+            negative if end precedes start
+        """
+        if end < start:
+            return -self.count(end, start)
+        i = self._offset(start)
+        # end is exclusive, so it may point one day past the last indexed day
+        j = self._offset(end - 1) + 1 if end > start else i
+        return self.cumulative[j] - self.cumulative[i]
+
+    def offset(self, ordinal, n):
+        """ Ordinal of the n-th business day after (n > 0) or before (n < 0) a given
+            ordinal. For n == 0 the first business day on or after the ordinal is returned.
+        """
+        i = self._offset(ordinal)
+        if n > 0:
+            k = self.cumulative[i + 1] + n - 1
+        elif n < 0:
+            k = self.cumulative[i] + n
+        else:
+            k = self.cumulative[i]
+        if not 0 <= k < len(self.busdays):
+            raise IndexError("Business day offset %d from ordinal %d is outside of indexed years %d-%d"
+                             % (n, ordinal, self.start_year, self.end_year))
+        return self.busdays[k]
+
+YearCacheInfo = collections.namedtuple('YearCacheInfo', [
+    'hits', 'misses', 'evictions', 'max_years', 'pinned', 'currsize'
+])
+
+class YearCache:
+    """ Values computed for a year (e.g. holidays of a calendar), with optional eviction
+
+    Years in the pinned range (first, last year inclusive) are kept for the lifetime
+    of the cache. Of the other years at most max_years least recently used ones are
+    kept, all of them if max_years is None.
+
+    Lookups do not lock, so the hit and miss counters are approximate when the cache
+    is used by several threads.
+    """
+
+    def __init__(self, max_years=None, pinned=None):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._values = dict()
+        # recency order of years that are not pinned
+        self._lru = collections.OrderedDict()
+        self.configure(max_years, pinned)
+
+    def configure(self, max_years=None, pinned=None):
+        """ Change the size bound and pinned range, evicting years as needed
+        """
+        if max_years is not None and max_years < 0:
+            raise ValueError("Maximum number of cached years must not be negative")
+        if pinned is not None:
+            pinned = tuple(pinned)
+            if len(pinned) != 2 or pinned[0] > pinned[1]:
+                raise ValueError("Pinned years must be a (first year, last year) range")
+        with self._lock:
+            items = [(year, self._values[year]) for year in self._values if year not in self._lru]
+            items += [(year, self._values[year]) for year in self._lru]
+            self.max_years = max_years
+            self.pinned = pinned
+            self._values = dict()
+            self._lru = collections.OrderedDict()
+        for year, value in items:
+            self.put(year, value)
+
+    def get(self, year):
+        """ Cached value of the year or None
+        """
+        value = self._values.get(year)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        if self.max_years is not None and year in self._lru:
+            try:
+                self._lru.move_to_end(year)
+            except KeyError:
+                # evicted by another thread in the meantime
+                pass
+        return value
+
+    def peek(self, year):
+        """ Cached value of the year or None, without updating counters and recency
+        """
+        return self._values.get(year)
+
+    def put(self, year, value):
+        with self._lock:
+            self._values[year] = value
+            if self.pinned is not None and self.pinned[0] <= year <= self.pinned[1]:
+                return
+            self._lru[year] = None
+            self._lru.move_to_end(year)
+            if self.max_years is not None:
+                while len(self._lru) > self.max_years:
+                    del self._values[self._lru.popitem(last=False)[0]]
+                    self.evictions += 1
+
+    def clear(self):
+        """ Drop all cached years, counters are kept
+        """
+        with self._lock:
+            self._values = dict()
+            self._lru = collections.OrderedDict()
+
+    def __len__(self):
+        return len(self._values)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def info(self):
+        """ Counters and bounds of the cache as YearCacheInfo
+        """
+        return YearCacheInfo(self.hits, self.misses, self.evictions,
+                             self.max_years, self.pinned, len(self))
+
+class HolidayRule:
+    """ Compiled holiday definition that generates dates of the holiday for a year
+
+    Calendar.add_holiday compiles natural language descriptions into rules. When
+    several rules produce the same date, the rule with higher precedence defines
+    the holiday (e.g. whether it is moved when falling on a weekend).
+    """
+    # only holidays on a specific date are moved when they fall on a weekend
+    movable = False
+    precedence = 0
+
+    def __init__(self, name, move=None):
+        self.name = name
+        self.move = move
+
+    @property
+    def key(self):
+        """ Rules with the same key replace each other in the calendar
+        """
+        return (type(self).__name__, self.name)
+
+    def dates(self, year):
+        """ List of datetime.datetime dates of the holiday in the year
+        """
+        raise NotImplementedError
+
+    def __repr__(self):
+        fields = ', '.join('%s=%r' % (k, v) for k, v in sorted(vars(self).items()) if not callable(v))
+        return '%s(%s)' % (type(self).__name__, fields)
+
+class WeekdayHoliday(HolidayRule):
+    """ Holiday on the n-th (or last, order -1) weekday of a month, e.g. "4th Thursday in November"
+    """
+    precedence = 1
+
+    def __init__(self, name, month, order, weekday, move=None):
+        HolidayRule.__init__(self, name, move)
+        self.month = month
+        self.order = order
+        self.weekday = weekday
+
+    @property
+    def key(self):
+        return ('weekday', self.month, self.order, self.weekday, self.name)
+
+    def dates(self, year):
+        if self.order == -1:
+            return [lweekday(year, self.month, self.weekday)]
+        elif self.order > 0:
+            first = datetime.datetime(year, self.month, 1)
+            dt = first + datetime.timedelta(days=(self.weekday - first.weekday()) % DAYS_IN_WEEK
+                                            + (self.order - 1) * DAYS_IN_WEEK)
+            # months without the n-th weekday (e.g. a 5th Monday) have no holiday
+            if dt.month != self.month:
+                return []
+            return [dt]
+        return []
+
+class FixedDateHoliday(HolidayRule):
+    """ Holiday on a specific date every year, e.g. "July 4th"
+    """
+    movable = True
+    precedence = 2
+
+    def __init__(self, name, month, day, move=None):
+        HolidayRule.__init__(self, name, move)
+        self.month = month
+        self.day = day
+
+    @property
+    def key(self):
+        return ('date', self.month, self.day)
+
+    def dates(self, year):
+        try:
+            return [datetime.datetime(year, self.month, self.day)]
+        except ValueError:
+            # e.g. February 29th in a non-leap year
+            return []
+
+class IdiosyncraticHoliday(HolidayRule):
+    """ Holiday computed by one of idiosyncratic_holidays functions, e.g. "Good Friday"
+    """
+    precedence = 3
+
+    def __init__(self, name, description, move=None):
+        HolidayRule.__init__(self, name, move)
+        self.description = description.lower()
+        self.function = idiosyncratic_holidays[self.description]
+
+    @property
+    def key(self):
+        return ('idiosyncratic', self.description)
+
+    def dates(self, year):
+        if _profiler.enabled:
+            started = _profiler.clock()
+            dt = self.function(year)
+            _profiler.add('holidays.idiosyncratic', _profiler.clock() - started, label=self.description)
+            return [dt]
+        return [self.function(year)]
+
+class SpecialHoliday(HolidayRule):
+    """ Holiday on a single date, e.g. a closure for a national day of mourning
+    """
+    precedence = 4
+
+    def __init__(self, name, year, month, day):
+        HolidayRule.__init__(self, name)
+        self.year = year
+        self.month = month
+        self.day = day
+
+    @property
+    def key(self):
+        return ('special', self.year, self.month, self.day)
+
+    def dates(self, year):
+        if year == self.year:
+            return [datetime.datetime(self.year, self.month, self.day)]
+        return []
+
+def _parse_ordinal_suffix(text):
+    if text.endswith('st') or text.endswith('nd') or text.endswith('rd') or text.endswith('th'):
+        return text[:-2]
+    return text
+
+def compile_holiday(name, date_description, move=None):
+    """ Compile a natural language holiday description, see Calendar.add_holiday
+
+    Returns
+    -------
+    tuple of list of weekend weekday numbers and list of HolidayRule objects
+    """
+    weekend = []
+    rules = []
+    if date_description.lower() in idiosyncratic_holidays.keys():
+        rules.append(IdiosyncraticHoliday(name, date_description, move))
+    # go through days of the week
+    for day_name_idx in range(len(day_names)):
+        day_name = day_names[day_name_idx]
+        if date_description.lower()==day_name.lower():
+            weekend.append(day_name_idx)
+    desc_parts = date_description.split(' ')
+    if len(desc_parts)==2:
+        month_name = desc_parts[0].lower()
+        if month_name in month_name_order:
+            day_num = int(_parse_ordinal_suffix(desc_parts[1].lower()))
+            month_num = month_name_order[month_name]
+            rules.append(FixedDateHoliday(name, month_num, day_num, move))
+    if len(desc_parts)==4:
+        # nth weekday in month
+        month_num = month_name_order[desc_parts[3].lower()]
+        weekday_num = weekday_name_order[desc_parts[1].lower()]
+        order_str = desc_parts[0]
+        if order_str.lower() == 'last':
+            order = -1
+        else:
+            order = int(_parse_ordinal_suffix(order_str))
+        # n-th day of the month holidays are usually not moved
+        # as they always happen on a particular day of the week
+        rules.append(WeekdayHoliday(name, month_num, order, weekday_num))
+    return weekend, rules
+
+def _calendar_year_flags(calendar, start_year, end_year):
+    """ Holiday flags of a calendar for years start_year to end_year inclusive
+
+    Module level function, so that it can be run in worker processes
+    """
+    flags = bytearray()
+    for year in range(start_year, end_year + 1):
+        flags += calendar._year_flags(year)
+    return flags
+
+def _ordinals_result(ordinals, datetime64):
+    if datetime64:
+        import numpy as np
+        return ordinals_to_datetime64(np.frombuffer(ordinals, dtype=np.int32))
+    return ordinals
+
+class BusinessDayCalendar:
+    """ Base class of holiday calendars
+
+    Subclasses define holidays year by year with _year_flags(year), or with
+    _cached_year_flags(year) if they cache them. Dates are handled internally as
+    proleptic Gregorian ordinals. This class provides holiday checks, business day
+    index and range queries on top of the flags.
+
+    Calendars can be shared by threads. Computed years and indexes are built in local
+    variables and published with a single assignment, so readers never take a lock
+    and never see a partially built year. Builders of the same year (or of the index)
+    are serialized by a lock, so each is computed once. Changing the definition of
+    a calendar while other threads use it is not supported, see freeze.
+    """
+
+    # number of locks serializing builds of years, a year uses lock year % _YEAR_LOCKS
+    _YEAR_LOCKS = 16
+
+    def __init__(self):
+        self._index = None
+        # first ordinal, end ordinal and flags of the year checked last
+        self._window = (0, 0, b'')
+        self._frozen = None
+        self._cache_policy = (None, None)
+        self._init_locks()
+
+    def _init_locks(self):
+        self._build_lock = threading.Lock()
+        self._year_locks = [threading.Lock() for _ in range(self._YEAR_LOCKS)]
+
+    def _year_lock(self, year):
+        return self._year_locks[year % self._YEAR_LOCKS]
+
+    def __getstate__(self):
+        # locks cannot be pickled, e.g. to compute years in a process pool
+        state = self.__dict__.copy()
+        del state['_build_lock']
+        del state['_year_locks']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init_locks()
+
+    def freeze(self, start_year=None, end_year=None):
+        """ Precompute the calendar for a range of years and make it immutable
+
+        All tables for dates in the range are built up front, so queries for them
+        (including rolling tables used by the array functions) only read shared
+        data. Adding holidays to a frozen calendar raises ValueError. Dates outside
+        of the range are still computed on first use. Without the range the
+        calendar is only made immutable.
+
+        Returns
+        -------
+        BusinessDayIndex object covering the range, or the current index (possibly
+        None) if no range is given
+        """
+        if start_year is None and end_year is None:
+            if self._frozen is None:
+                self._frozen = ()
+            return self._index
+        if start_year is None or end_year is None:
+            raise ValueError("Both start_year and end_year must be given to precompute years")
+        index = self.compile(start_year, end_year)
+        index.rolling_tables()
+        self._frozen = (index.start_year, index.end_year)
+        return index
+
+    @property
+    def frozen(self):
+        """ True if the calendar has been frozen
+        """
+        return self._frozen is not None
+
+    def _new_year_cache(self):
+        return YearCache(*self._cache_policy)
+
+    def _year_caches(self):
+        """ Caches of computed years, the first one holds holidays of the years
+        """
+        return []
+
+    def set_cache_policy(self, max_years=None, pinned_years=None):
+        """ Bound the memory used by years computed on first use
+
+        Dates covered by the business day index (see compile and freeze) do not
+        use these caches.
+
+        Parameters
+        ----------
+        max_years: number of least recently used years to keep besides the pinned
+            ones, None for no limit
+        pinned_years: (first year, last year) range of years that are never evicted,
+            e.g. the years most queries are for
+        """
+        self._cache_policy = (max_years, pinned_years)
+        self._window = (0, 0, b'')
+        for cache in self._year_caches():
+            cache.configure(max_years, pinned_years)
+
+    def cache_info(self):
+        """ Hit, miss and eviction counters of the cache of computed holiday years
+
+        Without max_years (see set_cache_policy) repeated checks of dates in the
+        year checked last do not use the cache and are not counted as hits.
+
+        Returns
+        -------
+        YearCacheInfo named tuple or None for calendars without the cache
+        """
+        caches = self._year_caches()
+        return caches[0].info() if caches else None
+
+    def _check_not_frozen(self):
+        if self._frozen:
+            raise ValueError("Calendar is frozen for years %d-%d and cannot be changed" % self._frozen)
+        if self._frozen is not None:
+            raise ValueError("Calendar is frozen and cannot be changed")
+
+    def is_holiday(self, dt):
+        """ Check if specific date (or proleptic Gregorian ordinal) is holiday
+        """
+        if isinstance(dt, datetime.date):
+            return self._is_holiday_ordinal(dt.toordinal())
+        return self._is_holiday_ordinal(asordinal(dt))
+
+    def _is_holiday_ordinal(self, ordinal):
+        index = self._index
+        if index is not None:
+            i = ordinal - index.first
+            if 0 <= i < len(index.flags):
+                return index.flags[i] != 0
+        # consecutive checks mostly fall into the same year, the year is kept aside
+        # only if the year cache is unbounded, so bounded caches see every lookup
+        # for their recency order and counters
+        first, end, flags = self._window
+        if not first <= ordinal < end:
+            year = datetime.date.fromordinal(ordinal).year
+            flags = self._cached_year_flags(year)
+            first = _jan1_ordinal(year)
+            if self._cache_policy[0] is None:
+                self._window = (first, first + len(flags), flags)
+        return flags[ordinal - first] != 0
+
+    def _year_flags(self, year):
+        """ One byte per day of the year, 1 for holidays and 0 for business days
+        """
+        raise NotImplementedError
+
+    def _cached_year_flags(self, year):
+        """ Flags of the year as returned by _year_flags, must not be modified
+        """
+        return self._year_flags(year)
+
+    def _flags_for_years(self, start_year, end_year, processes=None):
+        """ Holiday flags for a range of years, optionally computed in a process pool
+        """
+        if end_year < start_year:
+            return bytearray()
+        years = end_year - start_year + 1
+        if processes is None or processes <= 1 or years < 2*processes:
+            return _calendar_year_flags(self, start_year, end_year)
+        chunk = -(-years // processes)
+        starts = list(range(start_year, end_year + 1, chunk))
+        ends = [min(y + chunk - 1, end_year) for y in starts]
+        import concurrent.futures
+        with concurrent.futures.ProcessPoolExecutor(processes) as pool:
+            parts = pool.map(_calendar_year_flags, [self] * len(starts), starts, ends)
+            return bytearray().join(parts)
+
+    def compile(self, start_year, end_year, processes=None):
+        """ Build business day index for the range of years
+
+        The index speeds up is_holiday for dates covered by it and is required for
+        constant time business day counting and offsets. If the calendar already has
+        an index, the new one covers both the old and the requested range, years
+        already in the index are not recomputed.
+
+        Parameters
+        ----------
+        start_year: first year covered by the index
+        end_year: last year (inclusive) covered by the index
+        processes: number of worker processes to compute missing years in parallel,
+            worth using only for ranges of many decades
+
+        Returns
+        -------
+        BusinessDayIndex object
+        """
+        if start_year > end_year:
+            raise ValueError("Start year %d is after end year %d" % (start_year, end_year))
+        index = self._index
+        if index is not None and start_year >= index.start_year and end_year <= index.end_year:
+            return index
+        with self._build_lock:
+            return self._compile(start_year, end_year, processes)
+
+    def _compile(self, start_year, end_year, processes):
+        index = self._index
+        if index is None:
+            flags = self._flags_for_years(start_year, end_year, processes)
+        else:
+            if start_year >= index.start_year and end_year <= index.end_year:
+                return index
+            flags = self._flags_for_years(start_year, index.start_year - 1, processes)
+            flags += index.flags
+            flags += self._flags_for_years(index.end_year + 1, end_year, processes)
+            start_year = min(start_year, index.start_year)
+            end_year = max(end_year, index.end_year)
+        self._index = BusinessDayIndex(start_year, end_year, flags)
+        return self._index
+
+    def _covering_index(self, *ordinals):
+        """ Business day index covering all given ordinals, compiled as needed
+        """
+        index = self._index
+        if index is None or not all(o in index for o in ordinals):
+            years = [datetime.date.fromordinal(o).year for o in ordinals]
+            index = self.compile(min(years), max(years))
+        return index
+
+    def count_business_days(self, start, end):
+        """ Number of business days on or after start and before end
+
+        Parameters
+        ----------
+        start, end: datetime.date, datetime.datetime or date string
+
+        Returns
+        -------
+        number of business days in [start, end), negative if end is before start
+        """
+        start, end = asordinal(start), asordinal(end)
+        lo, hi = min(start, end), max(start, end)
+        # end of the interval is exclusive, it does not have to be covered by the index
+        return self._covering_index(lo, max(lo, hi - 1)).count(start, end)
+
+    def _index_range(self, start, end, processes):
+        """ Business day index and offsets of the half-open interval [start, end) in it
+        """
+        start, end = asordinal(start), asordinal(end)
+        end = max(start, end)
+        index = self._index
+        if index is None or start not in index or (end > start and end - 1 not in index):
+            self.compile(datetime.date.fromordinal(start).year,
+                         datetime.date.fromordinal(max(start, end - 1)).year, processes)
+            index = self._index
+        return index, start - index.first, end - index.first
+
+    def holidays_between(self, start, end, datetime64=False, processes=None):
+        """ All holidays (including weekends) on or after start and before end
+
+        Years missing from the business day index are computed in bulk.
+
+        Parameters
+        ----------
+        start, end: datetime.date, datetime.datetime or date string
+        datetime64: return numpy datetime64[D] array instead of ordinals
+        processes: number of worker processes to compute missing years, see compile
+
+        Returns
+        -------
+        sorted array.array('i') of proleptic Gregorian ordinals or numpy datetime64[D] array
+        """
+        index, i, j = self._index_range(start, end, processes)
+        result = array.array('i', itertools.compress(range(index.first + i, index.first + j),
+                                                     index.flags[i:j]))
+        return _ordinals_result(result, datetime64)
+
+    def business_days_between(self, start, end, datetime64=False, processes=None):
+        """ All business days on or after start and before end
+
+        Parameters and return values are the same as for holidays_between
+        """
+        index, i, j = self._index_range(start, end, processes)
+        result = index.busdays[index.cumulative[i]:index.cumulative[j]]
+        if not isinstance(result, array.array):
+            # tables of memory mapped calendars are memoryviews
+            result = array.array('i', result)
+        return _ordinals_result(result, datetime64)
+
+    def nth_business_day(self, dt, n):
+        """ The n-th business day after (n > 0) or before (n < 0) a given date
+
+        For n == 0 the date itself is returned if it is a business day, otherwise
+        the following business day.
+
+        Returns
+        -------
+        datetime.datetime of the business day
+        """
+        ordinal = asordinal(dt)
+        index = self._covering_index(ordinal)
+        while True:
+            try:
+                result = index.offset(ordinal, n)
+                break
+            except IndexError:
+                # extend the index by roughly the number of years needed plus a margin
+                years = abs(n) // 200 + 1
+                if n >= 0:
+                    index = self.compile(index.start_year, index.end_year + years)
+                else:
+                    index = self.compile(index.start_year - years, index.end_year)
+        return datetime.datetime.fromordinal(result)
+
+class Calendar(BusinessDayCalendar):
     def __init__(self):
+        BusinessDayCalendar.__init__(self)
         self._weekdays = [True] * DAYS_IN_WEEK
-        self._dated_holidays = collections.defaultdict(dict)
-        self._numbered_weekday_holidays = collections.defaultdict(set)
-        self._holiday_cache = collections.defaultdict(set)
-        self._idiosyncratic_years_cached = dict()
-        self._idiosyncratic = dict()
+        self._rules = dict()
+        self._compiled_rules = []
+        self._holiday_cache = self._new_year_cache()
+        self._rule_dates_cache = self._new_year_cache()
+
+    def _year_caches(self):
+        return [self._holiday_cache, self._rule_dates_cache]
 
     def add_holiday(self, name, date_description, **kwargs):
         """ Add holiday to the calendar
@@ -216,86 +991,164 @@ class Calendar:
           to Friday and those happening on Sunday will be moved to Monday.
 
         """
+        self._check_not_frozen()
         if 'move' in kwargs:
             move = kwargs['move']
         else:
             move = None
-        # go through days of the week
-        if date_description.lower() in idiosyncratic_holidays.keys():
-            self._idiosyncratic[date_description.lower()] = (name, move)
-        for day_name_idx in range(len(day_names)):
-            day_name = day_names[day_name_idx]
-            if date_description.lower()==day_name.lower():
-                self._weekdays[day_name_idx] = False
-        desc_parts = date_description.split(' ')
-        if len(desc_parts)==2:
-            month_name = desc_parts[0].lower()
-            if month_name in month_name_order:
-                daystr= desc_parts[1].lower()
-                if daystr.endswith('st') or daystr.endswith('nd') or daystr.endswith('rd') or daystr.endswith('th'):
-                    daystr = daystr[:-2]
-                day_num = int(daystr)
-                month_num = month_name_order[month_name]
-                self._dated_holidays[month_num][day_num] = (name, move)
-        if len(desc_parts)==4:
-            # nth weekday in month
-            month_num = month_name_order[desc_parts[3].lower()]
-            weekday_num = weekday_name_order[desc_parts[1].lower()]
-            order_str = desc_parts[0]
-            if order_str.lower() == 'last':
-                order = -1
-            else:
-                if order_str.endswith('st') or order_str.endswith('nd') or order_str.endswith('rd') or order_str.endswith('th'):
-                    order_str = order_str[:-2]
-                order = int(order_str)
-            self._numbered_weekday_holidays[month_num].add( (order, weekday_num, name) )
-
-    def _is_idiosyncratic(self, dt):
-        """ check if date is one of idiosyncratic holidays
-        """
-        Y = dt.year
-        if not Y in self._idiosyncratic_years_cached:
-            # compute idiosyncratic holidays for year Y
-            id_table = dict()
-            for id in self._idiosyncratic.keys():
-                name, move = self._idiosyncratic[id]
-                id_table[idiosyncratic_holidays[id](Y)] = (name, move)
-            self._idiosyncratic_years_cached[Y] = id_table
-        if dt in self._idiosyncratic_years_cached[Y]:
-            name, move = self._idiosyncratic_years_cached[Y][dt]
-            return True, name, move
-        else:
-            return False, None, None
+        weekend, rules = compile_holiday(name, date_description, move)
+        self.add_rules(rules, weekend)
 
-    def is_holiday(self, dt):
-        """ Check if specific date is holiday
+    def add_rule(self, rule):
+        """ Add compiled holiday rule (HolidayRule object) to the calendar
+        """
+        self.add_rules([rule])
+
+    def add_rules(self, rules, weekend=()):
+        """ Add compiled holiday rules (HolidayRule objects) and weekend days (weekday
+            numbers, 0 - Monday) to the calendar at once
+        """
+        self._check_not_frozen()
+        for weekday in weekend:
+            self._weekdays[weekday] = False
+        for rule in rules:
+            self._rules[rule.key] = rule
+        # rules with higher precedence are applied last and override the others
+        self._compiled_rules = sorted(self._rules.values(), key=lambda r: r.precedence)
+        self._invalidate()
+
+    def fingerprint(self):
+        """ Hash of the calendar definition (weekend days and holiday rules)
+
+        Used to detect stale precomputed calendar tables, see calendarfile module
+        """
+        import hashlib
+        digest = hashlib.sha1(repr(self._weekdays).encode('utf-8'))
+        for rule in self._compiled_rules:
+            digest.update(repr(rule).encode('utf-8'))
+        return digest.hexdigest()
+
+    def holiday_name(self, dt):
+        """ Name of the holiday on the date ('weekend' for weekend days) or None for business days
         """
         dt = asdatetime(dt)
-        year = dt.year
-        if not year in self._holiday_cache:
-            # create year cache
-            self._holiday_cache[year] = set()
-            current = datetime.datetime(year, 1, 1)
-            end_year = datetime.datetime(year, 12, 31)
-            while current <= end_year:
-                b_holiday, name, move_day = self._verify_holiday(current)
-                if b_holiday:
-                    self._holiday_cache[year].add(current)
-                if move_day is not None:
-                    self._holiday_cache[year].add(move_day)
-                current = current + datetime.timedelta(days = 1)
-        return dt in self._holiday_cache[year]
+        if not self.is_holiday(dt):
+            return None
+        return self._holiday_names(dt.year).get(dt)
+
+    def _holiday_names(self, year):
+        """ Holidays of the year mapped to their names
+        """
+        names = dict()
+        rule_dates = self._rule_dates(year)
+        for dt, rule in rule_dates.items():
+            if rule.movable and rule.move is not None and not self._weekdays[dt.weekday()]:
+                names.setdefault(self._move_holiday(dt, rule.move), rule.name)
+        for dt in self._build_holiday_year(year):
+            if dt in rule_dates:
+                names[dt] = rule_dates[dt].name
+            else:
+                names.setdefault(dt, 'weekend')
+        return names
+
+    def _invalidate(self):
+        """ Drop computed holidays after the calendar definition has changed
+        """
+        self._holiday_cache.clear()
+        self._rule_dates_cache.clear()
+        self._window = (0, 0, b'')
+        self._index = None
+
+    def _rule_dates(self, year):
+        """ Dates generated by the holiday rules in the year mapped to the rule defining them
+        """
+        table = self._rule_dates_cache.get(year)
+        if table is None:
+            started = _profiler.clock() if _profiler.enabled else None
+            table = dict()
+            for rule in self._compiled_rules:
+                for dt in rule.dates(year):
+                    table[dt] = rule
+            # rule dates are cheap to compute, racing builders produce equal tables
+            self._rule_dates_cache.put(year, table)
+            if started is not None:
+                _profiler.add('holidays.rule_dates', _profiler.clock() - started, len(table))
+        return table
+
+    def _is_rule_holiday(self, ordinal):
+        """ Check if date is a weekend or is generated by a holiday rule, moved holidays
+            are not taken into account
+        """
+        # January 1st of year 1 (ordinal 1) is a Monday
+        if not self._weekdays[(ordinal - 1) % DAYS_IN_WEEK]:
+            return True
+        dt = datetime.datetime.fromordinal(ordinal)
+        return dt in self._rule_dates(dt.year)
+
+    def _cached_year_flags(self, year):
+        flags = self._holiday_cache.get(year)
+        if flags is None:
+            with self._year_lock(year):
+                flags = self._holiday_cache.peek(year)
+                if flags is None:
+                    started = _profiler.clock() if _profiler.enabled else None
+                    flags = bytes(self._flags_of_holidays(year, self._build_holiday_year(year)))
+                    self._holiday_cache.put(year, flags)
+                    if started is not None:
+                        _profiler.cache_miss('holidays.year')
+                        _profiler.add('holidays.year_build', _profiler.clock() - started)
+        elif _profiler.enabled:
+            _profiler.cache_hit('holidays.year')
+        return flags
+
+    def _build_holiday_year(self, year):
+        """ Set of holidays (as datetime.datetime) for the year
+        """
+        rule_dates = self._rule_dates(year)
+        holidays = set(rule_dates)
+        jan1 = datetime.datetime(year, 1, 1)
+        for weekday in range(DAYS_IN_WEEK):
+            if not self._weekdays[weekday]:
+                current = weekday_on_or_after(jan1, weekday)
+                while current.year == year:
+                    holidays.add(current)
+                    current += datetime.timedelta(days = DAYS_IN_WEEK)
+        for dt, rule in rule_dates.items():
+            if rule.movable and rule.move is not None and not self._weekdays[dt.weekday()]:
+                # may fall outside of the year, see _year_flags
+                holidays.add(self._move_holiday(dt, rule.move))
+        return frozenset(holidays)
+
+    def _year_flags(self, year):
+        """ One byte per day of the year, 1 for holidays and 0 for business days
+        """
+        return bytearray(self._cached_year_flags(year))
+
+    def _flags_of_holidays(self, year, holidays):
+        first = _jan1_ordinal(year)
+        flags = bytearray(_jan1_ordinal(year + 1) - first)
+        for dt in holidays:
+            i = dt.toordinal() - first
+            # moved holidays may fall outside of the year they were computed for,
+            # such days are not reported by is_holiday for the adjacent year either
+            if 0 <= i < len(flags):
+                flags[i] = 1
+        return flags
 
     def _move_holiday(self, dt, move):
-        next_day = dt + datetime.timedelta(days = 1)
-        while not self._weekdays[next_day.weekday()] or self._verify_holiday(next_day)[0]:
-            next_day += datetime.timedelta(days = 1)
+        started = _profiler.clock() if _profiler.enabled else None
+        ordinal = dt.toordinal()
+        next_day = ordinal + 1
+        while self._is_rule_holiday(next_day):
+            next_day += 1
+        searched = next_day - ordinal
         if move == 'closest':
-            prev_day = dt - datetime.timedelta(days = 1)
-            while not self._weekdays[prev_day.weekday()] or self._verify_holiday(prev_day)[0]:
-                prev_day -= datetime.timedelta(days = 1)
-            delta_prev = dt - prev_day
-            delta_next = next_day - dt
+            prev_day = ordinal - 1
+            while self._is_rule_holiday(prev_day):
+                prev_day -= 1
+            delta_prev = ordinal - prev_day
+            delta_next = next_day - ordinal
+            searched += delta_prev
             if delta_prev < delta_next:
                 result = prev_day
             else:
@@ -303,114 +1156,175 @@ class Calendar:
         else:
             # add next day to the list of moves
             result = next_day
-        return result
-
-
-    def _verify_holiday(self, dt):
-        move_day = None
-        weekday = dt.weekday()
-
-        is_weekend = not self._weekdays[weekday]
-
-        idiosyncratic, name, move = self._is_idiosyncratic(dt)
-        # No move rules for idiosyncratic holidays?
-        if idiosyncratic:
-            return True, name, None
-
-        if dt.month in self._dated_holidays:
-            holiday_day_descriptions = self._dated_holidays[dt.month]
-            if dt.day in holiday_day_descriptions:
-                name, move = holiday_day_descriptions[dt.day]
-                if move is not None and is_weekend:
-                    move_day = self._move_holiday(dt, move)
-                return True, name, move_day
-
-        if len(self._numbered_weekday_holidays[dt.month]) > 0:
-            for tup in self._numbered_weekday_holidays[dt.month]:
-                order, weekday, name = tup
-                # n-th day of the month holidays are usually not moved
-                # as they always happen on a particular day of the week
-                if dt.weekday() == weekday:
-                    if order > 0 and (((dt.day-1) // DAYS_IN_WEEK+1) == order):
-                        return True, name, None
-                    if order == -1:
-                        # last weekday of the month
-                        eom_day = eom(dt.year, dt.month)
-                        if dt == weekday_on_or_before(eom_day, weekday):
-                            return True, name, None
-
-        # if everything else in other categories does not work - check if it is weekend
-        if is_weekend:
-            return True, 'weekend', None
-
-        return False, '', move_day
+        if started is not None:
+            _profiler.add('holidays.move_holiday', _profiler.clock() - started, searched)
+        return datetime.datetime.fromordinal(result)
+
+class JointCalendar(BusinessDayCalendar):
+    """ Calendar combining holidays of several calendars
+
+    With join='union' a date is a holiday if it is a holiday in any of the calendars,
+    i.e. business days are days that are business days in all of them (e.g. settlement
+    in both US and UK). With join='intersection' a date is a holiday only if it is
+    a holiday in all calendars, i.e. it is a business day in at least one of them.
+
+    Holidays of the calendars are merged into a single table per year, so checking
+    a date costs the same as with a single calendar. Calendars must not be changed
+    after being combined.
+
+    Parameters
+    ----------
+    calendars: Calendar (or other BusinessDayCalendar) objects
+    join: 'union' or 'intersection'
+    """
+
+    def __init__(self, *calendars, join='union'):
+        BusinessDayCalendar.__init__(self)
+        if join not in ('union', 'intersection'):
+            raise ValueError("Unknown join '%s', must be 'union' or 'intersection'" % join)
+        if not calendars:
+            raise ValueError("JointCalendar requires at least one calendar")
+        self.calendars = calendars
+        self.join = join
+        self._flags_cache = self._new_year_cache()
+
+    def _year_caches(self):
+        return [self._flags_cache]
+
+    def _cached_year_flags(self, year):
+        """ Merged holiday flags of the year
+        """
+        flags = self._flags_cache.get(year)
+        if flags is None:
+            with self._year_lock(year):
+                flags = self._flags_cache.peek(year)
+                if flags is None:
+                    started = _profiler.clock() if _profiler.enabled else None
+                    first = self.calendars[0]._cached_year_flags(year)
+                    merged = int.from_bytes(first, 'little')
+                    for calendar in self.calendars[1:]:
+                        other = int.from_bytes(calendar._cached_year_flags(year), 'little')
+                        merged = merged | other if self.join == 'union' else merged & other
+                    flags = merged.to_bytes(len(first), 'little')
+                    self._flags_cache.put(year, flags)
+                    if started is not None:
+                        _profiler.cache_miss('holidays.joint_year')
+                        _profiler.add('holidays.joint_year_build', _profiler.clock() - started)
+        elif _profiler.enabled:
+            _profiler.cache_hit('holidays.joint_year')
+        return flags
+
+    def _year_flags(self, year):
+        return bytearray(self._cached_year_flags(year))
+
+def create_calendar(calendar_code):
+    """ New Calendar object with the built-in definition of a calendar
+
+    Unlike get_calendar, every call builds a separate calendar that can be changed,
+    e.g. with add_holiday, without affecting other users of the calendar code. The
+    built-in calendars are defined in calendars.json next to this module, which is
+    compiled once per process (see calendardef).
+    """
+    from findates.holidays.calendardef import _build_calendar, _builtin_definitions
+    definitions = _builtin_definitions()
+    code = calendar_code.lower()
+    compiled = definitions.get(_builtin_aliases().get(code, code))
+    if compiled is None:
+        raise ValueError('unknown calendar code \'%s\'' % calendar_code.lower())
+    return _build_calendar(compiled)
+
+def _builtin_aliases():
+    """ Other names of the built-in calendars mapped to their codes
+    """
+    from findates.holidays.calendardef import _builtin_definitions
+    return dict((alias, compiled['code']) for compiled in _builtin_definitions().values()
+                for alias in compiled['aliases'])
+
+# Other names of calendars mapped to their codes, starting with the aliases of the
+# built-in calendars when the registry is first used
+_calendar_aliases = None
+
+def _aliases():
+    global _calendar_aliases
+    if _calendar_aliases is None:
+        aliases = _builtin_aliases()
+        with _registry_lock:
+            if _calendar_aliases is None:
+                _calendar_aliases = aliases
+    return _calendar_aliases
+
+# Shared calendars by code, alias and the spellings they were requested with,
+# replaced as a whole when a calendar is registered
+_calendars = dict()
+_registered_codes = set()
+_registry_lock = threading.Lock()
 
 def get_calendar(calendar_code):
-    cl = Calendar()
-    calendar_code = calendar_code.lower()
-    if calendar_code == 'us' or calendar_code == 'united states':
-        cl.add_holiday("weekend", "Saturday")
-        cl.add_holiday("weekend", "Sunday")
-        cl.add_holiday("New Year's Day", "January 1st", move='closest')
-        cl.add_holiday("Martin Luther King's birthday", "3rd Monday in January")
-        cl.add_holiday("Presidents' day", "3rd Monday in February")
-        cl.add_holiday("Independence Day", "July 4th", move='closest')
-        cl.add_holiday("Labor Day", "1st Monday in September")
-        cl.add_holiday("Columbus Day", "2nd Monday in October")
-        cl.add_holiday("Veterans Day", "November 11th", move='closest')
-        cl.add_holiday("Thanksgiving", "4th Thursday in November")
-        cl.add_holiday("Christmas", "December 25th", move='closest')
-    elif calendar_code == "ca" or calendar_code == "canada":
-        cl.add_holiday("weekend", "Saturday")
-        cl.add_holiday("weekend", "Sunday")
-        cl.add_holiday("New Year's Day", "January 1st", move='next')
-        cl.add_holiday("Good Friday", "Good Friday")
-        cl.add_holiday("Easter Monday", "Easter Monday")
-        cl.add_holiday("Victoria Day", "Victoria Day")
-        cl.add_holiday("Canada Day", "July 1st", move='next')
-        cl.add_holiday("Civic Holiday", "1st Monday in August")
-        cl.add_holiday("Labor Day", "1st Monday in September")
-        cl.add_holiday("Thanksgiving", "2nd Monday in October")
-        cl.add_holiday("Remembrance Day", "November 11th")
-        cl.add_holiday("Christmas", "December 25th", move='next')
-        cl.add_holiday("Boxing Day", "December 26th", move='next')
-    elif calendar_code == 'de':
-        cl.add_holiday("weekend", "Saturday")
-        cl.add_holiday("weekend", "Sunday")
-        cl.add_holiday("New Year's Day", "January 1st", move='next')
-        cl.add_holiday("Good Friday", "Good Friday")
-        cl.add_holiday("Easter Monday", "Easter Monday")
-        cl.add_holiday("Ascension Thursday", "Ascension Thursday")
-        cl.add_holiday("Whit Monday", "Whit Monday")
-        cl.add_holiday("Corpus Christi Thursday", "Corpus Christi Thursday")
-        cl.add_holiday("Labour Day", "May 1st")
-        cl.add_holiday("National Day", "October 3rd")
-        cl.add_holiday("Christmas Eve", "December 24th")
-        cl.add_holiday("Christmas", "December 25th")
-        cl.add_holiday("Boxing Day", "December 26th")
-        cl.add_holiday("New Year's Eve", "December 31st")
-    elif calendar_code == 'de.frankfurt' or calendar_code == 'de.xetra' or calendar_code == 'de.eurex':
-        cl.add_holiday("weekend", "Saturday")
-        cl.add_holiday("weekend", "Sunday")
-        cl.add_holiday("New Year's Day", "January 1st", move='next')
-        cl.add_holiday("Good Friday", "Good Friday")
-        cl.add_holiday("Easter Monday", "Easter Monday")
-        cl.add_holiday("Labour Day", "May 1st")
-        cl.add_holiday("Christmas Eve", "December 24th")
-        cl.add_holiday("Christmas", "December 25th")
-        cl.add_holiday("Boxing Day", "December 26th")
-        cl.add_holiday("New Year's Eve", "December 31st")
-    elif calendar_code == 'uk':
-        cl.add_holiday("weekend", "Saturday")
-        cl.add_holiday("weekend", "Sunday")
-        cl.add_holiday("New Year's Day", "January 1st", move='next')
-        cl.add_holiday("Good Friday", "Good Friday")
-        cl.add_holiday("Easter Monday", "Easter Monday")
-        cl.add_holiday("Early May Bank Holiday", "1st Monday in May")
-        cl.add_holiday("Spring Bank Holiday", "last Monday in May")
-        cl.add_holiday("Summer Bank Holiday", "last Monday in August")
-        cl.add_holiday("Christmas", "December 25th", move='next')
-        cl.add_holiday("Boxing Day", "December 26th", move='next')
-    else:
-        raise ValueError('unknown calendar code \'%s\'' % calendar_code)
-    return cl
+    """ Shared, frozen calendar by code or alias (case insensitive)
+
+    Built-in calendars are created on first use and reused by all later calls, so
+    holidays computed for a year are computed once per process. The calendars
+    cannot be changed, use create_calendar for a private copy of a built-in
+    calendar and register_calendar to add calendars or to precompute years.
+    """
+    calendar = _calendars.get(calendar_code)
+    if calendar is None:
+        calendar = _registered_calendar(calendar_code)
+    return calendar
+
+def _registered_calendar(calendar_code):
+    code = calendar_code.lower()
+    code = _aliases().get(code, code)
+    with _registry_lock:
+        calendar = _calendars.get(code)
+        if calendar is None:
+            calendar = create_calendar(code)
+            calendar.freeze()
+            _calendars[code] = calendar
+        _calendars[calendar_code] = calendar
+    return calendar
+
+def register_calendar(calendar_code, calendar=None, aliases=(), start_year=None, end_year=None):
+    """ Make a calendar available to get_calendar
+
+    The calendar is frozen, optionally precomputing a range of years, and replaces
+    a calendar registered with the same code before.
+
+    Parameters
+    ----------
+    calendar_code: code or alias of the calendar
+    calendar: Calendar (or other BusinessDayCalendar) object, None for the built-in
+        calendar with the code, e.g. to precompute years of it
+    aliases: other names of the calendar
+    start_year, end_year: range of years (inclusive) to precompute, see freeze
+
+    Returns
+    -------
+    the registered calendar
+    """
+    global _calendars
+    code = calendar_code.lower()
+    # an alias registers (and replaces) the calendar it stands for
+    code = _aliases().get(code, code)
+    names = set([code] + [alias.lower() for alias in aliases])
+    if calendar is None:
+        calendar = create_calendar(code)
+    calendar.freeze(start_year, end_year)
+    with _registry_lock:
+        _calendar_aliases.pop(code, None)
+        for alias in names - set([code]):
+            _calendar_aliases[alias] = code
+        # drop the calendar registered before and names resolved to other calendars
+        previous = _calendars.get(code)
+        calendars = dict((name, cal) for name, cal in _calendars.items()
+                         if cal is not previous and name.lower() not in names)
+        calendars[code] = calendar
+        _calendars = calendars
+        _registered_codes.add(code)
+    return calendar
+
+def calendar_codes():
+    """ Codes of built-in and registered calendars, without aliases
+    """
+    from findates.holidays.calendardef import _builtin_definitions
+    return sorted(set(_builtin_definitions()) | _registered_codes)
@@ -0,0 +1,222 @@
+"""
+Opt-in instrumentation of findates hot paths
+
+When enabled, instrumented code paths record the number of calls, cumulative
+time and the number of items processed (e.g. days stepped over while rolling
+a date), per path and optional label (e.g. daycount convention). Hit and miss
+counts of the date string cache of asdatetime and of the holiday year caches of
+calendars are reported as well. When disabled, instrumented paths only check
+a flag.
+
+Caches:
+    asdatetime                          parsed date strings
+    holidays.year                       holidays of years of Calendar objects, lookups
+                                        of the year of the previous query are not counted
+                                        unless the cache size is bounded
+    holidays.joint_year                 merged holidays of years of JointCalendar objects
+
+Instrumented paths:
+    dateutils.sniff_datetime_format     format sniffing
+    dateutils.parse_datetime_string     date strings parsed by asdatetime, cache hits
+                                        are not timed
+    holidays.year_build                 holidays of a year computed for a Calendar
+    holidays.joint_year_build           merged holidays of a year of a JointCalendar
+    holidays.rule_dates                 dates of holiday rules of a year
+    holidays.idiosyncratic              idiosyncratic holiday functions, by description
+    holidays.move_holiday               moving holidays, items are days searched
+    busdayrule.rolldate                 rolldate, by convention
+    busdayrule.roll_forward             forward rolling, items are days stepped over
+    busdayrule.roll_backward            backward rolling, items are days stepped over
+    daycount.parameters                 day count parameters, by convention
+    daycount.parameters_array           vectorized day count parameters, by convention,
+                                        items are dates
+
+Example
+-------
+>>> from findates.profiling import profiler
+>>> with profiler.collect():
+...     rolldate('25 Dec 2011', calendar, 'follow')
+>>> print(profiler.to_prometheus())
+"""
+
+import collections
+import contextlib
+import threading
+import time
+
+Counter = collections.namedtuple('Counter', 'path label calls seconds items')
+
+class Profiler:
+    """ Counters of instrumented code paths
+
+    Instrumented code checks the enabled attribute before recording anything, so
+    use enable, disable and collect rather than setting it directly.
+    """
+
+    clock = staticmethod(time.perf_counter)
+
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        self._counters = dict()
+        self._caches = dict()
+        # lookups of the asdatetime cache are counted by functools.lru_cache, recorded
+        # are the differences of its counts between enabling and disabling
+        self._parse_recorded = (0, 0)
+        self._parse_baseline = None
+
+    def enable(self):
+        """ Start recording, counters recorded so far are kept
+        """
+        if not self.enabled:
+            self._parse_baseline = _parse_cache_counts()
+        self.enabled = True
+
+    def disable(self):
+        """ Stop recording, counters are kept until reset
+        """
+        if self.enabled:
+            self._parse_recorded = self._parse_counts()
+            self._parse_baseline = None
+        self.enabled = False
+
+    def reset(self):
+        """ Drop all recorded counters
+        """
+        with self._lock:
+            self._counters = dict()
+            self._caches = dict()
+            self._parse_recorded = (0, 0)
+            if self._parse_baseline is not None:
+                self._parse_baseline = _parse_cache_counts()
+
+    @contextlib.contextmanager
+    def collect(self, reset=True):
+        """ Context manager recording counters within the block
+
+        Parameters
+        ----------
+        reset: drop counters recorded before entering the block
+        """
+        enabled = self.enabled
+        if reset:
+            self.reset()
+        self.enable()
+        try:
+            yield self
+        finally:
+            if not enabled:
+                self.disable()
+
+    def add(self, path, seconds=0.0, items=0, label=None):
+        """ Record a call of an instrumented path
+        """
+        key = (path, label)
+        with self._lock:
+            counter = self._counters.get(key)
+            if counter is None:
+                self._counters[key] = [1, seconds, items]
+            else:
+                counter[0] += 1
+                counter[1] += seconds
+                counter[2] += items
+
+    def cache_hit(self, cache):
+        with self._lock:
+            self._caches.setdefault(cache, [0, 0])[0] += 1
+
+    def cache_miss(self, cache):
+        with self._lock:
+            self._caches.setdefault(cache, [0, 0])[1] += 1
+
+    def _parse_counts(self):
+        hits, misses = self._parse_recorded
+        baseline = self._parse_baseline
+        if baseline is not None:
+            current = _parse_cache_counts()
+            hits += current[0] - baseline[0]
+            misses += current[1] - baseline[1]
+        return hits, misses
+
+    def counters(self):
+        """ Recorded counters as a list of Counter(path, label, calls, seconds, items)
+        """
+        with self._lock:
+            items = list(self._counters.items())
+        return [Counter(path, label, *values) for (path, label), values in
+                sorted(items, key=lambda item: (item[0][0], str(item[0][1])))]
+
+    def snapshot(self):
+        """ Recorded counters as a JSON serializable dict
+
+        Returns
+        -------
+        dict with keys
+            enabled: whether recording is on
+            counters: list of dicts with path, label, calls, seconds, items
+            caches: dict of cache name to dict with hits, misses and hit_rate
+                    (None before the first lookup); 'asdatetime' counts lookups
+                    of parsed date strings while recording was enabled
+        """
+        with self._lock:
+            caches = dict((name, list(counts)) for name, counts in self._caches.items())
+        caches['asdatetime'] = self._parse_counts()
+        return dict({
+            'enabled': self.enabled,
+            'counters': [counter._asdict() for counter in self.counters()],
+            'caches': dict((name, dict({
+                'hits': hits,
+                'misses': misses,
+                'hit_rate': float(hits) / (hits + misses) if hits + misses else None
+            })) for name, (hits, misses) in sorted(caches.items()))
+        })
+
+    def to_json(self, **kwargs):
+        """ Snapshot as JSON text, keyword arguments are passed to json.dumps
+        """
+        import json
+        return json.dumps(self.snapshot(), **kwargs)
+
+    def to_prometheus(self, prefix='findates'):
+        """ Snapshot in Prometheus text exposition format
+        """
+        snapshot = self.snapshot()
+        lines = []
+
+        def metric(name, help_text, samples):
+            lines.append('# HELP %s_%s %s' % (prefix, name, help_text))
+            lines.append('# TYPE %s_%s counter' % (prefix, name))
+            for labels, value in samples:
+                text = ','.join('%s="%s"' % (key, _escape_label(value)) for key, value in labels)
+                lines.append('%s_%s{%s} %s' % (prefix, name, text, repr(value)))
+
+        def counter_labels(counter):
+            labels = [('path', counter['path'])]
+            if counter['label'] is not None:
+                labels.append(('label', counter['label']))
+            return labels
+
+        counters = snapshot['counters']
+        metric('calls_total', 'Calls of instrumented code paths',
+               [(counter_labels(c), c['calls']) for c in counters])
+        metric('seconds_total', 'Time spent in instrumented code paths',
+               [(counter_labels(c), c['seconds']) for c in counters])
+        metric('items_total', 'Items processed by instrumented code paths',
+               [(counter_labels(c), c['items']) for c in counters])
+        caches = sorted(snapshot['caches'].items())
+        metric('cache_hits_total', 'Cache hits',
+               [([('cache', name)], counts['hits']) for name, counts in caches])
+        metric('cache_misses_total', 'Cache misses',
+               [([('cache', name)], counts['misses']) for name, counts in caches])
+        return '\n'.join(lines) + '\n'
+
+def _parse_cache_counts():
+    from findates.dateutils.dateutils import _parse_datetime_string
+    info = _parse_datetime_string.cache_info()
+    return info.hits, info.misses
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+# process wide profiler used by instrumented code
+profiler = Profiler()
@@ -0,0 +1 @@
+from .schedule import *
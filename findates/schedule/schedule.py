@@ -0,0 +1,262 @@
+"""
+Coupon schedules: unadjusted and business day adjusted period dates with
+accrual year fractions
+"""
+
+import collections
+import datetime
+
+from findates.busdayrule import rolldate, rolldate_array
+from findates.daycount import yearfrac, yearfrac_array
+from findates.dateutils import MONTHS_IN_YEAR, asdatetime, asordinal_array, eom, ordinals_to_datetime64
+from findates.dateutils.dateutils import _days_in_month_array
+
+_frequency_months = dict({
+    'annual': 12,
+    'yearly': 12,
+    'semiannual': 6,
+    'semi-annual': 6,
+    'quarterly': 3,
+    'monthly': 1
+})
+
+_stub_rules = {'short front', 'long front', 'short back', 'long back'}
+
+def _months_in_period(frequency):
+    """ Number of months in the coupon period for frequency name or number of months
+    """
+    if isinstance(frequency, int):
+        months = frequency
+    else:
+        try:
+            months = _frequency_months[frequency.lower()]
+        except KeyError:
+            raise ValueError("Unknown frequency '%s'" % frequency)
+    if months <= 0:
+        raise ValueError("Number of months in period must be positive, got %d" % months)
+    return months
+
+def _check_stub(stub):
+    stub = stub.lower()
+    if stub not in _stub_rules:
+        raise ValueError("Unknown stub rule '%s', must be one of %s" % (stub, ', '.join(sorted(_stub_rules))))
+    return stub
+
+def _daycount_kwargs(months, kwargs):
+    """ Daycount keyword parameters, 'frequency' is set for annual schedules
+    """
+    kwargs = dict(kwargs)
+    if months == MONTHS_IN_YEAR and 'frequency' not in kwargs:
+        kwargs['frequency'] = 'yearly'
+    return kwargs
+
+def _shift_months(anchor, months, eom_rule):
+    """ Date months away from anchor, day is capped by the end of month and, with
+        eom_rule, end of month anchors stay at the end of month
+    """
+    index = anchor.year*MONTHS_IN_YEAR + anchor.month - 1 + months
+    year, month = divmod(index, MONTHS_IN_YEAR)
+    last_day = eom(year, month + 1)
+    if eom_rule and anchor == eom(anchor.year, anchor.month):
+        return last_day
+    return datetime.datetime(year, month + 1, min(anchor.day, last_day.day))
+
+def unadjusted_dates(effective, maturity, frequency, stub='short front', eom=False):
+    """ Unadjusted schedule dates from effective date to maturity
+
+    Front stubs are generated by rolling backward from maturity, back stubs by rolling
+    forward from effective date. A short stub is the remaining part of the period,
+    a long stub also includes the adjacent regular period.
+
+    Parameters
+    ----------
+    effective, maturity: datetime.date, datetime.datetime or date string
+    frequency: 'annual', 'semiannual', 'quarterly', 'monthly' or number of months in period
+    stub: one of 'short front', 'long front', 'short back', 'long back'
+    eom: if anchor date (maturity for front stubs, effective date for back stubs) is
+        the end of month, all regular dates are ends of month
+
+    Returns
+    -------
+    list of datetime.datetime dates including effective date and maturity
+    """
+    effective, maturity = asdatetime(effective), asdatetime(maturity)
+    if effective >= maturity:
+        raise ValueError("Effective date must precede maturity")
+    months = _months_in_period(frequency)
+    stub = _check_stub(stub)
+    if stub.endswith('front'):
+        regular = [maturity]
+        k = 1
+        while True:
+            dt = _shift_months(maturity, -k*months, eom)
+            if dt <= effective:
+                break
+            regular.append(dt)
+            k += 1
+        has_stub = dt != effective
+        if stub == 'long front' and has_stub and len(regular) > 1:
+            regular.pop()
+        return [effective] + regular[::-1]
+    else:
+        regular = [effective]
+        k = 1
+        while True:
+            dt = _shift_months(effective, k*months, eom)
+            if dt >= maturity:
+                break
+            regular.append(dt)
+            k += 1
+        has_stub = dt != maturity
+        if stub == 'long back' and has_stub and len(regular) > 1:
+            regular.pop()
+        return regular + [maturity]
+
+class Schedule:
+    """ Coupon schedule of a single instrument
+
+    Parameters
+    ----------
+    effective, maturity: datetime.date, datetime.datetime or date string
+    frequency: 'annual', 'semiannual', 'quarterly', 'monthly' or number of months in period
+    calendar: holiday calendar for business day adjustment, dates are not adjusted if None
+    convention: business day convention, see busdayrule.rolldate
+    daycount: daycount convention for accrual fractions, not computed if None
+    stub: one of 'short front', 'long front', 'short back', 'long back'
+    eom: end of month rule, see unadjusted_dates
+    Other keyword parameters are passed to yearfrac
+
+    Attributes
+    ----------
+    unadjusted: list of unadjusted dates
+    adjusted: list of business day adjusted dates
+    yearfractions: accrual fractions of the periods between adjusted dates
+    """
+
+    def __init__(self, effective, maturity, frequency, calendar=None, convention='modfollow',
+                 daycount=None, stub='short front', eom=False, **kwargs):
+        self.unadjusted = unadjusted_dates(effective, maturity, frequency, stub, eom)
+        if calendar is None:
+            self.adjusted = list(self.unadjusted)
+        else:
+            self.adjusted = [rolldate(dt, calendar, convention) for dt in self.unadjusted]
+        if daycount is None:
+            self.yearfractions = None
+        else:
+            kwargs = _daycount_kwargs(_months_in_period(frequency), kwargs)
+            self.yearfractions = [yearfrac(start, end, daycount, **kwargs)
+                                  for start, end in zip(self.adjusted[:-1], self.adjusted[1:])]
+
+    def __len__(self):
+        """ Number of periods
+        """
+        return len(self.unadjusted) - 1
+
+    def periods(self):
+        """ List of (start, end) tuples of adjusted period dates
+        """
+        return list(zip(self.adjusted[:-1], self.adjusted[1:]))
+
+ScheduleColumns = collections.namedtuple('ScheduleColumns', [
+    'instrument', 'unadjusted_start', 'unadjusted_end', 'start', 'end', 'yearfraction'])
+ScheduleColumns.__doc__ = """ Periods of many schedules as column arrays, one row per period
+
+instrument: index of the instrument in the input arrays
+unadjusted_start, unadjusted_end: unadjusted period dates (datetime64[D])
+start, end: business day adjusted period dates (datetime64[D])
+yearfraction: accrual fractions of adjusted periods (None if no daycount was given)
+"""
+
+def _regular_dates_array(anchor, count, step, eom_rule):
+    """ Regular dates anchor + k*step months for k in 0..count-1 of each anchor
+
+    Returns
+    -------
+    instrument index, k and ordinals of generated dates
+    """
+    import numpy as np
+    n = len(anchor)
+    instrument = np.repeat(np.arange(n), count)
+    starts = np.concatenate(([0], np.cumsum(count)[:-1]))
+    k = np.arange(int(count.sum())) - np.repeat(starts, count)
+    days = ordinals_to_datetime64(anchor)
+    anchor_months = days.astype('datetime64[M]')
+    anchor_day = (days - anchor_months).astype(np.int64) + 1
+    anchor_index = anchor_months.astype(np.int64) + 1970*MONTHS_IN_YEAR
+    anchor_eom = anchor_day == _days_in_month_array(anchor_index // MONTHS_IN_YEAR,
+                                                    anchor_index % MONTHS_IN_YEAR + 1)
+    index = anchor_index[instrument] + k*step
+    last_day = _days_in_month_array(index // MONTHS_IN_YEAR, index % MONTHS_IN_YEAR + 1)
+    day = np.minimum(anchor_day[instrument], last_day)
+    if eom_rule:
+        day = np.where(anchor_eom[instrument], last_day, day)
+    months = (index - 1970*MONTHS_IN_YEAR).astype('datetime64[M]')
+    ordinals = asordinal_array(months.astype('datetime64[D]')) + day - 1
+    return instrument, k, ordinals
+
+def schedule_arrays(effective, maturity, frequency, calendar=None, convention='modfollow',
+                    daycount=None, stub='short front', eom=False, **kwargs):
+    """ Generate schedules of many instruments sharing frequency, calendar and conventions
+
+    Dates of all schedules are generated, adjusted (with business day tables of the
+    calendar, see busdayrule.rolldate_array) and counted (daycount.yearfrac_array) in
+    a single pass over NumPy arrays. Results are the same as of Schedule objects.
+
+    Parameters
+    ----------
+    effective, maturity: arrays of dates (datetime64, ordinals or sequences of dates)
+    Other parameters are the same as for Schedule
+
+    Returns
+    -------
+    ScheduleColumns with one row per period, ordered by instrument and date
+    """
+    import numpy as np
+    eff, mat = np.broadcast_arrays(asordinal_array(effective), asordinal_array(maturity))
+    eff, mat = eff.ravel(), mat.ravel()
+    if (eff >= mat).any():
+        raise ValueError("Effective date must precede maturity")
+    months = _months_in_period(frequency)
+    stub = _check_stub(stub)
+    front = stub.endswith('front')
+    anchor, other = (mat, eff) if front else (eff, mat)
+    step = -months if front else months
+
+    # number of candidate dates, enough to reach over the other end of the schedule
+    month_index = ordinals_to_datetime64(np.concatenate((anchor, other))).astype('datetime64[M]').astype(np.int64)
+    span = np.abs(month_index[:len(anchor)] - month_index[len(anchor):])
+    count = span // months + 2
+    instrument, k, dates = _regular_dates_array(anchor, count, step, eom)
+    # dates move away from the anchor with k, so regular dates inside of the schedule
+    # are the first regular_count candidates of each instrument
+    inside = dates > other[instrument] if front else dates < other[instrument]
+    regular_count = np.bincount(instrument[inside], minlength=len(anchor))
+    # there is a stub unless the first candidate outside falls exactly on the other end
+    boundary = k == regular_count[instrument]
+    has_stub = np.ones(len(anchor), dtype=bool)
+    has_stub[instrument[boundary]] = dates[boundary] != other[instrument[boundary]]
+    keep = inside
+    if stub.startswith('long'):
+        # merge the stub with the adjacent regular period
+        last_regular = inside & (k == regular_count[instrument] - 1)
+        keep = inside & ~(last_regular & has_stub[instrument] & (regular_count[instrument] > 1))
+    instrument = np.concatenate((instrument[keep], np.arange(len(anchor))))
+    dates = np.concatenate((dates[keep], other))
+    order = np.lexsort((dates, instrument))
+    instrument, dates = instrument[order], dates[order]
+
+    same = instrument[1:] == instrument[:-1]
+    row_instrument = instrument[1:][same]
+    unadjusted_start, unadjusted_end = dates[:-1][same], dates[1:][same]
+    if calendar is None:
+        adjusted = dates
+    else:
+        adjusted = rolldate_array(dates, calendar, convention)
+    start, end = adjusted[:-1][same], adjusted[1:][same]
+    if daycount is None:
+        fractions = None
+    else:
+        fractions = yearfrac_array(start, end, daycount, **_daycount_kwargs(months, kwargs))
+    return ScheduleColumns(row_instrument, ordinals_to_datetime64(unadjusted_start),
+                           ordinals_to_datetime64(unadjusted_end), ordinals_to_datetime64(start),
+                           ordinals_to_datetime64(end), fractions)
@@ -1,10 +1,30 @@
+import array
+import json
 import nose
+import os
+import pickle
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
 import unittest
 
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
 from findates.busdayrule import *
 from findates.dateutils import *
 from findates.daycount import *
+from findates.daycount.daycount import _daycount_functions, _dc_norm, _period_has_29feb_ordinal
+from findates.dateutils.dateutils import _jan1_ordinal, _leapyears_through, _parse_datetime_string
 from findates.holidays import *
+from findates.holidays import calendardef
+from findates.profiling import Profiler, profiler
+from findates.schedule import *
 
 
 class HolidaysTestCase(unittest.TestCase):
@@ -42,6 +62,24 @@ class HolidaysTestCase(unittest.TestCase):
         self.dteq("1/14/1978", 1978, 1, 14)
         self.dteq("1/4/1978", 1978, 1, 4)
 
+    def test_asdatetime_fixed_width(self):
+        self.dteq("29-FEB-2012", 2012, 2, 29)
+        self.dteq("29-feb-2012", 2012, 2, 29)
+        self.assertRaises(ValueError, asdatetime, "2012-02-30")
+        self.assertRaises(ValueError, asdatetime, "30.02.2012")
+        self.assertRaises(ValueError, asdatetime, "30-Foo-2012")
+        self.assertRaises(ValueError, asdatetime, "2012/02/30")
+
+    def test_date_parser(self):
+        parse = DateParser()
+        self.assertEqual(parse("04.11.1978"), datetime.datetime(1978, 11, 4))
+        self.assertEqual(parse.format, '%d.%m.%Y')
+        # variable width strings fall back to the locked strptime format
+        self.assertEqual(parse("4.11.1978"), datetime.datetime(1978, 11, 4))
+        self.assertRaises(ValueError, parse, "1978-11-04")
+        parse = DateParser('%m/%d/%Y')
+        self.assertEqual(parse("11/04/1978"), datetime.datetime(1978, 11, 4))
+
     def test_leapyear(self):
         self.assertTrue(leapyear(1980))
         self.assertFalse(leapyear(1900))
@@ -67,6 +105,18 @@ class HolidaysTestCase(unittest.TestCase):
         self.assertTrue(iseom('31 Oct 2000'))
         self.assertTrue(iseom('30 Nov 2000'))
         self.assertTrue(iseom('31 Dec 2000'))
+        self.assertTrue(iseom(datetime.date(2000, 2, 29).toordinal()))
+        self.assertFalse(iseom(datetime.date(2000, 2, 28).toordinal()))
+
+    def test_eom_ordinal(self):
+        self.assertEqual(eom(2000, 2, ordinal=True), datetime.date(2000, 2, 29).toordinal())
+        self.assertEqual(eom(2001, 12, ordinal=True), datetime.date(2001, 12, 31).toordinal())
+        self.assertEqual(eom(1600, 2, ordinal=True), datetime.date(1600, 2, 29).toordinal())
+        self.assertRaises(ValueError, eom, 1700, 2)
+        self.assertRaises(ValueError, eom, 1700, 2, ordinal=True)
+        self.assertRaises(ValueError, lbusdate, 1700, 2, get_calendar('us'))
+        self.assertEqual(asordinal(730000), 730000)
+        self.assertTrue(get_calendar('us').is_holiday(datetime.date(2012, 7, 4).toordinal()))
 
     def test_nweekday(self):
         self.assertEqual(lweekday(2011, 9, 6).day, 25)
@@ -86,6 +136,21 @@ class HolidaysTestCase(unittest.TestCase):
         self.assertEaster(2009, 4, 12)
         self.assertEaster(2012, 4, 8)
 
+    def test_easter_feasts(self):
+        self.assertEqual(good_friday(2012), datetime.datetime(2012, 4, 6))
+        self.assertEqual(whit_monday(2012), datetime.datetime(2012, 5, 28))
+        for name, function in idiosyncratic_holidays.items():
+            if name in easter_offsets:
+                self.assertEqual(function(1961) - easter(1961),
+                                 datetime.timedelta(days=easter_offsets[name]))
+
+    @unittest.skipIf(numpy is None, "numpy is not installed")
+    def test_easter_array(self):
+        years = range(1583, 2500)
+        self.assertEqual(list(easter_array(years).astype(object)), [easter(y).date() for y in years])
+        self.assertEqual(list(easter_array([2012, 2013], easter_offsets['good friday']).astype(object)),
+                         [datetime.date(2012, 4, 6), datetime.date(2013, 3, 29)])
+
     def test_calendar_specificDates(self):
         cl = get_calendar('us')
         # Test holidays on a specific date
@@ -113,6 +178,342 @@ class HolidaysTestCase(unittest.TestCase):
         # Canada Day in 2012 is on Sunday
         self.assertTrue(cl.is_holiday('02 Jul 2012'))
 
+    def test_holiday_rules(self):
+        self.assertEqual(FixedDateHoliday('Leap Day', 2, 29).dates(2011), [])
+        self.assertEqual(WeekdayHoliday('Thanksgiving', 11, 4, THURSDAY).dates(2012),
+                         [datetime.datetime(2012, 11, 22)])
+        self.assertEqual(WeekdayHoliday('Fifth Monday', 2, 5, MONDAY).dates(2011), [])
+        self.assertEqual(WeekdayHoliday('Fifth Monday', 4, 5, MONDAY).dates(2012), [datetime.datetime(2012, 4, 30)])
+        self.assertEqual(WeekdayHoliday("Presidents' day", 2, 3, MONDAY).dates(1700),
+                         [datetime.datetime(1700, 2, 15)])
+        us = create_calendar('us')
+        self.assertTrue(us.is_holiday('15 Feb 1700'))
+        self.assertFalse(us.is_holiday('1 Jun 1700'))
+        self.assertEqual(us.compile(1699, 1701).count(asordinal('1 Jan 1699'), asordinal('1 Jan 1702')),
+                         sum(not us.is_holiday(o) for o in range(asordinal('1 Jan 1699'), asordinal('1 Jan 1702'))))
+        self.assertEqual(WeekdayHoliday('Spring Bank Holiday', 5, -1, MONDAY).dates(2012),
+                         [datetime.datetime(2012, 5, 28)])
+        self.assertEqual(IdiosyncraticHoliday('Good Friday', 'Good Friday').dates(2012),
+                         [datetime.datetime(2012, 4, 6)])
+        cl = create_calendar('us')
+        self.assertFalse(cl.is_holiday('15 Aug 2012'))
+        cl.add_rule(FixedDateHoliday('Closure', 8, 15))
+        self.assertTrue(cl.is_holiday('15 Aug 2012'))
+
+    def test_colliding_moves(self):
+        cl = get_calendar('ca')
+        # In 2010 both Christmas (Saturday) and Boxing Day (Sunday) are moved to Monday
+        self.assertTrue(cl.is_holiday('27 Dec 2010'))
+        self.assertFalse(cl.is_holiday('28 Dec 2010'))
+
+class JointCalendarTestCase(unittest.TestCase):
+    def test_joint_calendar(self):
+        us, uk = get_calendar('us'), get_calendar('uk')
+        both = JointCalendar(us, uk)
+        either = JointCalendar(us, uk, join='intersection')
+        dt = datetime.date(2012, 1, 1)
+        while dt.year == 2012:
+            self.assertEqual(both.is_holiday(dt), us.is_holiday(dt) or uk.is_holiday(dt))
+            self.assertEqual(either.is_holiday(dt), us.is_holiday(dt) and uk.is_holiday(dt))
+            dt += datetime.timedelta(days=1)
+        # Independence Day is a business day in UK only
+        self.assertTrue(both.is_holiday('4 Jul 2012'))
+        self.assertFalse(either.is_holiday('4 Jul 2012'))
+        self.assertRaises(ValueError, JointCalendar, us, uk, join='xor')
+
+    def test_joint_calendar_rolldate(self):
+        cal = JointCalendar(get_calendar('us'), get_calendar('uk'))
+        # Good Friday in UK, then weekend
+        self.assertEqual(rolldate('6 Apr 2012', cal, 'follow'), datetime.datetime(2012, 4, 10))
+        cal.compile(2012, 2012)
+        self.assertEqual(rolldate('6 Apr 2012', cal, 'follow'), datetime.datetime(2012, 4, 10))
+        self.assertEqual(cal.count_business_days('1 Apr 2012', '1 May 2012'), 19)
+
+class CalendarThreadingTestCase(unittest.TestCase):
+    def test_concurrent_years(self):
+        cal, reference = create_calendar('uk'), get_calendar('uk')
+        dates = [datetime.datetime(1990, 1, 1) + datetime.timedelta(days=i) for i in range(0, 7300, 3)]
+        results = dict()
+
+        def worker(k):
+            results[k] = [cal.is_holiday(dt) for dt in dates[k::2] + dates[::-1]]
+
+        threads = [threading.Thread(target=worker, args=(k,)) for k in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for k in range(4):
+            self.assertEqual(results[k], [reference.is_holiday(dt) for dt in dates[k::2] + dates[::-1]])
+
+    def test_freeze(self):
+        cal = create_calendar('us')
+        self.assertFalse(cal.frozen)
+        index = cal.freeze(2000, 2020)
+        self.assertTrue(cal.frozen)
+        self.assertEqual((index.start_year, index.end_year), (2000, 2020))
+        self.assertRaises(ValueError, cal.add_holiday, 'Closure', 'August 15th')
+        self.assertRaises(ValueError, cal.add_holiday, 'weekend', 'Friday')
+        self.assertTrue(cal.is_holiday('4 Jul 2010'))
+        # dates outside of the frozen range are still available
+        self.assertTrue(cal.is_holiday('4 Jul 2030'))
+
+    def test_pickle(self):
+        cal = pickle.loads(pickle.dumps(get_calendar('us')))
+        self.assertTrue(cal.is_holiday('25 Dec 2012'))
+        self.assertEqual(cal.compile(2012, 2012).count(asordinal('1 Jan 2012'), asordinal('1 Jan 2013')), 252)
+
+class CalendarRegistryTestCase(unittest.TestCase):
+    def test_shared(self):
+        us = get_calendar('us')
+        self.assertIs(get_calendar('US'), us)
+        self.assertIs(get_calendar('United States'), us)
+        self.assertIs(get_calendar('de.xetra'), get_calendar('de.eurex'))
+        self.assertIsNot(create_calendar('us'), us)
+        self.assertTrue(us.frozen)
+        self.assertRaises(ValueError, us.add_holiday, 'Closure', 'August 15th')
+        self.assertRaises(ValueError, get_calendar, 'xx')
+        self.assertIn('de.frankfurt', calendar_codes())
+
+    def test_builtin_definitions(self):
+        self.assertEqual(create_calendar('Canada').fingerprint(), create_calendar('ca').fingerprint())
+        self.assertEqual(create_calendar('de.eurex').fingerprint(), get_calendar('de.frankfurt').fingerprint())
+        self.assertNotEqual(create_calendar('de').fingerprint(), create_calendar('de.frankfurt').fingerprint())
+        self.assertRaises(ValueError, create_calendar, 'xx')
+        self.assertTrue(set(['ca', 'de', 'de.frankfurt', 'uk', 'us']) <= set(calendar_codes()))
+
+    def test_register(self):
+        cal = create_calendar('uk')
+        cal.add_holiday('Closure', 'August 15th')
+        registered = register_calendar('uk.test', cal, aliases=['UK Test'], start_year=2010, end_year=2012)
+        self.assertIs(registered, cal)
+        self.assertIs(get_calendar('uk test'), cal)
+        self.assertEqual((cal._index.start_year, cal._index.end_year), (2010, 2012))
+        self.assertTrue(get_calendar('uk.test').is_holiday('15 Aug 2011'))
+        self.assertIn('uk.test', calendar_codes())
+        # replaced by a later registration
+        other = register_calendar('uk.test', create_calendar('uk'))
+        self.assertIs(get_calendar('UK Test'), other)
+        self.assertFalse(get_calendar('uk.test').is_holiday('15 Aug 2011'))
+
+    def test_register_alias(self):
+        us = register_calendar('united states', start_year=2000, end_year=2030)
+        self.assertIs(get_calendar('us'), us)
+        self.assertIs(get_calendar('United States'), us)
+        self.assertEqual((us._index.start_year, us._index.end_year), (2000, 2030))
+        self.assertNotIn('united states', calendar_codes())
+        frankfurt = register_calendar('de.xetra')
+        for code in ['de.frankfurt', 'de.xetra', 'de.eurex']:
+            self.assertIs(get_calendar(code), frankfurt)
+        self.assertEqual(calendar_codes().count('de.frankfurt'), 1)
+        self.assertNotIn('de.xetra', calendar_codes())
+
+class YearCacheTestCase(unittest.TestCase):
+    def test_lru(self):
+        cache = YearCache(max_years=2, pinned=(2010, 2011))
+        for year in [2010, 2011, 2001, 2002]:
+            cache.put(year, str(year))
+        self.assertEqual(cache.get(2001), '2001')
+        cache.put(2003, '2003')
+        # 2002 was the least recently used year
+        self.assertEqual(cache.get(2002), None)
+        self.assertEqual([cache.get(y) for y in [2001, 2003, 2010, 2011]], ['2001', '2003', '2010', '2011'])
+        self.assertEqual(cache.info(), YearCacheInfo(5, 1, 1, 2, (2010, 2011), 4))
+        cache.configure(max_years=0)
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.evictions, 5)
+        self.assertRaises(ValueError, cache.configure, -1)
+        self.assertRaises(ValueError, cache.configure, None, (2012, 2011))
+
+    def test_calendar_policy(self):
+        cal, reference = create_calendar('uk'), create_calendar('uk')
+        cal.set_cache_policy(max_years=2, pinned_years=(2012, 2013))
+        dt = datetime.datetime(2000, 1, 1)
+        while dt.year < 2020:
+            self.assertEqual(cal.is_holiday(dt), reference.is_holiday(dt))
+            dt += datetime.timedelta(days=5)
+        info = cal.cache_info()
+        self.assertEqual(info.currsize, 4)
+        self.assertEqual(info.evictions, 16)
+        self.assertTrue(info.hits > 1000)
+        joint = JointCalendar(cal, reference)
+        joint.set_cache_policy(max_years=1)
+        self.assertTrue(joint.is_holiday('25 Dec 2015'))
+        self.assertFalse(joint.is_holiday('24 Dec 2015'))
+        self.assertEqual(joint.cache_info().currsize, 1)
+
+    def test_bounded_recency(self):
+        cal = create_calendar('uk')
+        cal.set_cache_policy(max_years=2)
+        for dt in ['1 Jul 2011', '1 Jul 2012', '2 Jul 2012', '3 Jul 2012', '4 Jul 2011', '2 Jul 2013']:
+            cal.is_holiday(dt)
+        info = cal.cache_info()
+        # every check is a lookup and keeps 2011 more recent than 2012
+        self.assertEqual((info.hits, info.misses, info.evictions), (3, 3, 1))
+        self.assertFalse(cal.is_holiday('5 Jul 2011'))
+        self.assertEqual(cal.cache_info().hits, 4)
+        self.assertFalse(cal.is_holiday('5 Jul 2012'))
+        self.assertEqual(cal.cache_info().misses, 4)
+
+class CalendarFileTestCase(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'calendars.bin')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_save_load(self):
+        save_calendars(self.path, ['ca', 'uk'], 2010, 2013)
+        calendars = load_calendars(self.path)
+        self.assertEqual(sorted(calendars), ['ca', 'uk'])
+        cal, reference = calendars['ca'], get_calendar('ca')
+        self.assertEqual(cal.fingerprint(), reference.fingerprint())
+        # the last date is outside of the stored years
+        dt = datetime.date(2009, 12, 1)
+        while dt.year <= 2014:
+            self.assertEqual(cal.is_holiday(dt), reference.is_holiday(dt))
+            self.assertEqual(cal.holiday_name(dt), reference.holiday_name(dt))
+            dt += datetime.timedelta(days=30)
+        self.assertEqual(cal.holiday_name('27 Dec 2011'), 'Christmas')
+        self.assertEqual(cal.holiday_name('23 Dec 2011'), None)
+        self.assertEqual(rolldate('24 Dec 2011', cal, 'follow'), datetime.datetime(2011, 12, 28))
+        self.assertEqual(cal.count_business_days('1 Jan 2012', '1 Feb 2012'), 21)
+
+    def test_cached_calendar(self):
+        cal = cached_calendar('us', self.path, 2000, 2010)
+        self.assertEqual(cal.fingerprint(), get_calendar('us').fingerprint())
+        # a calendar file with stale definition is rebuilt
+        stale = create_calendar('us')
+        stale.add_holiday('Closure', 'August 15th')
+        save_calendars(self.path, {'us': stale, 'uk': get_calendar('uk')}, 2000, 2010)
+        self.assertTrue(load_calendars(self.path)['us'].is_holiday('15 Aug 2005'))
+        cal = cached_calendar('us', self.path, 2000, 2010)
+        self.assertFalse(cal.is_holiday('15 Aug 2005'))
+        self.assertEqual(sorted(load_calendars(self.path)), ['uk', 'us'])
+
+    def test_cached_calendar_keeps_others(self):
+        save_calendars(self.path, ['uk', 'us'], 2000, 2010)
+        uk = load_calendars(self.path)['uk']
+        tables = [bytes(uk._index.flags), bytes(uk._index.cumulative), bytes(uk._index.busdays)]
+        del uk
+        cal = cached_calendar('us', self.path, 2005, 2020)
+        self.assertEqual((cal._index.start_year, cal._index.end_year), (2005, 2020))
+        uk = load_calendars(self.path)['uk']
+        # tables of other calendars are copied, not recomputed for the new years
+        self.assertEqual((uk._index.start_year, uk._index.end_year), (2000, 2010))
+        self.assertEqual([bytes(uk._index.flags), bytes(uk._index.cumulative), bytes(uk._index.busdays)],
+                         tables)
+        # covered years are served from the file without rewriting it
+        inode = os.stat(self.path).st_ino
+        self.assertEqual(cached_calendar('us', self.path, 2006, 2019).fingerprint(), cal.fingerprint())
+        self.assertEqual(os.stat(self.path).st_ino, inode)
+
+    def test_not_calendar_file(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'not a calendar file')
+        self.assertRaises(ValueError, load_calendars, self.path)
+
+class CalendarDefinitionTestCase(unittest.TestCase):
+    definitions = dict({'calendars': [
+        dict({'code': 'US.Def', 'aliases': ['US Definition'], 'weekend': ['Saturday', 'Sunday'],
+              'holidays': [
+                  dict({'name': "New Year's Day", 'date': 'January 1st', 'move': 'closest'}),
+                  dict({'name': "Martin Luther King's birthday", 'date': '3rd Monday in January'}),
+                  dict({'name': "Presidents' day", 'date': '3rd Monday in February'}),
+                  dict({'name': 'Independence Day', 'date': 'July 4th', 'move': 'closest'}),
+                  dict({'name': 'Labor Day', 'date': '1st Monday in September'}),
+                  dict({'name': 'Columbus Day', 'date': '2nd Monday in October'}),
+                  dict({'name': 'Veterans Day', 'date': 'November 11th', 'move': 'closest'}),
+                  dict({'name': 'Thanksgiving', 'date': '4th Thursday in November'}),
+                  dict({'name': 'Christmas', 'date': 'December 25th', 'move': 'closest'})]}),
+        dict({'code': 'uk.def', 'extends': 'uk',
+              'closures': [dict({'name': 'State Funeral', 'date': '2022-09-19'})]})
+    ]})
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'calendars.json')
+        with open(self.path, 'w') as f:
+            json.dump(self.definitions, f)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_load(self):
+        calendars = load_calendar_definitions(self.path)
+        self.assertEqual(sorted(calendars), ['uk.def', 'us.def'])
+        self.assertEqual(calendars['us.def'].fingerprint(), create_calendar('us').fingerprint())
+        self.assertIs(get_calendar('us definition'), calendars['us.def'])
+        uk = get_calendar('uk.def')
+        self.assertEqual(uk.holiday_name('19 Sep 2022'), 'State Funeral')
+        self.assertFalse(get_calendar('uk').is_holiday('19 Sep 2022'))
+        self.assertFalse(uk.is_holiday('19 Sep 2023'))
+        self.assertTrue(uk.is_holiday('26 Dec 2022'))
+        # unchanged files are compiled only once
+        self.assertIs(calendardef._compiled_definitions(self.path, None),
+                      calendardef._compiled_definitions(self.path, None))
+
+    def test_cache_directory(self):
+        cache = os.path.join(self.directory, 'cache')
+        fingerprint = load_calendar_definitions(self.path, cache, register=False)['us.def'].fingerprint()
+        calendardef._compiled.clear()
+        self.assertEqual(len(os.listdir(cache)), 1)
+        self.assertEqual(load_calendar_definitions(self.path, cache, register=False)['us.def'].fingerprint(),
+                         fingerprint)
+
+    def test_extends_same_file(self):
+        with open(self.path, 'w') as f:
+            json.dump(dict({'calendars': [
+                dict({'code': 'a.def', 'extends': 'B Definition',
+                      'holidays': [dict({'name': 'Closure', 'date': 'August 15th'})]}),
+                dict({'code': 'b.def', 'aliases': ['b definition'], 'extends': 'uk'}),
+                dict({'code': 'uk', 'extends': 'UK',
+                      'closures': [dict({'name': 'State Funeral', 'date': '2022-09-19'})]})
+            ]}), f)
+        calendars = load_calendar_definitions(self.path, register=False)
+        self.assertEqual(list(calendars), ['a.def', 'b.def', 'uk'])
+        self.assertTrue(calendars['a.def'].is_holiday('15 Aug 2011'))
+        self.assertTrue(calendars['a.def'].is_holiday('26 Dec 2022'))
+        self.assertFalse(calendars['b.def'].is_holiday('15 Aug 2011'))
+        # uk of the same file is extended, which extends the calendar registered before
+        self.assertTrue(calendars['a.def'].is_holiday('19 Sep 2022'))
+        self.assertTrue(calendars['uk'].is_holiday('26 Dec 2022'))
+        self.assertFalse(get_calendar('uk').is_holiday('19 Sep 2022'))
+        with open(self.path, 'w') as f:
+            json.dump(dict({'calendars': [dict({'code': 'a.def', 'extends': 'b.def'}),
+                                          dict({'code': 'b.def', 'extends': 'a.def'})]}), f)
+        self.assertRaises(ValueError, load_calendar_definitions, self.path, register=False)
+
+    def test_invalid(self):
+        self.assertRaises(ValueError, compile_calendar_definitions,
+                          dict({'code': 'x', 'holidays': [dict({'name': 'Bad', 'date': 'Midwinter'})]}))
+        self.assertRaises(ValueError, compile_calendar_definitions, dict({'weekend': ['Sunday']}))
+        self.assertRaises(ValueError, compile_calendar_definitions, dict({'code': 'x', 'weekend': ['Someday']}))
+
+class SharedCalendarTestCase(unittest.TestCase):
+    def setUp(self):
+        self.shm = share_calendars(['us', 'de'], 2010, 2013)
+
+    def tearDown(self):
+        self.shm.close()
+        self.shm.unlink()
+
+    def test_attach(self):
+        calendars = attach_calendars(self.shm.name)
+        self.assertTrue(attach_calendars(self.shm.name) is calendars)
+        cal, reference = calendars['us'], get_calendar('us')
+        dt = datetime.date(2009, 12, 1)
+        while dt.year <= 2014:
+            self.assertEqual(cal.is_holiday(dt), reference.is_holiday(dt))
+            dt += datetime.timedelta(days=11)
+        self.assertEqual(cal.holiday_name('4 Jul 2012'), 'Independence Day')
+        self.assertEqual(rolldate('24 Dec 2011', cal, 'follow'), datetime.datetime(2011, 12, 27))
+
+    def test_pickle(self):
+        cal = attach_calendars(self.shm.name)['de']
+        self.assertTrue(pickle.loads(pickle.dumps(cal)) is cal)
+
 class RolldateTestCase(unittest.TestCase):
     def test_rolldate(self):
         cal = get_calendar('ca')
@@ -145,6 +546,70 @@ class RolldateTestCase(unittest.TestCase):
         self.assertEqual(fbusdate(2012, 4, cal), datetime.datetime(2012, 4, 2))
         self.assertEqual(fbusdate(2012, 2, cal), datetime.datetime(2012, 2, 1))
 
+    def test_rolldate_unknown_convention(self):
+        cal = get_calendar('ca')
+        self.assertRaises(ValueError, rolldate, '1 Jul 2012', cal, 'modified following')
+        self.assertRaises(ValueError, rolldate, '3 Jul 2012', cal, 'none')
+        # conventions are case insensitive, also for business days
+        self.assertEqual(rolldate('3 Jul 2012', cal, 'ModFollow'), datetime.datetime(2012, 7, 3))
+        self.assertRaises(ValueError, Schedule, '15 Jan 2012', '15 Jan 2013', 'semiannual', cal, 'following')
+
+    def test_rolldate_ordinal(self):
+        cal = get_calendar('ca')
+        ordinal = datetime.date(2012, 6, 30).toordinal()
+        self.assertEqual(rolldate(ordinal, cal, 'modfollow', ordinal=True), ordinal - 1)
+        self.assertEqual(rolldate(ordinal, cal, 'follow'), datetime.datetime(2012, 7, 3))
+        self.assertEqual(rolldate('23 Jan 2012', cal, 'follow', ordinal=True),
+                         datetime.date(2012, 1, 23).toordinal())
+
+class BusinessDayArithmeticTestCase(unittest.TestCase):
+    def test_add_business_days(self):
+        cal = get_calendar('ca')
+        # Christmas moved to Tuesday Dec 27th 2011
+        self.assertEqual(add_business_days('23 Dec 2011', 2, cal), datetime.datetime(2011, 12, 29))
+        self.assertEqual(add_business_days('29 Dec 2011', -2, cal), datetime.datetime(2011, 12, 23))
+        self.assertEqual(add_business_days('24 Dec 2011', 0, cal), datetime.datetime(2011, 12, 28))
+        self.assertEqual(business_days_between('23 Dec 2011', '29 Dec 2011', cal), 2)
+        self.assertEqual(business_days_between('29 Dec 2011', '23 Dec 2011', cal), -2)
+
+    def test_add_business_days_is_holiday_only(self):
+        class HolidaysOnly:
+            def __init__(self, calendar):
+                self.calendar = calendar
+            def is_holiday(self, dt):
+                return self.calendar.is_holiday(dt)
+        cal = get_calendar('ca')
+        other = HolidaysOnly(get_calendar('ca'))
+        for n in [-10, -1, 0, 1, 10]:
+            self.assertEqual(add_business_days('24 Dec 2011', n, cal), add_business_days('24 Dec 2011', n, other))
+        self.assertEqual(business_days_between('1 Dec 2011', '1 Feb 2012', other),
+                         business_days_between('1 Dec 2011', '1 Feb 2012', cal))
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_business_days_arrays(self):
+        cal = get_calendar('us')
+        dates = numpy.arange('2011-12-01', '2012-02-01', dtype='datetime64[D]')
+        for n in [-3, 0, 1, 700]:
+            result = add_business_days_array(dates, n, cal)
+            self.assertEqual(list(result.astype(datetime.date)),
+                             [add_business_days(dt, n, cal).date() for dt in dates.astype(datetime.date)])
+        ends = dates + 45
+        self.assertEqual(list(business_days_between_array(dates, ends, cal)),
+                         [business_days_between(d1, d2, cal)
+                          for d1, d2 in zip(dates.astype(datetime.date), ends.astype(datetime.date))])
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_rolldate_array(self):
+        cal = get_calendar('ca')
+        dates = numpy.arange('2011-12-01', '2012-08-01', dtype='datetime64[D]')
+        for convention in ['follow', 'modfollow', 'previous', 'modprevious']:
+            rolled = rolldate_array(dates, cal, convention)
+            self.assertEqual(list(rolled.astype(datetime.date)),
+                             [rolldate(dt, cal, convention).date() for dt in dates.astype(datetime.date)])
+        ordinals = rolldate_array([datetime.date(2012, 6, 30).toordinal()], cal, 'modfollow')
+        self.assertEqual(list(ordinals), [datetime.date(2012, 6, 29).toordinal()])
+        self.assertRaises(ValueError, rolldate_array, dates, cal, 'nearest')
+
 class DaycountTestCase(unittest.TestCase):
     def test_daycount_actact(self):
         self.assertEqual(daydiff('1 Dec 2002', '2 Dec 2002', 'actual/actual'), 1)
@@ -262,9 +727,417 @@ class DaycountTestCase(unittest.TestCase):
         self.assertEqual(daydiff('31 Jan 2002', '28 Feb 2002', '30e+/360'), 28)
         self.assertEqual(daydiff('31 Jan 2004', '29 Feb 2004', '30e+/360'), 29)
 
+    def test_yearfractions(self):
+        dates = ['1 Mar 2003', '1 Mar 2004', '15 Jul 2004', '31 Dec 2010']
+        for convention in ['actual/actual', 'actual/365l', '30e+/360', 'actual/actual afb']:
+            expected = [yearfrac(dates[0], dt, convention) for dt in dates]
+            self.assertEqual(yearfractions(dates, convention), expected)
+            # any iterable is accepted by the generator version
+            self.assertEqual(list(iyearfractions(iter(dates), convention)), expected)
+            self.assertEqual(list(yearfractions_array(dates, convention)), expected)
+        self.assertEqual(yearfractions([], 'actual/360'), [])
+
+    def test_yearfrac_ordinals(self):
+        o1, o2 = datetime.date(2003, 3, 1).toordinal(), datetime.date(2010, 12, 31).toordinal()
+        for convention in ['actual/actual', 'actual/365l', '30e+/360', 'actual/actual afb', 'actual/360']:
+            self.assertEqual(yearfrac(o1, o2, convention), yearfrac('1 Mar 2003', '31 Dec 2010', convention))
+            self.assertEqual(daydiff(o1, o2, convention), daydiff('1 Mar 2003', '31 Dec 2010', convention))
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_numpy_scalars(self):
+        o1, o2 = datetime.date(2003, 3, 1).toordinal(), datetime.date(2010, 12, 31).toordinal()
+        self.assertEqual(yearfrac(numpy.int64(o1), numpy.int32(o2), 'actual/actual'),
+                         yearfrac(o1, o2, 'actual/actual'))
+        dates = parse_dates(['2003-03-01', '2010-12-31'])
+        self.assertEqual(asordinal(dates[0]), o1)
+        self.assertEqual(asordinal(numpy.datetime64('2010-12-31T12:00')), o2)
+        self.assertEqual(daydiff(dates[0], dates[1], 'actual/360'), o2 - o1)
+        self.assertTrue(get_calendar('us').is_holiday(numpy.datetime64('2012-07-04')))
+        self.assertRaises(ValueError, asordinal, numpy.datetime64('NaT'))
+
+    def test_yearfractions_array_out(self):
+        out = array.array('d', [0.0] * 3)
+        result = yearfractions_array(['1 Jan 2003', '1 Jan 2004', '1 Jan 2005'], 'actual/actual', out=out)
+        self.assertIs(result, out)
+        self.assertEqual(list(out), [0.0, 1.0, 2.0])
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_yearfractions_array_numpy(self):
+        dates = numpy.array(['2003-01-01', '2004-01-01', '2005-01-01'], dtype='datetime64[D]')
+        result = yearfractions_array(dates, 'actual/actual')
+        self.assertIsInstance(result, array.array)
+        self.assertEqual(list(result), [0.0, 1.0, 2.0])
+        self.assertEqual(yearfractions_array(dates[:0], 'actual/actual'), array.array('d'))
+        out = array.array('d', [-1.0] * 4)
+        self.assertIs(yearfractions_array(dates, 'actual/actual', out=out), out)
+        self.assertEqual(list(out), [0.0, 1.0, 2.0, -1.0])
+        out = numpy.full(3, -1.0)
+        self.assertIs(yearfractions_array(dates, 'actual/actual', out=out), out)
+        self.assertEqual(list(out), [0.0, 1.0, 2.0])
+
     def test_supported_daycount_convention(self):
         self.assertTrue(supported_daycount_convention('ACTUAL/360'))
         self.assertFalse(supported_daycount_convention('ACTUAL/3608'))
 
+class DayCounterTestCase(unittest.TestCase):
+    def test_get_daycounter(self):
+        dc = get_daycounter('act/act')
+        self.assertTrue(get_daycounter('act/act') is dc)
+        self.assertFalse(get_daycounter('act/act', eom=True) is dc)
+        self.assertEqual(dc.convention, 'ACTUAL/ACTUAL ISDA')
+        self.assertEqual(repr(get_daycounter('30/360 us', eom=True)), "DayCounter('30/360 US', eom=True)")
+        self.assertRaises(KeyError, get_daycounter, 'act/999')
+        self.assertRaises(AttributeError, setattr, dc, 'extra', 1)
+
+    def test_daycounter_methods(self):
+        ends = ['28 Feb 2012', '29 Feb 2012', '31 Aug 2012', '31 Dec 2030']
+        for convention, kwargs in [('30/360 us', {'eom': True}), ('actual/365l', {'frequency': 'yearly'}),
+                                   ('actual/actual afb', {}), ('30e+/360', {})]:
+            dc = get_daycounter(convention, **kwargs)
+            for end in ends:
+                self.assertEqual(dc.yearfrac('28 Feb 2011', end), yearfrac('28 Feb 2011', end, convention, **kwargs))
+                self.assertEqual(dc('28 Feb 2011', end), dc.yearfrac('28 Feb 2011', end))
+                self.assertEqual(dc.daydiff('28 Feb 2011', end), daydiff('28 Feb 2011', end, convention, **kwargs))
+                self.assertEqual(dc.parameters('28 Feb 2011', end)[2], dc.yearfrac('28 Feb 2011', end))
+            self.assertEqual(dc.yearfracs('28 Feb 2011', ends), [dc.yearfrac('28 Feb 2011', end) for end in ends])
+
+def _period_has_29feb_loop(o1, o2, y1, y2):
+    """ Reference implementation of _period_has_29feb_ordinal looping over the years
+    """
+    have_29_feb = False
+    for y in range(y1, y2+1):
+        feb29 = _jan1_ordinal(y) + 59
+        if leapyear(y) and (
+            (y!=y1 and y!=y2)
+            or (y == y1 and o1<feb29)
+            or (y == y2 and feb29 <= o2)):
+            have_29_feb = True
+    return have_29_feb
+
+def _actual_actual_isda_loop(o1, o2, y1, y2):
+    """ Reference implementation of ACT/ACT ISDA parameters looping over the years
+    """
+    if y2 == y1:
+        return o2 - o1, yeardays(y1), float(o2 - o1)/yeardays(y1)
+    num_days = 0
+    year_days = 0
+    factor = 0.0
+    for y in range(y1+1, y2):
+        yd = yeardays(y)
+        num_days += yd
+        year_days += yd
+        factor += float(num_days)/year_days
+    num = _jan1_ordinal(y1+1) - o1
+    den = yeardays(y1)
+    num_days += num
+    year_days += den
+    factor += float(num)/den
+    num = o2 - _jan1_ordinal(y2)
+    den = yeardays(y2)
+    num_days += num
+    year_days += den
+    factor += float(num)/den
+    return num_days, year_days, factor
+
+class DaycountPropertyTestCase(unittest.TestCase):
+    """ Closed form day counting against the reference loops over random date pairs
+    """
+
+    def random_pairs(self, n):
+        rng = random.Random(17)
+        for _ in range(n):
+            # around the Julian/Gregorian switch, modern dates and very long periods
+            o1 = rng.choice([rng.randint(600000, 680000), rng.randint(720000, 750000),
+                             rng.randint(1, 3000000)])
+            o2 = o1 + rng.choice([rng.randint(-400, 400), rng.randint(-40000, 40000),
+                                  rng.randint(0, 400000)])
+            o2 = min(max(o2, 1), 3000000)
+            yield o1, o2, datetime.date.fromordinal(o1).year, datetime.date.fromordinal(o2).year
+
+    def test_leapyears_through(self):
+        count = 0
+        for year in range(1, 3000):
+            count += leapyear(year)
+            self.assertEqual(_leapyears_through(year), count)
+
+    def test_period_has_29feb(self):
+        for o1, o2, y1, y2 in self.random_pairs(3000):
+            self.assertEqual(_period_has_29feb_ordinal(o1, o2, y1, y2),
+                             _period_has_29feb_loop(o1, o2, y1, y2), (o1, o2))
+
+    def test_actual_actual_isda(self):
+        for o1, o2, y1, y2 in self.random_pairs(3000):
+            self.assertEqual(_daycount_functions['ACTUAL/ACTUAL ISDA'](o1, o2, False, False),
+                             _actual_actual_isda_loop(o1, o2, y1, y2), (o1, o2))
+
+class BusinessDayIndexTestCase(unittest.TestCase):
+    def test_index_matches_is_holiday(self):
+        reference = create_calendar('ca')
+        cal = create_calendar('ca')
+        cal.compile(2010, 2013)
+        dt = datetime.date(2010, 1, 1)
+        while dt.year <= 2013:
+            self.assertEqual(cal.is_holiday(dt), reference.is_holiday(dt))
+            dt += datetime.timedelta(days=1)
+
+    def test_count_business_days(self):
+        cal = create_calendar('ca')
+        # January 2012: 22 weekdays, January 2nd is moved New Year's Day
+        self.assertEqual(cal.count_business_days('1 Jan 2012', '1 Feb 2012'), 21)
+        self.assertEqual(cal.count_business_days('1 Feb 2012', '1 Jan 2012'), -21)
+        self.assertEqual(cal.count_business_days('23 Jan 2012', '23 Jan 2012'), 0)
+
+    def test_nth_business_day(self):
+        cal = create_calendar('ca')
+        self.assertEqual(cal.nth_business_day('23 Dec 2011', 1), datetime.datetime(2011, 12, 28))
+        self.assertEqual(cal.nth_business_day('3 Jan 2012', -1), datetime.datetime(2011, 12, 30))
+        self.assertEqual(cal.nth_business_day('24 Dec 2011', 0), datetime.datetime(2011, 12, 28))
+        self.assertEqual(cal.nth_business_day('23 Jan 2012', 0), datetime.datetime(2012, 1, 23))
+        # index is extended automatically for far offsets
+        dt = cal.nth_business_day('1 Jan 2012', 1000)
+        self.assertEqual(cal.count_business_days('1 Jan 2012', dt), 999)
+
+    def test_holidays_between(self):
+        cal = create_calendar('us')
+        holidays = cal.holidays_between('20 Dec 2012', '27 Dec 2012')
+        self.assertEqual([datetime.date.fromordinal(o) for o in holidays],
+                         [datetime.date(2012, 12, 22), datetime.date(2012, 12, 23), datetime.date(2012, 12, 25)])
+        busdays = cal.business_days_between('1 Jan 1990', '1 Jan 2081')
+        self.assertEqual(len(busdays), cal.count_business_days('1 Jan 1990', '1 Jan 2081'))
+        self.assertEqual(len(busdays) + len(cal.holidays_between('1 Jan 1990', '1 Jan 2081')),
+                         datetime.date(2081, 1, 1).toordinal() - datetime.date(1990, 1, 1).toordinal())
+        self.assertTrue(all(not cal.is_holiday(datetime.date.fromordinal(o)) for o in busdays[:1000]))
+
+    def test_compile_processes(self):
+        cal = create_calendar('uk')
+        index = cal.compile(1950, 2049, processes=2)
+        self.assertEqual(index.flags, create_calendar('uk').compile(1950, 2049).flags)
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_holidays_between_datetime64(self):
+        cal = create_calendar('uk')
+        holidays = cal.holidays_between('1 Jan 2012', '1 Jan 2013', datetime64=True)
+        self.assertEqual(holidays.dtype, numpy.dtype('datetime64[D]'))
+        self.assertIn(numpy.datetime64('2012-12-25'), holidays)
+
+@unittest.skipIf(numpy is None, 'numpy is not installed')
+class YearfracArrayTestCase(unittest.TestCase):
+    def test_yearfrac_array_matches_scalar(self):
+        rnd = random.Random(1234)
+        first = datetime.date(1800, 1, 1).toordinal()
+        last = datetime.date(2100, 12, 31).toordinal()
+        starts = [rnd.randint(first, last) for _ in range(500)]
+        ends = [s + rnd.randint(-800, 20000) for s in starts]
+        # end of month dates exercise 30/360 adjustments
+        starts += [datetime.date(2004, 2, 29).toordinal(), datetime.date(2003, 2, 28).toordinal()]
+        ends += [datetime.date(2005, 2, 28).toordinal(), datetime.date(2004, 2, 29).toordinal()]
+        for convention in set(_dc_norm.values()):
+            for kwargs in ({}, {'eom': True}, {'frequency': 'yearly'}):
+                fractions = yearfrac_array(starts, ends, convention, **kwargs)
+                days = daydiff_array(starts, ends, convention, **kwargs)
+                for s, e, f, d in zip(starts, ends, fractions, days):
+                    dt1, dt2 = datetime.date.fromordinal(s), datetime.date.fromordinal(e)
+                    self.assertEqual(f, yearfrac(dt1, dt2, convention, **kwargs))
+                    self.assertEqual(d, daydiff(dt1, dt2, convention, **kwargs))
+
+    def test_yearfrac_array_datetime64(self):
+        start = numpy.array(['2004-01-01'], dtype='datetime64[D]')
+        end = numpy.array(['2005-01-01', '2006-01-01'], dtype='datetime64[D]')
+        self.assertEqual(list(yearfrac_array(start, end, 'actual/actual')), [1.0, 2.0])
+        self.assertEqual(list(yearfrac_array(start, end, 'actual/360')), [366/360.0, 731/360.0])
+
+    def test_accrual_fractions(self):
+        last = ['15 Jan 2012', '31 Jan 2012', '29 Feb 2012', '15 Jan 2012', '30 Nov 2011']
+        following = ['15 Jul 2012', '31 Jul 2012', '31 Aug 2012', '15 Jul 2012', '31 May 2012']
+        settle = ['2 Apr 2012', '30 Apr 2012', '31 May 2012', '2 Apr 2012', '29 Feb 2012']
+        conventions = ['actual/360', '30/360 us', 'act/act', 'actual/360', 'actual/actual']
+        fractions = accrual_fractions(last, following, settle, conventions, eom=True)
+        for k in range(len(last)):
+            self.assertEqual(fractions.accrued[k], yearfrac(last[k], settle[k], conventions[k], eom=True))
+            self.assertEqual(fractions.period[k], yearfrac(last[k], following[k], conventions[k], eom=True))
+        single = accrual_fractions(last, following, settle, 'actual/360')
+        self.assertEqual(list(single.accrued), [yearfrac(l, s, 'actual/360') for l, s in zip(last, settle)])
+        self.assertRaises(KeyError, accrual_fractions, last, following, settle, ['act/999'] * 5)
+
+    def test_accrued_interest(self):
+        amounts = accrued_interest(['15 Jan 2012', '15 Jan 2012'], '15 Jul 2012', '15 Apr 2012',
+                                   'actual/360', [0.05, 0.02], 1000000.0)
+        self.assertAlmostEqual(amounts[0], 0.05 * 1000000.0 * 91 / 360.0)
+        self.assertAlmostEqual(amounts[1], 0.02 * 1000000.0 * 91 / 360.0)
+
+@unittest.skipIf(numpy is None, 'numpy is not installed')
+class ParseDatesTestCase(unittest.TestCase):
+    def test_parse_dates_matches_asdatetime(self):
+        column = ["4-Nov-1978", "04 Nov 1978", "04Nov1978", "19781104", "1978-1-4", "4.11.1978",
+                  "11/4/78", "1/23/78", "11/04/1978", "29-FEB-2012", "1/1/69", "1/1/68"]
+        parsed = parse_dates(column)
+        self.assertEqual(parsed.dtype, numpy.dtype('datetime64[D]'))
+        for dtstr, dt in zip(column, parsed.astype(datetime.date)):
+            self.assertEqual(asdatetime(dtstr).date(), dt)
+
+    def test_parse_dates_buffer(self):
+        data = b"2012-01-31\r\n2012-02-29\r\n"
+        self.assertEqual(list(parse_dates(memoryview(data)).astype(datetime.date)),
+                         [datetime.date(2012, 1, 31), datetime.date(2012, 2, 29)])
+        ordinals = parse_dates(b"20120131\n20120229", ordinals=True)
+        self.assertEqual(list(ordinals), [734533, 734562])
+        self.assertEqual(list(parse_dates(b"01/02/2012", fmt='%d/%m/%Y').astype(datetime.date)),
+                         [datetime.date(2012, 2, 1)])
+
+    def test_parse_dates_invalid(self):
+        for column in [["2012-02-30"], ["2011-02-29"], ["31-Foo-2012"], ["2012-01-01", "2012/01/01"],
+                       [""], ["2012-01-01", ""], ["", "2012-01-01"], b"20120131\n\n20120229\n",
+                       ["01-Jan-2012 10:99:00"], ["01-Jan-2012 24:00:00"], ["01-Jan-2012 10:00:60"]]:
+            self.assertRaises(ValueError, parse_dates, column)
+        self.assertEqual(list(parse_dates(["01-Jan-2012 23:59:59"]).astype(datetime.date)),
+                         [datetime.date(2012, 1, 1)])
+
+    def test_parse_dates_format(self):
+        for fmt in ['%Y-%j', '%d%%%m%%%Y', '%m/%d', '%Y-%m', '%d/%m/%Y %', '%d/%d/%Y']:
+            self.assertRaises(ValueError, parse_dates, ['01/02/2012'], fmt)
+        self.assertEqual(list(parse_dates(['02/2012/01'], '%m/%Y/%d').astype(datetime.date)),
+                         [datetime.date(2012, 2, 1)])
+
+    def test_parse_dates_empty(self):
+        for column in [[], b'', bytearray()]:
+            self.assertEqual(len(parse_dates(column)), 0)
+            self.assertEqual(parse_dates(column).dtype, numpy.dtype('datetime64[D]'))
+            self.assertEqual(parse_dates(column, ordinals=True), array.array('i'))
+
+class ScheduleTestCase(unittest.TestCase):
+    def test_unadjusted_dates(self):
+        dates = unadjusted_dates('15 Jan 2012', '31 Mar 2014', 'semiannual')
+        self.assertEqual(dates, [datetime.datetime(2012, 1, 15), datetime.datetime(2012, 3, 31),
+                                 datetime.datetime(2012, 9, 30), datetime.datetime(2013, 3, 31),
+                                 datetime.datetime(2013, 9, 30), datetime.datetime(2014, 3, 31)])
+        dates = unadjusted_dates('15 Jan 2012', '31 Mar 2014', 'semiannual', stub='long front')
+        self.assertEqual(dates[:2], [datetime.datetime(2012, 1, 15), datetime.datetime(2012, 9, 30)])
+        dates = unadjusted_dates('15 Jan 2012', '31 Mar 2014', 'annual', stub='short back')
+        self.assertEqual(dates, [datetime.datetime(2012, 1, 15), datetime.datetime(2013, 1, 15),
+                                 datetime.datetime(2014, 1, 15), datetime.datetime(2014, 3, 31)])
+        # without a stub long and short stub rules produce the same dates
+        self.assertEqual(unadjusted_dates('31 Mar 2012', '31 Mar 2014', 'annual', stub='long back'),
+                         unadjusted_dates('31 Mar 2012', '31 Mar 2014', 'annual', stub='short back'))
+        self.assertRaises(ValueError, unadjusted_dates, '31 Mar 2014', '31 Mar 2012', 'annual')
+        self.assertRaises(ValueError, unadjusted_dates, '31 Mar 2012', '31 Mar 2014', 'annual', 'middle')
+
+    def test_eom_rule(self):
+        dates = unadjusted_dates('29 Feb 2012', '28 Feb 2013', 'quarterly', stub='short back', eom=True)
+        self.assertEqual([dt.day for dt in dates], [29, 31, 31, 30, 28])
+        dates = unadjusted_dates('29 Feb 2012', '28 Feb 2013', 'quarterly', stub='short back')
+        self.assertEqual([dt.day for dt in dates], [29, 29, 29, 29, 28])
+
+    def test_schedule(self):
+        cal = get_calendar('us')
+        sch = Schedule('15 Jan 2012', '15 Jan 2014', 'semiannual', cal, 'modfollow', daycount='30/360 us')
+        self.assertEqual(len(sch), 4)
+        # 15 Jul 2012 is a Sunday
+        self.assertEqual(sch.adjusted[1], datetime.datetime(2012, 7, 16))
+        # 15 Jan 2012 is a Sunday followed by Martin Luther King's birthday
+        self.assertEqual(sch.periods()[0], (datetime.datetime(2012, 1, 17), datetime.datetime(2012, 7, 16)))
+        self.assertEqual(sch.yearfractions[0], yearfrac('17 Jan 2012', '16 Jul 2012', '30/360 us'))
+
+    @unittest.skipIf(numpy is None, 'numpy is not installed')
+    def test_schedule_arrays(self):
+        cal = get_calendar('uk')
+        effective = ['15 Jan 2012', '29 Feb 2012', '3 Mar 2010']
+        maturity = ['31 Mar 2017', '28 Feb 2015', '3 Mar 2020']
+        for stub in ['short front', 'long front', 'short back', 'long back']:
+            columns = schedule_arrays(effective, maturity, 'quarterly', cal, 'modfollow',
+                                      'actual/actual', stub=stub, eom=True)
+            for i, (eff, mat) in enumerate(zip(effective, maturity)):
+                sch = Schedule(eff, mat, 'quarterly', cal, 'modfollow', 'actual/actual', stub=stub, eom=True)
+                rows = columns.instrument == i
+                self.assertEqual(list(columns.unadjusted_end[rows].astype(datetime.date)),
+                                 [dt.date() for dt in sch.unadjusted[1:]])
+                self.assertEqual(list(columns.start[rows].astype(datetime.date)),
+                                 [dt.date() for dt in sch.adjusted[:-1]])
+                self.assertEqual(list(columns.yearfraction[rows]), sch.yearfractions)
+
+class ProfilingTestCase(unittest.TestCase):
+
+    def tearDown(self):
+        profiler.disable()
+        profiler.reset()
+
+    def test_disabled(self):
+        profiler.reset()
+        rolldate('25 Dec 2011', get_calendar('us'), 'follow')
+        snapshot = profiler.snapshot()
+        self.assertFalse(snapshot['enabled'])
+        self.assertEqual(snapshot['counters'], [])
+
+    def test_counters(self):
+        calendar = create_calendar('uk')
+        with profiler.collect():
+            self.assertEqual(rolldate('25 Dec 2011', calendar, 'follow'), datetime.datetime(2011, 12, 28))
+            rolldate('26 Dec 2011', calendar, 'follow')
+            yearfrac('1 Jan 2011', '1 Jul 2012', 'actual/actual')
+            parse_dates(['2012-01-01', '2012-01-02'])
+        self.assertFalse(profiler.enabled)
+        counters = dict(((c.path, c.label), c) for c in profiler.counters())
+        self.assertEqual(counters[('busdayrule.rolldate', 'follow')].calls, 2)
+        self.assertEqual(counters[('busdayrule.roll_forward', None)].items, 5)
+        self.assertEqual(counters[('daycount.parameters', 'ACTUAL/ACTUAL ISDA')].calls, 1)
+        self.assertEqual(counters[('dateutils.sniff_datetime_format', None)].calls, 1)
+        self.assertEqual(counters[('holidays.idiosyncratic', 'good friday')].calls, 1)
+        self.assertEqual(counters[('holidays.year_build', None)].calls, 1)
+        self.assertEqual(profiler.snapshot()['caches']['holidays.year']['misses'], 1)
+
+        # nothing is recorded after disabling
+        rolldate('25 Dec 2011', calendar, 'follow')
+        self.assertEqual(counters[('busdayrule.rolldate', 'follow')],
+                         dict(((c.path, c.label), c) for c in profiler.counters())[('busdayrule.rolldate', 'follow')])
+
+    def test_parse_cache(self):
+        # the string may have been parsed by other tests
+        _parse_datetime_string.cache_clear()
+        with profiler.collect():
+            asdatetime('3 Feb 1921')
+            asdatetime('3 Feb 1921')
+        asdatetime('3 Feb 1921')
+        cache = profiler.snapshot()['caches']['asdatetime']
+        self.assertEqual(cache['hits'], 1)
+        self.assertEqual(cache['hit_rate'], 0.5)
+        parsed = [c for c in profiler.counters() if c.path == 'dateutils.parse_datetime_string']
+        self.assertEqual(len(parsed), 1)
+        self.assertEqual(parsed[0].calls, 1)
+
+    def test_export(self):
+        profiler = Profiler()
+        profiler.add('daycount.parameters', 0.5, label='ACTUAL/360')
+        profiler.add('daycount.parameters', 0.25, label='ACTUAL/360')
+        profiler.cache_hit('holidays.year')
+        snapshot = json.loads(profiler.to_json())
+        self.assertEqual(snapshot['counters'], [dict({'path': 'daycount.parameters', 'label': 'ACTUAL/360',
+                                                      'calls': 2, 'seconds': 0.75, 'items': 0})])
+        self.assertEqual(snapshot['caches']['holidays.year']['hit_rate'], 1.0)
+        text = profiler.to_prometheus()
+        self.assertIn('# TYPE findates_calls_total counter', text)
+        self.assertIn('findates_calls_total{path="daycount.parameters",label="ACTUAL/360"} 2', text)
+        self.assertIn('findates_seconds_total{path="daycount.parameters",label="ACTUAL/360"} 0.75', text)
+        self.assertIn('findates_cache_hits_total{cache="holidays.year"} 1', text)
+
+
+class LazyImportTestCase(unittest.TestCase):
+
+    def loaded_modules(self, statement):
+        code = statement + '; import sys; print(" ".join(sorted(sys.modules)))'
+        return subprocess.check_output([sys.executable, '-c', code], universal_newlines=True).split()
+
+    def test_package(self):
+        modules = self.loaded_modules('import findates')
+        self.assertNotIn('findates.dateutils', modules)
+        self.assertIn('findates.holidays', self.loaded_modules('import findates; findates.holidays'))
+
+    def test_holidays(self):
+        modules = self.loaded_modules('import findates.holidays')
+        for name in ['findates.holidays.calendarfile', 'multiprocessing', 'concurrent.futures', 'numpy']:
+            self.assertNotIn(name, modules)
+        modules = self.loaded_modules('from findates.holidays import load_calendars')
+        self.assertIn('findates.holidays.calendarfile', modules)
+        self.assertNotIn('multiprocessing', modules)
+
+
 if __name__ == "__main__":
     nose.main()
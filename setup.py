@@ -6,7 +6,9 @@ setup(
     description = 'Dealing with dates in finance',
     author='Artem Frolov (Amelanche Inc.)',
     author_email='findates@artemfrolov.fastmail.fm',
-    packages=['findates', 'findates.test'],
+    packages=['findates', 'findates.busdayrule', 'findates.dateutils', 'findates.daycount',
+              'findates.holidays', 'findates.profiling', 'findates.schedule', 'findates.test'],
+    package_data={'findates.holidays': ['calendars.json']},
     license='OSI Approved',
     long_description=open('README.txt').read(),
     classifiers = [